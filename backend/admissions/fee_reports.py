@@ -0,0 +1,207 @@
+"""
+Admission fee collection reports.
+
+Every figure here is computed by the database. The fee of an enrolled
+decision depends on the free-text ``course_applied`` of its application,
+which cannot be joined to ``AdmissionFeeStructure`` directly. So the
+distinct course spellings of the report are read first, mapped to class
+ranges by the fee resolver, and turned into ``CASE`` expressions:
+
+- ``class_range`` maps each spelling to its fee table class range.
+- ``fee_amount`` maps (class range, applicant category) to the fee table
+  amount, falling back to the default amount as ``fee_amount`` does.
+
+Both are ordinary annotations on ``SchoolAdmissionDecision``. Totals,
+breakdowns and monthly series are grouped ``SUM``/``COUNT`` queries over
+them, and the detail list is a plain ``values()`` query that can be
+paginated or streamed.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Count, DateTimeField, DecimalField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .fee_resolver import class_range_for_course, fee_table
+from .models import AdmissionFeeStructure, SchoolAdmissionDecision
+
+AMOUNT_FIELD = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(Decimal('0'), output_field=AMOUNT_FIELD)
+
+COLLECTED = Q(payment_status='completed')
+WAIVED = Q(payment_status='waived')
+
+DETAIL_FIELDS = [
+    ('id', 'Decision ID'),
+    ('application_id', 'Application ID'),
+    ('application__reference_id', 'Reference ID'),
+    ('application__applicant_name', 'Student Name'),
+    ('application__course_applied', 'Course'),
+    ('application__category', 'Category'),
+    ('school__school_name', 'School'),
+    ('class_range', 'Class Range'),
+    ('fee_amount', 'Fee Amount'),
+    ('payment_status', 'Payment Status'),
+    ('payment_completed_at', 'Payment Completed At'),
+    ('payment_reference', 'Payment Reference'),
+    ('is_payment_finalized', 'Payment Finalized'),
+    ('enrollment_date', 'Enrollment Date'),
+]
+DETAIL_ORDERING = ['-enrolled_on', '-id']
+
+
+def enrolled_decisions(school=None, date_from=None, date_to=None):
+    """
+    Enrolled decisions annotated with their fees, optionally for one school
+    and enrolled within a date range. The other report functions take this
+    queryset.
+    """
+    decisions = SchoolAdmissionDecision.objects.filter(enrollment_status='enrolled').annotate(
+        enrolled_on=Coalesce('enrollment_date', 'decision_date', output_field=DateTimeField())
+    )
+    if school is not None:
+        decisions = decisions.filter(school=school)
+    if date_from:
+        decisions = decisions.filter(enrolled_on__date__gte=date_from)
+    if date_to:
+        decisions = decisions.filter(enrolled_on__date__lte=date_to)
+    return with_fees(decisions)
+
+
+def with_fees(decisions):
+    """Annotate decisions with their ``class_range`` and ``fee_amount``"""
+    courses_by_range = {}
+    courses = decisions.order_by().values_list('application__course_applied', flat=True).distinct()
+    for course in courses:
+        class_range = class_range_for_course(course)
+        if class_range is not None:
+            courses_by_range.setdefault(class_range, []).append(course)
+
+    table = fee_table()
+    general = Q(application__category='general')
+    fee_whens = []
+    for class_range, range_courses in courses_by_range.items():
+        for category, condition in [('general', general), ('sc_st_obc_sbc', ~general)]:
+            structure = table.get((class_range, category))
+            if structure:
+                fee_whens.append(When(
+                    condition,
+                    application__course_applied__in=range_courses,
+                    then=Value(structure.annual_fee_min, output_field=AMOUNT_FIELD)
+                ))
+    default_fee = Case(
+        When(general, then=Value(Decimal(str(AdmissionFeeStructure.get_default_fee_amount('general'))))),
+        default=Value(Decimal(str(AdmissionFeeStructure.get_default_fee_amount('sc')))),
+        output_field=AMOUNT_FIELD
+    )
+
+    return decisions.annotate(
+        class_range=Case(
+            *[When(application__course_applied__in=range_courses, then=Value(class_range))
+              for class_range, range_courses in courses_by_range.items()],
+            default=Value(None),
+            output_field=CharField()
+        ),
+        fee_amount=Case(*fee_whens, default=default_fee, output_field=AMOUNT_FIELD) if fee_whens else default_fee
+    )
+
+
+def _totals():
+    return {
+        'expected': Coalesce(Sum('fee_amount'), ZERO),
+        'collected': Coalesce(Sum('fee_amount', filter=COLLECTED), ZERO),
+        'waived': Coalesce(Sum('fee_amount', filter=WAIVED), ZERO),
+        'students': Count('id'),
+        'paid_students': Count('id', filter=COLLECTED),
+    }
+
+
+def _report_row(row):
+    expected = float(row.pop('expected'))
+    collected = float(row.pop('collected'))
+    waived = float(row.pop('waived'))
+    row.update({
+        'total_expected': expected,
+        'total_collected': collected,
+        'total_waived': waived,
+        'pending_amount': expected - collected - waived,
+        'collection_rate': round(collected / expected * 100, 2) if expected > 0 else 0,
+        'total_students': row.pop('students'),
+        'paid_students': row.pop('paid_students'),
+    })
+    return row
+
+
+def collection_summary(decisions):
+    """Expected, collected and pending totals over all the decisions"""
+    return _report_row(decisions.aggregate(**_totals()))
+
+
+def collection_breakdown(decisions):
+    """Totals per school, class range and applicant category"""
+    rows = decisions.order_by().values(
+        'school_id', 'school__school_name', 'class_range', 'application__category'
+    ).annotate(**_totals()).order_by('school__school_name', 'class_range', 'application__category')
+    return [
+        _report_row({
+            'school_id': row.pop('school_id'),
+            'school_name': row.pop('school__school_name'),
+            'class_range': row.pop('class_range'),
+            'category': row.pop('application__category'),
+            **row,
+        })
+        for row in rows
+    ]
+
+
+def monthly_series(decisions):
+    """
+    Month by month: fees falling due by enrolment month, and fees collected
+    by the month the payment completed.
+    """
+    decisions = decisions.order_by()
+    months = {}
+    for row in decisions.annotate(month=TruncMonth('enrolled_on')).values('month').annotate(
+        expected=Sum('fee_amount'), enrolled=Count('id')
+    ):
+        months.setdefault(row['month'], {}).update(expected=row['expected'], enrolled=row['enrolled'])
+    for row in decisions.filter(COLLECTED, payment_completed_at__isnull=False).annotate(
+        month=TruncMonth('payment_completed_at')
+    ).values('month').annotate(collected=Sum('fee_amount'), paid=Count('id')):
+        months.setdefault(row['month'], {}).update(collected=row['collected'], paid=row['paid'])
+
+    return [
+        {
+            'month': month.strftime('%Y-%m'),
+            'expected': float(values.get('expected') or 0),
+            'collected': float(values.get('collected') or 0),
+            'enrolled_students': values.get('enrolled', 0),
+            'paid_students': values.get('paid', 0),
+        }
+        for month, values in sorted(months.items(), key=lambda item: item[0]) if month is not None
+    ]
+
+
+def detail_rows(decisions):
+    """One row per enrolled decision with its fee, newest enrolment first"""
+    return decisions.order_by(*DETAIL_ORDERING).values(
+        *[lookup for lookup, _ in DETAIL_FIELDS]
+    )
+
+
+def enrollment_fee_entry(row):
+    return {
+        'decision_id': row['id'],
+        'application_id': row['application_id'],
+        'reference_id': row['application__reference_id'],
+        'student_name': row['application__applicant_name'],
+        'course': row['application__course_applied'],
+        'category': row['application__category'],
+        'school_name': row['school__school_name'] or 'Unknown',
+        'class_range': row['class_range'],
+        'fee_amount': float(row['fee_amount']),
+        'payment_status': row['payment_status'],
+        'payment_completed_at': row['payment_completed_at'],
+        'payment_reference': row['payment_reference'],
+        'is_payment_finalized': row['is_payment_finalized'],
+        'enrollment_date': row['enrollment_date'],
+    }
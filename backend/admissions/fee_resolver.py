@@ -0,0 +1,126 @@
+"""
+Process-local resolver for admission fees.
+
+``AdmissionFeeStructure`` is a table of a dozen rows that is read on every
+fee calculation, usually in loops over applications. The resolver keeps
+it as a dict keyed by ``(class_range, category)``. The dict is built on
+first use and dropped whenever a row is saved or deleted (see
+``admissions.signals``). It also expires after ``FEE_TABLE_TTL`` seconds, so
+changes made by other processes or with ``QuerySet.update`` are picked up.
+
+Mapping free-text ``course_applied`` values such as "Class-10" or "11th
+Science" to a class range is pure string work. It is memoized with an LRU
+because the same few dozen spellings repeat across thousands of
+applications.
+"""
+import re
+import threading
+import time
+from functools import lru_cache
+
+from .models import AdmissionFeeStructure
+
+FEE_TABLE_TTL = 300
+COURSE_CACHE_SIZE = 4096
+
+CLASS_NUMBER_RANGES = {
+    '1': '1-8', '2': '1-8', '3': '1-8', '4': '1-8',
+    '5': '1-8', '6': '1-8', '7': '1-8', '8': '1-8',
+    '9': '9-10', '10': '9-10',
+    '11': '11-12', '12': '11-12'
+}
+# Two-digit class numbers are tried before single digits, so "class 12" is not read as "1"
+CLASS_NUMBER_PATTERNS = [
+    re.compile(r'(?:class[-\s]?)?(\d{2})(?:th|st|nd|rd)?'),
+    re.compile(r'(?:class[-\s]?)?(\d{1})(?:th|st|nd|rd)?'),
+]
+
+_lock = threading.Lock()
+_table = None
+_loaded_at = 0.0
+
+
+@lru_cache(maxsize=COURSE_CACHE_SIZE)
+def class_range_for_course(course_applied):
+    """Class range (``AdmissionFeeStructure.CLASS_CHOICES`` key) for a course string, or None"""
+    course_lower = (course_applied or '').lower()
+    if 'nursery' in course_lower:
+        return 'nursery'
+    if 'lkg' in course_lower or 'lower kindergarten' in course_lower:
+        return 'lkg'
+    if 'ukg' in course_lower or 'upper kindergarten' in course_lower or 'kindergarten' in course_lower:
+        return 'ukg'
+    # 11th and 12th come with streams (science, commerce, arts)
+    if '11th' in course_lower or '12th' in course_lower:
+        return '11-12'
+    for pattern in CLASS_NUMBER_PATTERNS:
+        match = pattern.search(course_lower)
+        if match and match.group(1) in CLASS_NUMBER_RANGES:
+            return CLASS_NUMBER_RANGES[match.group(1)]
+    return None
+
+
+def fee_category(category):
+    """Fee table category for an applicant category"""
+    return 'general' if category == 'general' else 'sc_st_obc_sbc'
+
+
+def fee_table():
+    """The whole fee table as ``{(class_range, category): AdmissionFeeStructure}``"""
+    global _table, _loaded_at
+    table = _table
+    if table is not None and time.monotonic() - _loaded_at < FEE_TABLE_TTL:
+        return table
+    with _lock:
+        if _table is None or time.monotonic() - _loaded_at >= FEE_TABLE_TTL:
+            _table = {
+                (structure.class_range, structure.category): structure
+                for structure in AdmissionFeeStructure.objects.all()
+            }
+            _loaded_at = time.monotonic()
+        return _table
+
+
+def invalidate_fee_table():
+    """Drop the cached table so the next lookup reloads it"""
+    global _table
+    with _lock:
+        _table = None
+
+
+def resolve_fee_structure(course_applied, category):
+    """``AdmissionFeeStructure`` for a course and applicant category, or None"""
+    class_range = class_range_for_course(course_applied)
+    if class_range is None:
+        return None
+    return fee_table().get((class_range, fee_category(category)))
+
+
+def fee_amount(course_applied, category):
+    """Admission fee for a course and category, falling back to the default amount"""
+    structure = resolve_fee_structure(course_applied, category)
+    if structure:
+        return float(structure.annual_fee_min)
+    return AdmissionFeeStructure.get_default_fee_amount(category)
+
+
+def bulk_fee_amounts(applications):
+    """
+    Admission fee of each application, in order.
+
+    ``applications`` may hold ``AdmissionApplication`` objects or
+    ``(course_applied, category)`` pairs. The table is read once for the batch.
+    """
+    table = fee_table()
+    amounts = []
+    for application in applications:
+        if isinstance(application, tuple):
+            course_applied, category = application
+        else:
+            course_applied, category = application.course_applied, application.category
+        class_range = class_range_for_course(course_applied)
+        structure = table.get((class_range, fee_category(category))) if class_range else None
+        amounts.append(
+            float(structure.annual_fee_min) if structure else AdmissionFeeStructure.get_default_fee_amount(category)
+        )
+    return amounts
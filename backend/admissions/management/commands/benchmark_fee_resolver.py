@@ -0,0 +1,103 @@
+"""
+Benchmark admission fee lookups through the compiled resolver.
+
+Three ways of pricing the same list of (course, category) pairs are timed:
+
+- ``legacy``    regex normalization and one fee-table query per lookup,
+                as ``AdmissionFeeStructure.get_fee_for_student`` used to do
+                (run on a sample, since it is orders of magnitude slower)
+- ``resolver``  ``fee_amount`` per lookup: LRU-cached normalization and a
+                dict lookup in the process-local fee table
+- ``bulk``      ``bulk_fee_amounts`` over the whole list in one call
+
+The legacy and resolver amounts are compared on the sample.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from admissions.fee_resolver import (
+    bulk_fee_amounts, class_range_for_course, fee_amount, fee_category, invalidate_fee_table
+)
+from admissions.models import AdmissionFeeStructure
+
+COURSE_SPELLINGS = [
+    'Nursery', 'LKG', 'UKG', 'Lower Kindergarten', 'Upper Kindergarten',
+    *[f'Class {number}' for number in range(1, 13)],
+    *[f'class-{number}' for number in range(1, 13)],
+    *[f'{number}th' for number in range(4, 11)],
+    '11th Science', '11th Commerce', '11th Arts', '12th Science', '12th Commerce', '12th Arts',
+]
+CATEGORIES = ['general', 'obc', 'sc', 'st', 'sbc']
+
+
+def legacy_fee_amount(course_applied, category):
+    class_range = class_range_for_course.__wrapped__(course_applied)
+    structure = None
+    if class_range is not None:
+        structure = AdmissionFeeStructure.objects.filter(
+            class_range=class_range, category=fee_category(category)
+        ).first()
+    if structure:
+        return float(structure.annual_fee_min)
+    return AdmissionFeeStructure.get_default_fee_amount(category)
+
+
+class Command(BaseCommand):
+    help = 'Time admission fee lookups through the compiled resolver against per-call queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookups', type=int, default=100_000, help='Lookups for the resolver and bulk runs')
+        parser.add_argument('--legacy-lookups', type=int, default=5_000, help='Lookups for the legacy run')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the course/category mix')
+
+    def handle(self, *args, **options):
+        lookups = options['lookups']
+        legacy_lookups = min(options['legacy_lookups'], lookups)
+        if lookups < 1 or legacy_lookups < 0:
+            raise CommandError('--lookups must be positive and --legacy-lookups not negative')
+
+        rng = random.Random(options['seed'])
+        pairs = [(rng.choice(COURSE_SPELLINGS), rng.choice(CATEGORIES)) for _ in range(lookups)]
+        self.stdout.write(
+            f'{AdmissionFeeStructure.objects.count()} fee rows, {lookups} lookups '
+            f'over {len(COURSE_SPELLINGS)} course spellings x {len(CATEGORIES)} categories'
+        )
+
+        results = {}
+        if legacy_lookups:
+            sample = pairs[:legacy_lookups]
+            results['legacy'] = self._measure(lambda: [legacy_fee_amount(*pair) for pair in sample], len(sample))
+        invalidate_fee_table()
+        class_range_for_course.cache_clear()
+        results['resolver'] = self._measure(lambda: [fee_amount(*pair) for pair in pairs], lookups)
+        results['bulk'] = self._measure(lambda: bulk_fee_amounts(pairs), lookups)
+
+        if legacy_lookups and results['legacy']['amounts'] != results['resolver']['amounts'][:legacy_lookups]:
+            raise CommandError('Resolver amounts differ from the legacy lookup')
+
+        self.stdout.write(f'{"method":>10} {"lookups":>9} {"total ms":>10} {"us/lookup":>10} {"queries":>8}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:>10} {result["lookups"]:>9} {result["ms"]:>10.1f} '
+                f'{result["ms"] * 1000 / result["lookups"]:>10.2f} {result["queries"]:>8}'
+            )
+        info = class_range_for_course.cache_info()
+        self.stdout.write(f'Course normalization cache: {info.hits} hits, {info.misses} misses, {info.currsize} entries')
+        if legacy_lookups:
+            speedup = (results['legacy']['ms'] / results['legacy']['lookups']) / (
+                results['resolver']['ms'] / results['resolver']['lookups']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Resolver matches the legacy lookup and is {speedup:.0f}x faster per lookup'
+            ))
+
+    def _measure(self, run, lookups):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            amounts = run()
+            elapsed = (time.perf_counter() - started) * 1000
+        return {'lookups': lookups, 'ms': elapsed, 'queries': len(queries.captured_queries), 'amounts': amounts}
@@ -815,61 +815,8 @@ class AdmissionFeeStructure(models.Model):
     @classmethod
     def get_fee_for_student(cls, course_applied, category):
         """Calculate fee for a student based on their course and category"""
-        import re
-        
-        # Handle special cases first
-        course_lower = course_applied.lower()
-        
-        # Check for pre-primary classes first
-        if 'nursery' in course_lower:
-            class_range = 'nursery'
-        elif 'lkg' in course_lower or 'lower kindergarten' in course_lower:
-            class_range = 'lkg'
-        elif 'ukg' in course_lower or 'upper kindergarten' in course_lower or 'kindergarten' in course_lower:
-            class_range = 'ukg'
-        # Handle 11th and 12th with streams (science, commerce, arts)
-        elif '11th' in course_lower or '12th' in course_lower:
-            class_range = '11-12'
-        else:
-            # Map course to class range
-            class_mapping = {
-                '1': '1-8', '2': '1-8', '3': '1-8', '4': '1-8', 
-                '5': '1-8', '6': '1-8', '7': '1-8', '8': '1-8',
-                '9': '9-10', '10': '9-10',
-                '11': '11-12', '12': '11-12'
-            }
-            
-            # Extract class number from course_applied using regex
-            class_number = None
-            
-            # Look for patterns like "class-12", "class 12", "12", "12th", etc.
-            # Try to match 2-digit numbers first (11, 12), then single digits
-            patterns = [
-                r'(?:class[-\s]?)?(\d{2})(?:th|st|nd|rd)?',  # Matches "class-12", "12th", etc.
-                r'(?:class[-\s]?)?(\d{1})(?:th|st|nd|rd)?'   # Matches "class-9", "9th", etc.
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, course_lower)
-                if match:
-                    potential_class = match.group(1)
-                    if potential_class in class_mapping:
-                        class_number = potential_class
-                        break
-            
-            if not class_number:
-                return None
-            
-            class_range = class_mapping[class_number]
-        
-        # Map student category to fee category
-        fee_category = 'general' if category == 'general' else 'sc_st_obc_sbc'
-        
-        try:
-            fee_structure = cls.objects.get(class_range=class_range, category=fee_category)
-            return fee_structure
-        except cls.DoesNotExist:
-            return None
+        from .fee_resolver import resolve_fee_structure
+        return resolve_fee_structure(course_applied, category)
     
     @classmethod
     def get_default_fee_amount(cls, category='general'):
@@ -883,8 +830,5 @@ class AdmissionFeeStructure(models.Model):
     @classmethod
     def get_fee_amount_for_student(cls, course_applied, category):
         """Get the admission fee amount for a student, with fallback to default"""
-        fee_structure = cls.get_fee_for_student(course_applied, category)
-        if fee_structure:
-            return float(fee_structure.annual_fee_min)
-        else:
-            return cls.get_default_fee_amount(category)
+        from .fee_resolver import fee_amount
+        return fee_amount(course_applied, category)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import AdmissionFeeStructure
+from .fee_resolver import invalidate_fee_table
+
+
+@receiver(post_save, sender=AdmissionFeeStructure)
+@receiver(post_delete, sender=AdmissionFeeStructure)
+def reload_fee_table(sender, **kwargs):
+    """Drop the cached fee table when a fee row changes"""
+    invalidate_fee_table()
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import render
 
 from rest_framework import viewsets, status
@@ -12,6 +13,7 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 import os
 import logging
+from datetime import date
 from schools.models import School
 from .models import AdmissionApplication, EmailVerification, SchoolAdmissionDecision
 from .serializers import (
@@ -27,6 +29,12 @@ from .serializers import (
     AdmissionApplicationWithDecisionsSerializer
 )
 from .email_service import send_otp_email, send_admission_confirmation_email
+from .fee_reports import (
+    DETAIL_FIELDS, collection_breakdown, collection_summary, detail_rows, enrolled_decisions,
+    enrollment_fee_entry, monthly_series
+)
+from utils.api_responses import StandardPagination
+from utils.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, streaming_export_response
 
 logger = logging.getLogger(__name__)
 
@@ -658,6 +666,8 @@ class FeePaymentInitAPIView(APIView):
                         'total_fee': str(total_amount)
                     },
                     'payment_methods': ['online', 'card', 'bank_transfer'],
+                    # 'gateway': the payment counts once the gateway's signed webhook confirms it
+                    'payment_confirmation': 'client' if settings.PAYMENT_CLIENT_COMPLETION else 'gateway',
                     'due_date': (timezone.now() + timezone.timedelta(days=30)).strftime('%Y-%m-%d')
                 }
             })
@@ -820,6 +830,9 @@ class EnrollmentAPIView(APIView):
         try:
             decision_id = request.data.get('decision_id')
             payment_reference = request.data.get('payment_reference', '')
+            if not settings.PAYMENT_CLIENT_COMPLETION:
+                # The gateway webhook records the payment against the enrolment
+                payment_reference = ''
             
             if not decision_id:
                 return Response({
@@ -1089,6 +1102,11 @@ class PaymentFinalizationAPIView(APIView):
     
     def post(self, request):
         """Finalize payment - makes enrollment non-refundable and sends receipt email"""
+        if not settings.PAYMENT_CLIENT_COMPLETION:
+            return Response({
+                'success': False,
+                'message': 'Payments are finalized when the payment gateway confirms them'
+            }, status=status.HTTP_403_FORBIDDEN)
         try:
             decision_id = request.data.get('decision_id')
             
@@ -1327,81 +1345,86 @@ class AdmissionFeeAPIView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Get fee structure and enrollment fees data"""
+        """
+        Admission fee collection report.
+
+        Query params: optional date_from/date_to (YYYY-MM-DD, on the enrolment
+        date), school (id, for users not tied to a school), page/page_size for
+        the enrollment_fees list, and file_format=csv|xlsx to download the
+        full list instead.
+        """
+        if request.user.role not in ['admin', 'management'] and not request.user.is_superuser:
+            return Response({
+                'success': False,
+                'message': 'Only administrators can view fee collection reports'
+            }, status=status.HTTP_403_FORBIDDEN)
+        try:
+            date_from = date.fromisoformat(request.query_params['date_from']) if request.query_params.get('date_from') else None
+            date_to = date.fromisoformat(request.query_params['date_to']) if request.query_params.get('date_to') else None
+            school_id = int(request.query_params['school']) if request.query_params.get('school') else None
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'school must be an integer and dates YYYY-MM-DD'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # School staff only ever see their own school
+        school = request.user.school or (School.objects.filter(id=school_id).first() if school_id else None)
+        if school_id and school is None:
+            return Response({'success': False, 'message': 'School not found'}, status=status.HTTP_404_NOT_FOUND)
+        decisions = enrolled_decisions(school, date_from, date_to)
+
+        file_format = request.query_params.get('file_format')
+        if file_format:
+            if file_format not in EXPORT_FORMATS:
+                return Response({
+                    'success': False,
+                    'message': f"Unsupported file_format '{file_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            rows = detail_rows(decisions).values_list(*[lookup for lookup, _ in DETAIL_FIELDS])
+            return streaming_export_response(
+                [label for _, label in DETAIL_FIELDS], rows.iterator(chunk_size=EXPORT_CHUNK_SIZE),
+                'admission_fees', file_format
+            )
+
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(detail_rows(decisions), request, view=self)
+        
         try:
             from .models import AdmissionFeeStructure
             
-            # Get all fee structures
-            fee_structures = AdmissionFeeStructure.objects.all()
-            fee_structure_data = []
-            
-            for fee in fee_structures:
-                fee_structure_data.append({
+            fee_structure_data = [
+                {
                     'class_range': fee.class_range,
                     'category': fee.category,
                     'annual_fee_min': float(fee.annual_fee_min),
                     'annual_fee_max': float(fee.annual_fee_max) if fee.annual_fee_max else None,
                     'display_name': str(fee)
-                })
-            
-            # Get enrolled students with their fee information
-            enrolled_applications = AdmissionApplication.objects.filter(
-                school_decisions__enrollment_status='enrolled'
-            ).select_related('first_preference_school', 'second_preference_school', 'third_preference_school').prefetch_related('school_decisions')
-            
-            enrollment_fees = []
-            total_expected = 0
-            total_collected = 0
-            
-            for application in enrolled_applications:
-                # Find the enrolled decision
-                enrolled_decision = application.school_decisions.filter(enrollment_status='enrolled').first()
-                
-                if enrolled_decision:
-                    # Calculate fee for this student based on their course and category
-                    fee_structure = AdmissionFeeStructure.get_fee_for_student(
-                        application.course_applied, 
-                        application.category
-                    )
-                    
-                    fee_amount = float(fee_structure.annual_fee_min) if fee_structure else 0
-                    total_expected += fee_amount
-                    
-                    if enrolled_decision.payment_status == 'completed':
-                        total_collected += fee_amount
-                    
-                    enrollment_fees.append({
-                        'application_id': application.id,
-                        'reference_id': application.reference_id,
-                        'student_name': application.applicant_name,
-                        'course': application.course_applied,
-                        'category': application.category,
-                        'school_name': enrolled_decision.school.school_name if enrolled_decision.school else 'Unknown',
-                        'fee_amount': fee_amount,
-                        'payment_status': enrolled_decision.payment_status,
-                        'payment_completed_at': enrolled_decision.payment_completed_at,
-                        'payment_reference': enrolled_decision.payment_reference,
-                        'is_payment_finalized': enrolled_decision.is_payment_finalized,
-                        'enrollment_date': enrolled_decision.enrollment_date
-                    })
+                }
+                for fee in AdmissionFeeStructure.objects.all()
+            ]
             
             return Response({
                 'success': True,
                 'data': {
                     'fee_structures': fee_structure_data,
-                    'enrollment_fees': enrollment_fees,
-                    'statistics': {
-                        'total_expected': total_expected,
-                        'total_collected': total_collected,
-                        'pending_amount': total_expected - total_collected,
-                        'collection_rate': (total_collected / total_expected * 100) if total_expected > 0 else 0,
-                        'total_students': len(enrollment_fees),
-                        'paid_students': len([f for f in enrollment_fees if f['payment_status'] == 'completed'])
+                    'enrollment_fees': [enrollment_fee_entry(row) for row in page],
+                    'statistics': collection_summary(decisions),
+                    'breakdown': collection_breakdown(decisions),
+                    'monthly': monthly_series(decisions),
+                    'pagination': {
+                        'count': paginator.page.paginator.count,
+                        'next': paginator.get_next_link(),
+                        'previous': paginator.get_previous_link(),
+                        'page_size': paginator.get_page_size(request),
+                        'total_pages': paginator.page.paginator.num_pages,
+                        'current_page': paginator.page.number
                     }
                 }
             })
             
         except Exception as e:
+            logger.exception('Error building admission fee report')
             return Response({
                 'success': False,
                 'message': f'Error fetching fee data: {str(e)}'
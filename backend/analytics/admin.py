@@ -1,3 +1,21 @@
 from django.contrib import admin
+from .models import AttendanceReport, StudentAttendanceStat
 
-# Register your models here.
+
+@admin.register(AttendanceReport)
+class AttendanceReportAdmin(admin.ModelAdmin):
+    """Admin configuration for AttendanceReport model"""
+    
+    list_display = ['school', 'term_start', 'term_end', 'students', 'below_threshold', 'school_rate', 'generated_at']
+    list_filter = ['school', 'term_end']
+    readonly_fields = ['generated_at']
+
+
+@admin.register(StudentAttendanceStat)
+class StudentAttendanceStatAdmin(admin.ModelAdmin):
+    """Admin configuration for StudentAttendanceStat model"""
+    
+    list_display = ['student', 'subject', 'sessions', 'attended', 'rate', 'recent_rate', 'trend', 'below_threshold', 'notified_at']
+    list_filter = ['below_threshold', 'report__school']
+    search_fields = ['student__first_name', 'student__last_name', 'student__admission_number', 'subject']
+    raw_id_fields = ['report', 'student']
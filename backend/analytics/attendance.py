@@ -0,0 +1,329 @@
+"""
+School-wide attendance analytics for a term.
+
+Attendance records are streamed from the database as
+``(student_id, subject, status, date)`` tuples and packed chunk by chunk into
+NumPy structured arrays. Each chunk is reduced with ``np.bincount`` into dense
+count matrices:
+
+- sessions/attended per (student, subject), for term rates
+- sessions/attended per (student, day), for rolling-window trends
+
+Memory therefore depends on roster size x subjects x term length, never on
+the number of records, so a term with 10M records is processed in the same
+footprint as one with 10k. Results go to ``AttendanceReport`` /
+``StudentAttendanceStat`` and students who fall below the threshold get a
+targeted notice.
+
+Late counts as attended. Excused sessions are left out of the rate entirely.
+"""
+import logging
+from itertools import islice
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from attendance.models import AttendanceRecord, ClassSession
+from notifications.models import Notice, UserNotification
+from users.models import StudentProfile
+from .models import AttendanceReport, StudentAttendanceStat, ATTENDANCE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_DAYS = 14
+DEFAULT_MIN_SESSIONS = 5
+DEFAULT_CHUNK_ROWS = 200_000
+WRITE_BATCH_SIZE = 1000
+
+STATUS_CODES = {status: code for code, (status, _) in enumerate(AttendanceRecord.STATUS_CHOICES)}
+ATTENDED_CODES = np.array([STATUS_CODES['present'], STATUS_CODES['late']], dtype=np.int8)
+EXCLUDED_CODES = np.array([STATUS_CODES['excused']], dtype=np.int8)
+ROW_DTYPE = np.dtype([('student', np.int64), ('subject', np.int32), ('status', np.int8), ('day', np.int32)])
+
+
+def iter_attendance_chunks(rows, subjects, term_start, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Pack ``(student_id, subject, status, date)`` rows into ``ROW_DTYPE`` arrays of ``chunk_rows``.
+
+    Subjects and statuses become integer codes (-1 if unknown) and dates become
+    day offsets from ``term_start``.
+    """
+    rows = iter(rows)
+    subject_codes = {subject: code for code, subject in enumerate(subjects)}
+    first_day = term_start.toordinal()
+    while True:
+        chunk = np.fromiter(
+            (
+                (student_id, subject_codes.get(subject, -1), STATUS_CODES.get(status, -1), day.toordinal() - first_day)
+                for student_id, subject, status, day in islice(rows, chunk_rows)
+            ),
+            dtype=ROW_DTYPE
+        )
+        if not len(chunk):
+            return
+        yield chunk
+
+
+class AttendanceAccumulator:
+    """Dense per-student count matrices built from record chunks"""
+
+    def __init__(self, student_ids, n_subjects, n_days):
+        self.student_ids = student_ids
+        self.n_students = len(student_ids)
+        self.n_subjects = n_subjects
+        self.n_days = n_days
+        self.sessions = np.zeros((self.n_students, n_subjects), dtype=np.int64)
+        self.attended = np.zeros((self.n_students, n_subjects), dtype=np.int64)
+        self.daily_sessions = np.zeros((self.n_students, n_days), dtype=np.int32)
+        self.daily_attended = np.zeros((self.n_students, n_days), dtype=np.int32)
+        self.records = 0
+        self.skipped = 0
+
+    def _count(self, flat_index, mask, width):
+        counts = np.bincount(flat_index[mask], minlength=self.n_students * width)
+        return counts.reshape(self.n_students, width)
+
+    def add(self, chunk):
+        self.records += len(chunk)
+        if not self.n_students:
+            self.skipped += len(chunk)
+            return
+        index = np.searchsorted(self.student_ids, chunk['student'])
+        index = np.minimum(index, self.n_students - 1)
+        keep = (
+            (self.student_ids[index] == chunk['student'])
+            & (chunk['subject'] >= 0) & (chunk['status'] >= 0)
+            & (chunk['day'] >= 0) & (chunk['day'] < self.n_days)
+        )
+        self.skipped += int(len(chunk) - keep.sum())
+        counted = keep & ~np.isin(chunk['status'], EXCLUDED_CODES)
+        attended = counted & np.isin(chunk['status'], ATTENDED_CODES)
+
+        by_subject = index * self.n_subjects + chunk['subject']
+        self.sessions += self._count(by_subject, counted, self.n_subjects)
+        self.attended += self._count(by_subject, attended, self.n_subjects)
+
+        by_day = index * self.n_days + chunk['day']
+        self.daily_sessions += self._count(by_day, counted, self.n_days).astype(np.int32)
+        self.daily_attended += self._count(by_day, attended, self.n_days).astype(np.int32)
+
+    def results(self, window_days):
+        """Rates in percent (NaN where a student had no sessions) plus last-window rate and trend"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            subject_rate = self.attended * 100.0 / self.sessions
+            overall_sessions = self.sessions.sum(axis=1)
+            overall_attended = self.attended.sum(axis=1)
+            overall_rate = overall_attended * 100.0 / overall_sessions
+
+            # Rolling sums from cumulative sums: any window is a difference of two columns
+            zero = np.zeros((self.n_students, 1), dtype=np.int64)
+            cum_sessions = np.hstack([zero, np.cumsum(self.daily_sessions, axis=1, dtype=np.int64)])
+            cum_attended = np.hstack([zero, np.cumsum(self.daily_attended, axis=1, dtype=np.int64)])
+            end = self.n_days
+            middle = max(end - window_days, 0)
+            start = max(end - 2 * window_days, 0)
+            recent_rate = (cum_attended[:, end] - cum_attended[:, middle]) * 100.0 / (
+                cum_sessions[:, end] - cum_sessions[:, middle]
+            )
+            previous_rate = (cum_attended[:, middle] - cum_attended[:, start]) * 100.0 / (
+                cum_sessions[:, middle] - cum_sessions[:, start]
+            )
+
+        return {
+            'sessions': self.sessions,
+            'attended': self.attended,
+            'subject_rate': subject_rate,
+            'overall_sessions': overall_sessions,
+            'overall_attended': overall_attended,
+            'overall_rate': overall_rate,
+            'recent_rate': recent_rate,
+            'trend': recent_rate - previous_rate,
+        }
+
+
+def compute_attendance_stats(rows, student_ids, subjects, term_start, term_end,
+                             window_days=DEFAULT_WINDOW_DAYS, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Reduce a record stream to per-student/per-subject rates and trends. ``student_ids`` must be sorted."""
+    n_days = (term_end - term_start).days + 1
+    accumulator = AttendanceAccumulator(student_ids, len(subjects), n_days)
+    for chunk in iter_attendance_chunks(rows, subjects, term_start, chunk_rows):
+        accumulator.add(chunk)
+    result = accumulator.results(window_days)
+    result['records'] = accumulator.records
+    result['skipped'] = accumulator.skipped
+    return result
+
+
+def _rounded(value):
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _stat_rows(report, student_ids, subjects, stats, threshold, min_sessions, notified):
+    """Yield overall and per-subject ``StudentAttendanceStat`` rows for students with sessions"""
+    below = (stats['overall_rate'] < threshold) & (stats['overall_sessions'] >= min_sessions)
+    for i in np.flatnonzero(stats['overall_sessions']):
+        student_id = int(student_ids[i])
+        yield StudentAttendanceStat(
+            report=report,
+            student_id=student_id,
+            subject='',
+            sessions=int(stats['overall_sessions'][i]),
+            attended=int(stats['overall_attended'][i]),
+            rate=_rounded(stats['overall_rate'][i]),
+            recent_rate=_rounded(stats['recent_rate'][i]),
+            trend=_rounded(stats['trend'][i]),
+            below_threshold=bool(below[i]),
+            notified_at=notified.get(student_id),
+        )
+        for j in np.flatnonzero(stats['sessions'][i]):
+            rate = stats['subject_rate'][i, j]
+            yield StudentAttendanceStat(
+                report=report,
+                student_id=student_id,
+                subject=subjects[j],
+                sessions=int(stats['sessions'][i, j]),
+                attended=int(stats['attended'][i, j]),
+                rate=_rounded(rate),
+                below_threshold=bool(rate < threshold and stats['sessions'][i, j] >= min_sessions),
+            )
+
+
+def run_school_attendance_analytics(school, term_start, term_end, threshold=ATTENDANCE_THRESHOLD,
+                                    window_days=DEFAULT_WINDOW_DAYS, min_sessions=DEFAULT_MIN_SESSIONS,
+                                    chunk_rows=DEFAULT_CHUNK_ROWS, notify=True):
+    """
+    Compute and store a school's attendance report for a term, then notify students below the threshold.
+
+    Re-running for the same term replaces the report; students who were already
+    notified for the term are not notified again.
+    """
+    student_ids = np.fromiter(
+        StudentProfile.objects.filter(school=school).order_by('id').values_list('id', flat=True),
+        dtype=np.int64
+    )
+    subjects = sorted(set(ClassSession.objects.filter(
+        school=school, date__gte=term_start, date__lte=term_end
+    ).values_list('subject', flat=True)))
+    rows = AttendanceRecord.objects.filter(
+        session__school=school, session__date__gte=term_start, session__date__lte=term_end
+    ).values_list('student_id', 'session__subject', 'status', 'session__date').iterator(chunk_size=10000)
+
+    stats = compute_attendance_stats(rows, student_ids, subjects, term_start, term_end, window_days, chunk_rows)
+    total_sessions = int(stats['overall_sessions'].sum())
+    school_rate = round(float(stats['overall_attended'].sum()) * 100 / total_sessions, 2) if total_sessions else None
+
+    with transaction.atomic():
+        report, _ = AttendanceReport.objects.update_or_create(
+            school=school, term_start=term_start, term_end=term_end,
+            defaults={
+                'threshold': threshold,
+                'window_days': window_days,
+                'records_processed': stats['records'],
+                'school_rate': school_rate,
+            }
+        )
+        notified = dict(report.student_stats.filter(
+            subject='', notified_at__isnull=False
+        ).values_list('student_id', 'notified_at'))
+        report.student_stats.all().delete()
+
+        batch = []
+        students = below = 0
+        for stat in _stat_rows(report, student_ids, subjects, stats, threshold, min_sessions, notified):
+            if not stat.subject:
+                students += 1
+                below += stat.below_threshold
+            batch.append(stat)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                StudentAttendanceStat.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            StudentAttendanceStat.objects.bulk_create(batch)
+
+        report.students = students
+        report.below_threshold = below
+        report.save(update_fields=['students', 'below_threshold'])
+
+    notices = notify_low_attendance(report) if notify else 0
+    return {
+        'report': report,
+        'records': stats['records'],
+        'skipped': stats['skipped'],
+        'students': students,
+        'below_threshold': below,
+        'notices': notices,
+    }
+
+
+def _notice_sender(school):
+    User = get_user_model()
+    return (
+        User.objects.filter(school=school, role='admin', is_active=True).order_by('id').first()
+        or User.objects.filter(is_superuser=True, is_active=True).order_by('id').first()
+    )
+
+
+def notify_low_attendance(report):
+    """
+    Send a personal notice to every student below the threshold who was not notified yet for this term,
+    plus one summary notice to the school's admins and management. Returns the number of students notified.
+    """
+    pending = list(report.student_stats.filter(
+        subject='', below_threshold=True, notified_at__isnull=True, student__user__isnull=False
+    ).select_related('student'))
+    if not pending:
+        return 0
+
+    sender = _notice_sender(report.school)
+    if sender is None:
+        logger.warning(f"No admin user to send low attendance notices for {report.school}; skipping")
+        return 0
+
+    weak_subjects = {}
+    for student_id, subject, rate in report.student_stats.filter(
+        student_id__in=[stat.student_id for stat in pending], below_threshold=True
+    ).exclude(subject='').order_by('student_id', 'rate').values_list('student_id', 'subject', 'rate'):
+        weak_subjects.setdefault(student_id, []).append(f"{subject} ({rate:.1f}%)")
+
+    now = timezone.now()
+    period = f"{report.term_start:%d %b %Y} to {report.term_end:%d %b %Y}"
+    notices = []
+    for stat in pending:
+        content = (
+            f"Your attendance from {period} is {stat.rate:.1f}%, below the required {report.threshold:.0f}%."
+        )
+        if stat.student_id in weak_subjects:
+            content += f" Subjects below the requirement: {', '.join(weak_subjects[stat.student_id])}."
+        notices.append(Notice(
+            school=report.school,
+            title='Low attendance alert',
+            content=content,
+            priority='high',
+            target_roles=[],  # Delivered to the student only, through UserNotification
+            publish_date=now,
+            created_by=sender,
+        ))
+
+    with transaction.atomic():
+        Notice.objects.bulk_create(notices, batch_size=WRITE_BATCH_SIZE)
+        UserNotification.objects.bulk_create(
+            [UserNotification(user_id=stat.student.user_id, notice=notice) for stat, notice in zip(pending, notices)],
+            batch_size=WRITE_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        Notice.objects.create(
+            school=report.school,
+            title='Students below attendance requirement',
+            content=(
+                f"{report.below_threshold} of {report.students} students are below {report.threshold:.0f}% "
+                f"attendance for {period}. {len(pending)} were notified in this run."
+            ),
+            priority='high',
+            target_roles=['admin', 'management'],
+            publish_date=now,
+            created_by=sender,
+        )
+        StudentAttendanceStat.objects.filter(id__in=[stat.id for stat in pending]).update(notified_at=now)
+    return len(pending)
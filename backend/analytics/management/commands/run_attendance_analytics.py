@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schools.models import School
+from analytics.attendance import (
+    run_school_attendance_analytics, DEFAULT_WINDOW_DAYS, DEFAULT_MIN_SESSIONS, DEFAULT_CHUNK_ROWS
+)
+from analytics.models import ATTENDANCE_THRESHOLD
+
+
+class Command(BaseCommand):
+    help = 'Compute term attendance rates and trends per student and notify students below the threshold'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school',
+            type=str,
+            help='Only process the school with this school code'
+        )
+        parser.add_argument('--term-start', type=str, help='First day of the term (YYYY-MM-DD, default: 120 days ago)')
+        parser.add_argument('--term-end', type=str, help='Last day of the term (YYYY-MM-DD, default: today)')
+        parser.add_argument('--threshold', type=float, default=ATTENDANCE_THRESHOLD, help='Minimum attendance percentage')
+        parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS, help='Rolling window for trends')
+        parser.add_argument(
+            '--min-sessions',
+            type=int,
+            default=DEFAULT_MIN_SESSIONS,
+            help='Only flag students with at least this many sessions'
+        )
+        parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Records per NumPy chunk')
+        parser.add_argument('--no-notify', action='store_true', help='Compute the report without sending notices')
+
+    def handle(self, *args, **options):
+        try:
+            term_end = date.fromisoformat(options['term_end']) if options['term_end'] else timezone.localdate()
+            term_start = (
+                date.fromisoformat(options['term_start']) if options['term_start'] else term_end - timedelta(days=120)
+            )
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+        if term_start > term_end:
+            raise CommandError('--term-start must not be after --term-end')
+        if options['window_days'] < 1 or options['chunk_rows'] < 1:
+            raise CommandError('--window-days and --chunk-rows must be positive')
+
+        if options['school']:
+            schools = School.objects.filter(school_code=options['school'])
+            if not schools.exists():
+                raise CommandError(f'School "{options["school"]}" does not exist.')
+        else:
+            schools = School.objects.filter(is_active=True)
+
+        started = timezone.now()
+        records = below = notices = 0
+        for school in schools.order_by('id'):
+            result = run_school_attendance_analytics(
+                school, term_start, term_end,
+                threshold=options['threshold'],
+                window_days=options['window_days'],
+                min_sessions=options['min_sessions'],
+                chunk_rows=options['chunk_rows'],
+                notify=not options['no_notify'],
+            )
+            records += result['records']
+            below += result['below_threshold']
+            notices += result['notices']
+            if result['records']:
+                self.stdout.write(
+                    f'{school.school_name}: {result["records"]} records, {result["students"]} students, '
+                    f'{result["below_threshold"]} below {options["threshold"]:g}%, {result["notices"]} notified'
+                )
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nAttendance analytics for {term_start} to {term_end} completed in {elapsed:.1f}s:'
+                f'\n- Records processed: {records}'
+                f'\n- Students below threshold: {below}'
+                f'\n- Students notified: {notices}'
+            )
+        )
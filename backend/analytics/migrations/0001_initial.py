@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('schools', '0001_initial'),
+        ('users', '0011_staffprofile_school'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term_start', models.DateField()),
+                ('term_end', models.DateField()),
+                ('threshold', models.DecimalField(decimal_places=2, default=75, max_digits=5)),
+                ('window_days', models.PositiveIntegerField(default=14)),
+                ('records_processed', models.BigIntegerField(default=0)),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('below_threshold', models.PositiveIntegerField(default=0)),
+                ('school_rate', models.FloatField(blank=True, null=True)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_reports', to='schools.school')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StudentAttendanceStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(blank=True, max_length=100)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('attended', models.PositiveIntegerField(default=0)),
+                ('rate', models.FloatField(blank=True, null=True)),
+                ('recent_rate', models.FloatField(blank=True, null=True)),
+                ('trend', models.FloatField(blank=True, null=True)),
+                ('below_threshold', models.BooleanField(default=False)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_stats', to='analytics.attendancereport')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_stats', to='users.studentprofile')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendancereport',
+            index=models.Index(fields=['school', 'generated_at'], name='analytics_a_school__88c472_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='attendancereport',
+            unique_together={('school', 'term_start', 'term_end')},
+        ),
+        migrations.AddIndex(
+            model_name='studentattendancestat',
+            index=models.Index(fields=['report', 'subject', 'below_threshold'], name='analytics_s_report__5a651b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentattendancestat',
+            index=models.Index(fields=['report', 'subject', 'rate'], name='analytics_s_report__8066cd_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentattendancestat',
+            unique_together={('report', 'student', 'subject')},
+        ),
+    ]
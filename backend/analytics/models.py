@@ -1,3 +1,55 @@
 from django.db import models
 
-# Create your models here.
+ATTENDANCE_THRESHOLD = 75  # Minimum attendance percentage required for a term
+
+
+class AttendanceReport(models.Model):
+    """School-wide attendance analytics for one term, produced by run_attendance_analytics"""
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, related_name='attendance_reports')
+    term_start = models.DateField()
+    term_end = models.DateField()
+    threshold = models.DecimalField(max_digits=5, decimal_places=2, default=ATTENDANCE_THRESHOLD)
+    window_days = models.PositiveIntegerField(default=14)
+    records_processed = models.BigIntegerField(default=0)
+    students = models.PositiveIntegerField(default=0)
+    below_threshold = models.PositiveIntegerField(default=0)
+    school_rate = models.FloatField(null=True, blank=True)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['school', 'term_start', 'term_end']
+        indexes = [
+            models.Index(fields=['school', 'generated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.school.school_name} attendance {self.term_start} - {self.term_end}"
+
+
+class StudentAttendanceStat(models.Model):
+    """
+    One student's attendance in a report, overall (blank subject) or for one subject.
+
+    ``recent_rate`` is the rate over the last ``window_days`` of the term and
+    ``trend`` the change from the window before it, in percentage points.
+    """
+    report = models.ForeignKey(AttendanceReport, on_delete=models.CASCADE, related_name='student_stats')
+    student = models.ForeignKey('users.StudentProfile', on_delete=models.CASCADE, related_name='attendance_stats')
+    subject = models.CharField(max_length=100, blank=True)
+    sessions = models.PositiveIntegerField(default=0)
+    attended = models.PositiveIntegerField(default=0)
+    rate = models.FloatField(null=True, blank=True)
+    recent_rate = models.FloatField(null=True, blank=True)
+    trend = models.FloatField(null=True, blank=True)
+    below_threshold = models.BooleanField(default=False)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['report', 'student', 'subject']
+        indexes = [
+            models.Index(fields=['report', 'subject', 'below_threshold']),
+            models.Index(fields=['report', 'subject', 'rate']),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.subject or 'Overall'}: {self.rate}"
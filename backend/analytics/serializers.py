@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from .models import AttendanceReport, StudentAttendanceStat
+
+
+class AttendanceReportSerializer(serializers.ModelSerializer):
+    """Serializer for AttendanceReport model"""
+    school_name = serializers.CharField(source='school.school_name', read_only=True)
+    
+    class Meta:
+        model = AttendanceReport
+        fields = '__all__'
+
+
+class StudentAttendanceStatSerializer(serializers.ModelSerializer):
+    """Serializer for StudentAttendanceStat model"""
+    student_name = serializers.SerializerMethodField()
+    admission_number = serializers.CharField(source='student.admission_number', read_only=True)
+    course = serializers.CharField(source='student.course', read_only=True)
+    
+    class Meta:
+        model = StudentAttendanceStat
+        exclude = ['report']
+    
+    def get_student_name(self, obj):
+        return f"{obj.student.first_name or ''} {obj.student.last_name or ''}".strip()
@@ -1,3 +1,54 @@
-from django.shortcuts import render
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from utils.api_responses import StandardPagination
+from .models import AttendanceReport
+from .serializers import AttendanceReportSerializer, StudentAttendanceStatSerializer
 
-# Create your views here.
+
+class AttendanceReportViewSet(viewsets.ReadOnlyModelViewSet):
+    """Term attendance reports produced by the run_attendance_analytics job"""
+    serializer_class = AttendanceReportSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        user = self.request.user
+        if user.role not in ['admin', 'management', 'faculty'] and not user.is_superuser:
+            return AttendanceReport.objects.none()
+        
+        queryset = AttendanceReport.objects.select_related('school').order_by('-term_end', '-generated_at')
+        if not user.is_superuser:
+            user_school = None
+            if hasattr(user, 'school') and user.school:
+                user_school = user.school
+            elif hasattr(user, 'staff_profile') and user.staff_profile.school:
+                user_school = user.staff_profile.school
+            queryset = queryset.filter(school=user_school)
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def latest(self, request):
+        """Most recent report for the user's school"""
+        report = self.get_queryset().first()
+        if report is None:
+            return Response({'error': 'No attendance report has been generated yet'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_serializer(report).data)
+    
+    @action(detail=True, methods=['get'])
+    def students(self, request, pk=None):
+        """
+        Per-student rates in a report, lowest first.
+        
+        ?subject=<name> for one subject (overall rates by default), ?below_threshold=true to list only flagged students.
+        """
+        report = self.get_object()
+        stats = report.student_stats.filter(subject=request.query_params.get('subject', '')).select_related('student')
+        if request.query_params.get('below_threshold') == 'true':
+            stats = stats.filter(below_threshold=True)
+        stats = stats.order_by('rate', 'student_id')
+        
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(stats, request, view=self)
+        serializer = StudentAttendanceStatSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
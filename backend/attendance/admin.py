@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ClassSession, AttendanceRecord
+from .models import ClassSession, AttendanceRecord, AttendanceSummary, TimetableSlot, Holiday
 
 
 @admin.register(ClassSession)
@@ -83,5 +83,53 @@ class AttendanceRecordAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(TimetableSlot)
+class TimetableSlotAdmin(admin.ModelAdmin):
+    """Admin configuration for TimetableSlot model"""
+    
+    list_display = ['subject', 'course', 'batch', 'weekday', 'start_time', 'end_time', 'faculty', 'is_active', 'school']
+    list_filter = ['weekday', 'is_active', 'course', 'school']
+    search_fields = ['subject', 'course', 'batch', 'faculty__user__first_name', 'faculty__user__last_name']
+    readonly_fields = ['created_at']
+    
+    def get_queryset(self, request):
+        """Filter timetable by user's school if not superuser"""
+        qs = super().get_queryset(request)
+        if not request.user.is_superuser and hasattr(request.user, 'school'):
+            qs = qs.filter(school=request.user.school)
+        return qs
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    """Admin configuration for Holiday model"""
+    
+    list_display = ['date', 'name', 'school']
+    list_filter = ['school']
+    search_fields = ['name']
+    date_hierarchy = 'date'
+
+
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    """Admin configuration for the daily attendance rollup (maintained automatically)"""
+    
+    list_display = ['student', 'subject', 'date', 'total', 'present', 'absent', 'late', 'excused', 'school']
+    list_filter = ['date', 'school']
+    search_fields = ['student__first_name', 'student__last_name', 'student__admission_number', 'subject']
+    date_hierarchy = 'date'
+    readonly_fields = ['student', 'school', 'subject', 'date', 'total', 'present', 'absent', 'late', 'excused', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        """Filter summaries by user's school if not superuser"""
+        qs = super().get_queryset(request)
+        if not request.user.is_superuser and hasattr(request.user, 'school'):
+            qs = qs.filter(school=request.user.school)
+        return qs
+
+
 # Add the inline to ClassSessionAdmin
 ClassSessionAdmin.inlines = [AttendanceRecordInline]
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schools.models import School
+from attendance.timetable import generate_sessions
+
+
+class Command(BaseCommand):
+    help = 'Expand the weekly timetable into class sessions for a date range, skipping holidays'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school',
+            type=str,
+            help='Only generate sessions for the school with this school code'
+        )
+        parser.add_argument('--start', type=str, help='First date (YYYY-MM-DD, default: today)')
+        parser.add_argument('--end', type=str, help='Last date (YYYY-MM-DD, default: 6 days after --start)')
+        parser.add_argument('--course', type=str, help='Only generate sessions for this course')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be created without saving')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start']) if options['start'] else timezone.localdate()
+            end_date = date.fromisoformat(options['end']) if options['end'] else start_date + timedelta(days=6)
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+        if end_date < start_date:
+            raise CommandError('--end must not be before --start')
+
+        if options['school']:
+            schools = School.objects.filter(school_code=options['school'])
+            if not schools.exists():
+                raise CommandError(f'School "{options["school"]}" does not exist.')
+        else:
+            schools = School.objects.filter(is_active=True)
+
+        planned = created = existing = 0
+        for school in schools.order_by('id'):
+            result = generate_sessions(
+                school, start_date, end_date, course=options['course'], dry_run=options['dry_run']
+            )
+            planned += result['planned']
+            created += result['created']
+            existing += result['existing']
+            if result['planned']:
+                self.stdout.write(
+                    f'{school.school_name}: {result["created"]} new, {result["existing"]} already scheduled, '
+                    f'{result["holidays"]} holidays skipped'
+                )
+
+        label = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nClass sessions for {start_date} to {end_date}:'
+                f'\n- Planned from timetable: {planned}'
+                f'\n- Sessions {label}: {created}'
+                f'\n- Already scheduled: {existing}'
+            )
+        )
@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schools.models import School
+from attendance.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the per-student daily attendance rollup from attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school',
+            type=str,
+            help='Only rebuild the school with this school code'
+        )
+        parser.add_argument('--date-from', type=str, help='First session date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--date-to', type=str, help='Last session date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options['date_from']) if options['date_from'] else None
+            date_to = date.fromisoformat(options['date_to']) if options['date_to'] else None
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+
+        if options['school']:
+            schools = list(School.objects.filter(school_code=options['school']))
+            if not schools:
+                raise CommandError(f'School "{options["school"]}" does not exist.')
+        else:
+            schools = [None]
+
+        started = timezone.now()
+        written = 0
+        for school in schools:
+            written += rebuild_summaries(school, date_from=date_from, date_to=date_to)
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nAttendance rollup rebuilt in {elapsed:.1f}s:'
+                f'\n- Scope: {schools[0].school_name if schools[0] else "all schools"}'
+                f'\n- Date range: {date_from or "start"} to {date_to or "latest"}'
+                f'\n- Summary rows written: {written}'
+            )
+        )
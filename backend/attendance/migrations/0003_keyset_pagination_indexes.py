@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_alter_classsession_unique_together_and_more'),
+        ('schools', '0001_initial'),
+        ('users', '0011_staffprofile_school'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['student', 'session'], name='attendance__student_992f1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classsession',
+            index=models.Index(fields=['date', 'start_time'], name='attendance__date_0a9200_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_keyset_pagination_indexes'),
+        ('schools', '0001_initial'),
+        ('users', '0011_staffprofile_school'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='schools.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='users.studentprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'date'], name='attendance__student_3e387e_idx'), models.Index(fields=['school', 'date'], name='attendance__school__d8b60e_idx')],
+                'unique_together': {('student', 'subject', 'date')},
+            },
+        ),
+    ]
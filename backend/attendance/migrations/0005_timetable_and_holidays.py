@@ -0,0 +1,79 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendancesummary'),
+        ('schools', '0001_initial'),
+        ('users', '0011_staffprofile_school'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TimetableSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course', models.CharField(max_length=100)),
+                ('subject', models.CharField(max_length=100)),
+                ('batch', models.CharField(max_length=50)),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('valid_from', models.DateField(blank=True, null=True)),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='classsession',
+            index=models.Index(fields=['faculty', 'date', 'start_time'], name='attendance__faculty_2e5a4a_idx'),
+        ),
+        migrations.AddField(
+            model_name='holiday',
+            name='school',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='schools.school'),
+        ),
+        migrations.AddField(
+            model_name='timetableslot',
+            name='faculty',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timetable_slots', to='users.staffprofile'),
+        ),
+        migrations.AddField(
+            model_name='timetableslot',
+            name='school',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timetable_slots', to='schools.school'),
+        ),
+        migrations.AddIndex(
+            model_name='holiday',
+            index=models.Index(fields=['date'], name='attendance__date_54d65e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='holiday',
+            unique_together={('school', 'date')},
+        ),
+        migrations.AddIndex(
+            model_name='timetableslot',
+            index=models.Index(fields=['school', 'is_active'], name='attendance__school__7b4b5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableslot',
+            index=models.Index(fields=['faculty', 'weekday'], name='attendance__faculty_434377_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timetableslot',
+            unique_together={('school', 'course', 'subject', 'batch', 'weekday', 'start_time')},
+        ),
+    ]
@@ -20,12 +20,68 @@ class ClassSession(models.Model):
         indexes = [
             models.Index(fields=['school', 'date']),
             models.Index(fields=['school', 'course', 'subject']),
+            models.Index(fields=['date', 'start_time']),  # Keyset ordering of attendance records
+            models.Index(fields=['faculty', 'date', 'start_time']),  # A teacher's classes for a day
         ]
     
     def __str__(self):
         return f"{self.subject} - {self.course} ({self.date}) [{self.school.school_name}]"
 
 
+class TimetableSlot(models.Model):
+    """Weekly recurring class that generate_class_sessions expands into ClassSessions"""
+    
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, related_name='timetable_slots')
+    course = models.CharField(max_length=100)
+    subject = models.CharField(max_length=100)
+    batch = models.CharField(max_length=50)
+    faculty = models.ForeignKey('users.StaffProfile', on_delete=models.CASCADE, related_name='timetable_slots')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    valid_from = models.DateField(null=True, blank=True)  # None = from the start of any term
+    valid_until = models.DateField(null=True, blank=True)  # None = until further notice
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['school', 'course', 'subject', 'batch', 'weekday', 'start_time']
+        indexes = [
+            models.Index(fields=['school', 'is_active']),
+            models.Index(fields=['faculty', 'weekday']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} - {self.course} {self.batch} ({self.get_weekday_display()} {self.start_time})"
+
+
+class Holiday(models.Model):
+    """Day without classes; sessions are not generated on holidays"""
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, null=True, blank=True,
+                               related_name='holidays')  # None = holiday for every school
+    date = models.DateField()
+    name = models.CharField(max_length=100)
+    
+    class Meta:
+        unique_together = ['school', 'date']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+
 class AttendanceRecord(models.Model):
     """Model for individual attendance records"""
     
@@ -47,8 +103,33 @@ class AttendanceRecord(models.Model):
         unique_together = ['session', 'student']
         indexes = [
             models.Index(fields=['session', 'student']),
+            models.Index(fields=['student', 'session']),
             models.Index(fields=['status', 'marked_at']),
         ]
     
     def __str__(self):
         return f"{self.student.user.full_name} - {self.session.subject} ({self.status}) [{self.session.school.school_name}]"
+
+
+class AttendanceSummary(models.Model):
+    """Daily per-subject attendance counts for a student, rolled up from AttendanceRecord"""
+    student = models.ForeignKey('users.StudentProfile', on_delete=models.CASCADE, related_name='attendance_summaries')
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, null=True, blank=True)
+    subject = models.CharField(max_length=100)
+    date = models.DateField()
+    total = models.PositiveIntegerField(default=0)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'subject', 'date']
+        indexes = [
+            models.Index(fields=['student', 'date']),
+            models.Index(fields=['school', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.subject} ({self.date}): {self.present}/{self.total}"
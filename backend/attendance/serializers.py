@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ClassSession, AttendanceRecord
+from .models import ClassSession, AttendanceRecord, TimetableSlot, Holiday
 from users.serializers import StudentProfileSerializer, StaffProfileSerializer
 
 
@@ -13,6 +13,54 @@ class ClassSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
+class TimetableSlotSerializer(serializers.ModelSerializer):
+    """Serializer for TimetableSlot model"""
+    faculty_name = serializers.CharField(source='faculty.user.get_full_name', read_only=True)
+    weekday_display = serializers.CharField(source='get_weekday_display', read_only=True)
+    
+    class Meta:
+        model = TimetableSlot
+        fields = '__all__'
+        read_only_fields = ['school', 'created_at']
+    
+    def validate(self, data):
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time and end_time and end_time <= start_time:
+            raise serializers.ValidationError({'end_time': 'End time must be after start time'})
+        valid_from = data.get('valid_from', getattr(self.instance, 'valid_from', None))
+        valid_until = data.get('valid_until', getattr(self.instance, 'valid_until', None))
+        if valid_from and valid_until and valid_until < valid_from:
+            raise serializers.ValidationError({'valid_until': 'valid_until must not be before valid_from'})
+        return data
+
+
+class HolidaySerializer(serializers.ModelSerializer):
+    """Serializer for Holiday model"""
+    
+    class Meta:
+        model = Holiday
+        fields = '__all__'
+        read_only_fields = ['school']
+
+
+class GenerateSessionsSerializer(serializers.Serializer):
+    """Serializer for expanding the timetable into class sessions"""
+    MAX_DAYS = 366
+    
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    course = serializers.CharField(required=False, allow_blank=True)
+    dry_run = serializers.BooleanField(default=False)
+    
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError({'end_date': 'end_date must not be before start_date'})
+        if (data['end_date'] - data['start_date']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'end_date': f'Cannot generate more than {self.MAX_DAYS} days at once'})
+        return data
+
+
 class AttendanceRecordSerializer(serializers.ModelSerializer):
     """Serializer for AttendanceRecord model"""
     student_name = serializers.CharField(source='student.user.get_full_name', read_only=True)
@@ -45,4 +93,41 @@ class AttendanceMarkSerializer(serializers.Serializer):
         child=serializers.DictField(
             child=serializers.CharField()
         )
-    )
\ No newline at end of file
+    )
+
+class BulkAttendanceMarkSerializer(serializers.Serializer):
+    """Serializer for marking a whole class session in one request"""
+    MAX_STUDENTS = 500
+
+    attendance = serializers.DictField(
+        child=serializers.ChoiceField(choices=AttendanceRecord.STATUS_CHOICES),
+        allow_empty=False,
+        help_text="Map of student profile id to status, e.g. {\"12\": \"present\", \"13\": \"absent\"}"
+    )
+    remarks = serializers.DictField(
+        child=serializers.CharField(allow_blank=True),
+        required=False,
+        help_text="Optional map of student profile id to remarks"
+    )
+
+    def _student_ids(self, value, field):
+        try:
+            return {int(student_id): item for student_id, item in value.items()}
+        except (TypeError, ValueError):
+            raise serializers.ValidationError(f"{field} keys must be student profile ids")
+
+    def validate_attendance(self, value):
+        if len(value) > self.MAX_STUDENTS:
+            raise serializers.ValidationError(f"Cannot mark more than {self.MAX_STUDENTS} students at once")
+        return self._student_ids(value, 'attendance')
+
+    def validate_remarks(self, value):
+        return self._student_ids(value, 'remarks')
+
+    def validate(self, data):
+        unknown = set(data.get('remarks', {})) - set(data['attendance'])
+        if unknown:
+            raise serializers.ValidationError({
+                'remarks': f"Remarks given for students without a status: {sorted(unknown)}"
+            })
+        return data
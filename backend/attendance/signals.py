@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import AttendanceRecord, ClassSession
+from .summaries import refresh_buckets, refresh_session
+
+
+def _bucket_key(record):
+    return (record.student_id, record.session.subject, record.session.date)
+
+
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+def update_attendance_summary(sender, instance, **kwargs):
+    """Keep the student's daily subject rollup in step with single-record changes"""
+    refresh_buckets({_bucket_key(instance)})
+
+
+@receiver(pre_save, sender=ClassSession)
+def remember_session_bucket(sender, instance, **kwargs):
+    """Remember the subject and date a session had before an edit so its old buckets can be refreshed"""
+    if instance.pk:
+        instance._previous_bucket = ClassSession.objects.filter(pk=instance.pk).values_list(
+            'subject', 'date'
+        ).first()
+
+
+@receiver(post_save, sender=ClassSession)
+def move_session_buckets(sender, instance, created, **kwargs):
+    """Move a session's records to the right buckets when its subject or date is edited"""
+    previous = getattr(instance, '_previous_bucket', None)
+    if created or not previous or previous == (instance.subject, instance.date):
+        return
+    refresh_session(instance, subject=previous[0], day=previous[1])
+    refresh_session(instance)
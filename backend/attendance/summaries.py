@@ -0,0 +1,145 @@
+"""
+Per-student attendance rollup.
+
+``AttendanceSummary`` holds one row per (student, subject, day) with the
+number of sessions and the count for each status. Attendance pages read these
+rows instead of counting ``AttendanceRecord`` rows on every request.
+
+The rollup is kept current bucket by bucket: whenever records change, only the
+affected (student, subject, day) buckets are recomputed from the records with
+one grouped aggregate and upserted. Recomputing instead of adding deltas keeps
+it correct when a status is corrected or a record is deleted. The
+``rebuild_attendance_summaries`` command backfills or repairs whole ranges.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import AttendanceRecord, AttendanceSummary
+
+STATUS_FIELDS = [status for status, _ in AttendanceRecord.STATUS_CHOICES]
+WRITE_BATCH_SIZE = 1000
+
+
+def _bucket_counts(records):
+    """Group records into (student, subject, date) buckets with a count per status"""
+    return records.values('student_id', 'session__subject', 'session__date', 'session__school_id').annotate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in STATUS_FIELDS}
+    )
+
+
+def _summary(row):
+    return AttendanceSummary(
+        student_id=row['student_id'],
+        school_id=row['session__school_id'],
+        subject=row['session__subject'],
+        date=row['session__date'],
+        total=row['total'],
+        **{status: row[status] for status in STATUS_FIELDS}
+    )
+
+
+def _save_summaries(summaries):
+    AttendanceSummary.objects.bulk_create(
+        summaries,
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['student', 'subject', 'date'],
+        update_fields=['school', 'total', *STATUS_FIELDS, 'updated_at'],
+    )
+
+
+def refresh_buckets(keys):
+    """
+    Recompute the rollup for ``(student_id, subject, date)`` keys.
+
+    Buckets whose records have all been deleted are removed.
+    """
+    students_by_day = defaultdict(set)
+    for student_id, subject, day in keys:
+        students_by_day[(subject, day)].add(student_id)
+
+    with transaction.atomic():
+        for (subject, day), student_ids in students_by_day.items():
+            records = AttendanceRecord.objects.filter(
+                session__subject=subject, session__date=day, student_id__in=student_ids
+            )
+            summaries = [_summary(row) for row in _bucket_counts(records)]
+            _save_summaries(summaries)
+            emptied = student_ids - {summary.student_id for summary in summaries}
+            if emptied:
+                AttendanceSummary.objects.filter(subject=subject, date=day, student_id__in=emptied).delete()
+
+
+def refresh_session(session, student_ids=None, subject=None, day=None):
+    """Recompute the buckets of a session's students (all of them unless ``student_ids`` is given)"""
+    if student_ids is None:
+        student_ids = AttendanceRecord.objects.filter(session=session).values_list('student_id', flat=True)
+    subject = subject or session.subject
+    day = day or session.date
+    refresh_buckets({(student_id, subject, day) for student_id in student_ids})
+
+
+def rebuild_summaries(school=None, date_from=None, date_to=None):
+    """
+    Rebuild the rollup from scratch for a school and/or date range (everything by default).
+
+    Returns the number of summary rows written.
+    """
+    records = AttendanceRecord.objects.all()
+    summaries = AttendanceSummary.objects.all()
+    if school is not None:
+        records = records.filter(session__school=school)
+        summaries = summaries.filter(school=school)
+    if date_from:
+        records = records.filter(session__date__gte=date_from)
+        summaries = summaries.filter(date__gte=date_from)
+    if date_to:
+        records = records.filter(session__date__lte=date_to)
+        summaries = summaries.filter(date__lte=date_to)
+
+    written = 0
+    with transaction.atomic():
+        summaries.delete()
+        batch = []
+        for row in _bucket_counts(records).order_by().iterator(chunk_size=WRITE_BATCH_SIZE):
+            batch.append(_summary(row))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                _save_summaries(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            _save_summaries(batch)
+            written += len(batch)
+    return written
+
+
+def _percentage(present, total):
+    return round(present / total * 100, 2) if total else 0
+
+
+def student_attendance_summary(student, date_from=None, date_to=None):
+    """
+    Attendance totals and subject-wise breakdown for a student, read from the rollup.
+
+    Returns ``{'total', 'present', 'absent', 'late', 'excused', 'percentage', 'subjects': [...]}``.
+    """
+    rows = AttendanceSummary.objects.filter(student=student)
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+
+    subjects = list(rows.values('subject').annotate(
+        total=Sum('total'),
+        **{status: Sum(status) for status in STATUS_FIELDS}
+    ).order_by('subject'))
+
+    totals = {field: sum(row[field] for row in subjects) for field in ['total', *STATUS_FIELDS]}
+    for row in subjects:
+        row['percentage'] = _percentage(row['present'], row['total'])
+    totals['percentage'] = _percentage(totals['present'], totals['total'])
+    totals['subjects'] = subjects
+    return totals
@@ -0,0 +1,90 @@
+"""
+Expansion of the weekly timetable into dated ClassSessions.
+
+Every active ``TimetableSlot`` produces one session per matching weekday in the
+requested range, minus holidays. Sessions are inserted with
+``bulk_create(ignore_conflicts=True)`` against ClassSession's unique key
+(school, course, subject, batch, date, start_time). Running the generator
+again for an overlapping range only adds the missing sessions.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ClassSession, TimetableSlot, Holiday
+
+WRITE_BATCH_SIZE = 1000
+
+
+def holiday_dates(school, start_date, end_date):
+    """Dates in the range that are holidays for the school, including holidays for every school"""
+    return set(Holiday.objects.filter(
+        Q(school=school) | Q(school__isnull=True),
+        date__gte=start_date,
+        date__lte=end_date
+    ).values_list('date', flat=True))
+
+
+def slot_dates(slot, start_date, end_date):
+    """Every date in the range (clipped to the slot's validity) that falls on the slot's weekday"""
+    first = max(start_date, slot.valid_from) if slot.valid_from else start_date
+    last = min(end_date, slot.valid_until) if slot.valid_until else end_date
+    day = first + timedelta(days=(slot.weekday - first.weekday()) % 7)
+    while day <= last:
+        yield day
+        day += timedelta(days=7)
+
+
+def expand_timetable(slots, start_date, end_date, holidays=()):
+    """Yield unsaved ClassSessions for the slots between the two dates, skipping holidays"""
+    for slot in slots:
+        for day in slot_dates(slot, start_date, end_date):
+            if day in holidays:
+                continue
+            yield ClassSession(
+                school_id=slot.school_id,
+                course=slot.course,
+                subject=slot.subject,
+                batch=slot.batch,
+                date=day,
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+                faculty_id=slot.faculty_id,
+            )
+
+
+def generate_sessions(school, start_date, end_date, course=None, dry_run=False):
+    """
+    Create the school's ClassSessions for a date range from its active timetable.
+
+    Returns a dict with the number of sessions planned, created (or to be
+    created, on a dry run), already present, and holiday dates skipped.
+    """
+    slots = TimetableSlot.objects.filter(school=school, is_active=True).filter(
+        Q(valid_from__isnull=True) | Q(valid_from__lte=end_date),
+        Q(valid_until__isnull=True) | Q(valid_until__gte=start_date)
+    )
+    if course:
+        slots = slots.filter(course=course)
+    holidays = holiday_dates(school, start_date, end_date)
+    sessions = list(expand_timetable(slots, start_date, end_date, holidays))
+
+    existing = set(ClassSession.objects.filter(
+        school=school, date__gte=start_date, date__lte=end_date
+    ).values_list('course', 'subject', 'batch', 'date', 'start_time'))
+    missing = [
+        session for session in sessions
+        if (session.course, session.subject, session.batch, session.date, session.start_time) not in existing
+    ]
+    if not dry_run and missing:
+        # ignore_conflicts still guards against sessions created concurrently since the lookup above
+        with transaction.atomic():
+            ClassSession.objects.bulk_create(missing, batch_size=WRITE_BATCH_SIZE, ignore_conflicts=True)
+
+    return {
+        'planned': len(sessions),
+        'created': len(missing),
+        'existing': len(sessions) - len(missing),
+        'holidays': len(holidays),
+    }
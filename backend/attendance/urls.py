@@ -5,6 +5,8 @@ from . import views
 router = DefaultRouter()
 router.register(r'sessions', views.ClassSessionViewSet)
 router.register(r'records', views.AttendanceRecordViewSet)
+router.register(r'timetable', views.TimetableSlotViewSet, basename='timetable-slot')
+router.register(r'holidays', views.HolidayViewSet, basename='holiday')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,10 +2,82 @@ from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
-from .models import ClassSession, AttendanceRecord
-from .serializers import ClassSessionSerializer, AttendanceRecordSerializer
+from django.db import transaction
+from django.db.models import Q, Count
+from .models import ClassSession, AttendanceRecord, TimetableSlot, Holiday
+from .serializers import (
+    ClassSessionSerializer, AttendanceRecordSerializer, BulkAttendanceMarkSerializer,
+    TimetableSlotSerializer, HolidaySerializer, GenerateSessionsSerializer
+)
+from .summaries import refresh_session
+from .timetable import generate_sessions
+from users.models import StudentProfile
+from utils.exports import ExportMixin
+from utils.pagination import KeysetPagination
+from utils.schools import get_user_school
+
+
+class SchoolTimetableViewSet(viewsets.ModelViewSet):
+    """Base for timetable resources: readable by the school, writable by its admins"""
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_superuser:
+            queryset = queryset.filter(school=get_user_school(self.request.user))
+        return queryset
+
+    def check_admin(self, instance=None):
+        user = self.request.user
+        if user.is_superuser:
+            return
+        if user.role != 'admin':
+            raise PermissionDenied('Only admins can change the timetable')
+        school = get_user_school(user)
+        if instance is not None and (school is None or instance.school_id != school.id):
+            raise PermissionDenied('You can only change entries of your own school')
+
+    def perform_create(self, serializer):
+        self.check_admin()
+        serializer.save(school=get_user_school(self.request.user))
+
+    def perform_update(self, serializer):
+        self.check_admin(serializer.instance)
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        self.check_admin(instance)
+        instance.delete()
+
+
+class TimetableSlotViewSet(SchoolTimetableViewSet):
+    """ViewSet for the weekly timetable"""
+    queryset = TimetableSlot.objects.select_related('faculty__user').order_by('weekday', 'start_time', 'course')
+    serializer_class = TimetableSlotSerializer
+    filter_backends = [filters.SearchFilter]
+    search_fields = ['course', 'subject', 'batch']
+
+    def perform_create(self, serializer):
+        self.check_admin()
+        school = get_user_school(self.request.user)
+        if school is None:
+            raise ValidationError({'school': 'User is not associated with a school'})
+        serializer.save(school=school)
+
+
+class HolidayViewSet(SchoolTimetableViewSet):
+    """ViewSet for the holiday calendar"""
+    queryset = Holiday.objects.order_by('date')
+    serializer_class = HolidaySerializer
+
+    def get_queryset(self):
+        queryset = self.queryset
+        if not self.request.user.is_superuser:
+            # Holidays without a school apply to every school
+            queryset = queryset.filter(Q(school=get_user_school(self.request.user)) | Q(school__isnull=True))
+        return queryset
 
 
 class ClassSessionViewSet(viewsets.ModelViewSet):
@@ -36,14 +108,120 @@ class ClassSessionViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-date', '-start_time')
 
+    @action(detail=False, methods=['post'])
+    def generate(self, request):
+        """Expand the school's weekly timetable into sessions for a date range (admins only)"""
+        if request.user.role != 'admin':
+            return Response({'error': 'Only admins can generate class sessions'}, status=status.HTTP_403_FORBIDDEN)
+        school = get_user_school(request.user)
+        if school is None:
+            return Response({'error': 'User is not associated with a school'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = GenerateSessionsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = generate_sessions(
+            school, data['start_date'], data['end_date'],
+            course=data.get('course') or None,
+            dry_run=data['dry_run']
+        )
+        return Response({'success': True, 'dry_run': data['dry_run'], **result})
+
+    @action(detail=True, methods=['post'])
+    def mark_attendance(self, request, pk=None):
+        """
+        Mark the whole roster of a session in one request.
+
+        Body: {"attendance": {"<student_id>": "present", ...}, "remarks": {"<student_id>": "..."}}
+        Existing records for the session are updated in place, so the request can be re-sent.
+        """
+        if request.user.role not in ['faculty', 'admin']:
+            return Response({'error': 'Only faculty and admins can mark attendance'}, status=status.HTTP_403_FORBIDDEN)
+
+        session = self.get_object()
+        marked_by = getattr(request.user, 'staff_profile', None)
+        if request.user.role == 'faculty' and session.faculty_id != getattr(marked_by, 'id', None):
+            return Response({'error': 'You can only mark attendance for your own sessions'},
+                            status=status.HTTP_403_FORBIDDEN)
+        marked_by = marked_by or session.faculty
+
+        serializer = BulkAttendanceMarkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        statuses = serializer.validated_data['attendance']
+        remarks = serializer.validated_data.get('remarks')
+
+        # One query validates the whole roster against the session's school and course
+        valid_ids = set(StudentProfile.objects.filter(
+            id__in=statuses.keys(),
+            school=session.school,
+            course=session.course,
+            is_active=True
+        ).values_list('id', flat=True))
+        invalid_ids = sorted(set(statuses) - valid_ids)
+        if invalid_ids:
+            return Response({
+                'error': 'Some students are not enrolled in this session\'s course',
+                'invalid_students': invalid_ids
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-class AttendanceRecordViewSet(viewsets.ModelViewSet):
+        records = [
+            AttendanceRecord(
+                session=session,
+                student_id=student_id,
+                status=student_status,
+                marked_by=marked_by,
+                remarks=(remarks or {}).get(student_id, '')
+            )
+            for student_id, student_status in statuses.items()
+        ]
+        update_fields = ['status', 'marked_by']
+        if remarks is not None:
+            update_fields.append('remarks')
+
+        with transaction.atomic():
+            AttendanceRecord.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=['session', 'student'],
+                update_fields=update_fields
+            )
+            # bulk_create sends no signals, so refresh the students' rollup buckets here
+            refresh_session(session, student_ids=statuses.keys())
+            summary = dict(AttendanceRecord.objects.filter(session=session).values('status').annotate(
+                count=Count('id')
+            ).values_list('status', 'count'))
+
+        return Response({
+            'success': True,
+            'session': session.id,
+            'marked': len(records),
+            'summary': {choice: summary.get(choice, 0) for choice, _ in AttendanceRecord.STATUS_CHOICES},
+        })
+
+
+class AttendanceRecordViewSet(ExportMixin, viewsets.ModelViewSet):
     """ViewSet for attendance records"""
     queryset = AttendanceRecord.objects.all()
     serializer_class = AttendanceRecordSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['student', 'session', 'status']
+    pagination_class = KeysetPagination
+    ordering = ['-session__date', '-session__start_time', '-id']
+    export_filename = 'attendance_records'
+    export_fields = [
+        ('session__date', 'Date'),
+        ('session__start_time', 'Start Time'),
+        ('session__course', 'Course'),
+        ('session__subject', 'Subject'),
+        ('session__batch', 'Batch'),
+        ('student__admission_number', 'Admission Number'),
+        ('student__first_name', 'First Name'),
+        ('student__last_name', 'Last Name'),
+        ('status', 'Status'),
+        ('marked_at', 'Marked At'),
+        ('remarks', 'Remarks'),
+    ]
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -66,28 +244,36 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
                 children_ids = parent_profile.children.values_list('id', flat=True)
                 queryset = queryset.filter(student__id__in=children_ids)
         
-        return queryset.select_related('student__user', 'session').order_by('-session__date', '-session__start_time')
+        return queryset.select_related('student__user', 'session', 'marked_by__user').order_by(
+            '-session__date', '-session__start_time'
+        )
 
-    @action(detail=False, methods=['get'])
-    def records(self, request):
-        """Get attendance records with filtering"""
-        student_id = request.query_params.get('student')
-        
+    def filter_records(self, queryset):
+        """Apply the student/date_from/date_to query filters shared by records and export"""
+        student_id = self.request.query_params.get('student')
         if student_id:
             # Filter by specific student
-            queryset = self.get_queryset().filter(student__id=student_id)
-        else:
-            queryset = self.get_queryset()
+            queryset = queryset.filter(student__id=student_id)
         
         # Apply additional filters
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
+        date_from = self.request.query_params.get('date_from')
+        date_to = self.request.query_params.get('date_to')
         
         if date_from:
             queryset = queryset.filter(session__date__gte=date_from)
         if date_to:
             queryset = queryset.filter(session__date__lte=date_to)
         
+        return queryset
+
+    def get_export_queryset(self):
+        return self.filter_records(super().get_export_queryset())
+
+    @action(detail=False, methods=['get'])
+    def records(self, request):
+        """Get attendance records with filtering"""
+        queryset = self.filter_records(self.get_queryset())
+        
         # Paginate results
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -0,0 +1,129 @@
+"""
+Measurement and baseline comparison for the benchmark suite.
+
+``Benchmark`` is used like pytest-benchmark's ``benchmark`` fixture::
+
+    benchmark = Benchmark('library.books', rounds=20)
+    response = benchmark(client.get, '/api/v1/library/books/')
+    benchmark.stats   # {'p50_ms': ..., 'p95_ms': ..., 'queries': ..., 'peak_kib': ...}
+
+so the same scenario can run from ``run_benchmarks`` or from a test. Each
+call is timed over ``rounds`` rounds after ``warmup_rounds`` untimed ones
+(which fill caches and the connection). The query count comes from the
+same rounds, counted by the query metrics middleware's ``QueryRecorder``.
+Peak memory is taken from one more round under ``tracemalloc``, kept apart
+because tracing slows every allocation down and would skew the timings.
+
+Results are compared with a baseline file, a JSON document with the scale
+it was recorded at and the stats of each scenario. A scenario regresses
+when it runs more queries than its baseline, or when its median latency
+or peak memory grows by more than ``tolerance`` plus a small absolute
+slack. Latency is gated on the median because the p95 of a few dozen
+rounds is a single sample, too noisy to fail a build on; p95 and max are
+reported alongside it. Query counts are exact, so any increase fails.
+"""
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+import numpy as np
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from utils.query_metrics import QueryRecorder
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_ROUNDS = 20
+DEFAULT_WARMUP_ROUNDS = 2
+DEFAULT_TOLERANCE = 0.5
+LATENCY_SLACK_MS = 5.0
+MEMORY_SLACK_KIB = 64.0
+
+
+class Benchmark:
+    """Time a callable over several rounds, counting its queries and peak memory (see module docstring)"""
+
+    def __init__(self, name, rounds=DEFAULT_ROUNDS, warmup_rounds=DEFAULT_WARMUP_ROUNDS, using=DEFAULT_DB_ALIAS):
+        self.name = name
+        self.rounds = rounds
+        self.warmup_rounds = warmup_rounds
+        self.connection = connections[using]
+        self.stats = None
+
+    def __call__(self, func, *args, **kwargs):
+        for _ in range(self.warmup_rounds):
+            func(*args, **kwargs)
+
+        timings = []
+        queries = []
+        for _ in range(self.rounds):
+            recorder = QueryRecorder()
+            with self.connection.execute_wrapper(recorder):
+                started = time.perf_counter()
+                result = func(*args, **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(recorder.count)
+
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        p50, p95 = np.percentile(timings, [50, 95])
+        self.stats = {
+            'rounds': self.rounds,
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': max(queries),
+            'peak_kib': round(peak / 1024, 1),
+        }
+        return result
+
+
+def load_baseline(path=BASELINE_PATH):
+    """The baseline stored at ``path``, or None when there is none"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open(encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results, scale, path=BASELINE_PATH):
+    """Store ``{scenario: stats}`` as the baseline for ``scale``"""
+    baseline = {
+        'scale': scale,
+        'recorded_with': {'python': platform.python_version(), 'django': django.get_version()},
+        'scenarios': results,
+    }
+    with Path(path).open('w', encoding='utf-8') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of ``results`` against a baseline's scenarios, as messages.
+
+    Scenarios missing from either side are not compared.
+    """
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline['scenarios'].get(name)
+        if reference is None:
+            continue
+        if stats['queries'] > reference['queries']:
+            regressions.append(f'{name}: {stats["queries"]} queries, baseline {reference["queries"]}')
+        for key, unit, slack in [('p50_ms', 'ms', LATENCY_SLACK_MS), ('peak_kib', 'KiB', MEMORY_SLACK_KIB)]:
+            limit = reference[key] * (1 + tolerance) + slack
+            if stats[key] > limit:
+                regressions.append(
+                    f'{name}: {key} {stats[key]:.1f} {unit}, baseline {reference[key]:.1f} {unit} '
+                    f'(limit {limit:.1f})'
+                )
+    return regressions
@@ -0,0 +1,158 @@
+"""
+Run the endpoint benchmark suite.
+
+Seeds a synthetic data set of the requested scale (``benchmarks.seed``),
+sends every scenario of ``benchmarks.scenarios`` through the test client
+as the matching seeded user, and reports latency percentiles, the query
+count and the peak memory per request. The results are then compared with
+the baseline file; any regression makes the command fail, so it can gate a
+CI job::
+
+    python manage.py run_benchmarks                    # compare with benchmarks/baseline.json
+    python manage.py run_benchmarks --only schools     # one app's scenarios
+    python manage.py run_benchmarks --save-baseline    # record a new baseline
+
+Timings depend on the machine: record the baseline where it is compared.
+
+The suite never touches the configured database: like ``manage.py test``
+it creates a throwaway test database next to it (``test_<name>``, or in
+memory for SQLite), migrates it, seeds it and destroys it afterwards.
+``--keepdb`` keeps the migrated test database for the next run; its
+seeded rows are still removed.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.test import APIClient
+
+from benchmarks.harness import (
+    BASELINE_PATH, DEFAULT_ROUNDS, DEFAULT_TOLERANCE, DEFAULT_WARMUP_ROUNDS, Benchmark, compare, load_baseline,
+    save_baseline
+)
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.seed import DEFAULT_SCALE, clear, seed
+from schools.locations import invalidate_location_tree
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic data, benchmark the hot API endpoints and compare with the stored baseline'
+
+    def add_arguments(self, parser):
+        for key, value in DEFAULT_SCALE.items():
+            parser.add_argument(f'--{key.replace("_", "-")}', dest=key, type=int, default=value,
+                                help=f'Scale: {key.replace("_", " ")} (default {value})')
+        parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP_ROUNDS,
+                            help='Untimed requests per scenario before timing')
+        parser.add_argument('--only', type=str, help='Comma-separated scenario name prefixes, e.g. schools,fees.all')
+        parser.add_argument('--baseline', type=str, default=str(BASELINE_PATH), help='Baseline file')
+        parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Allowed relative growth of median latency and peak memory')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic data')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the throwaway test database (not its data) for the next run')
+
+    def handle(self, *args, **options):
+        scale = {key: options[key] for key in DEFAULT_SCALE}
+        if scale['schools'] < 1 or any(value < 0 for value in scale.values()):
+            raise CommandError('--schools must be positive and the other scale options not negative')
+        if scale['students'] < 1:
+            raise CommandError('--students must be positive: several scenarios are sent as a student')
+        if options['rounds'] < 1 or options['warmup'] < 0 or options['tolerance'] < 0:
+            raise CommandError('--rounds must be positive, --warmup and --tolerance not negative')
+
+        scenarios = SCENARIOS
+        if options['only']:
+            prefixes = tuple(prefix.strip() for prefix in options['only'].split(',') if prefix.strip())
+            scenarios = [scenario for scenario in SCENARIOS if scenario[0].startswith(prefixes)]
+            if not scenarios:
+                raise CommandError(f'No scenario matches --only {options["only"]}')
+
+        baseline = None
+        if not options['save_baseline']:
+            baseline = load_baseline(options['baseline'])
+            if baseline is not None and baseline['scale'] != scale:
+                raise CommandError(
+                    f'The baseline was recorded at scale {baseline["scale"]}; run with the same scale options '
+                    'or record a new baseline with --save-baseline'
+                )
+
+        connection = connections[DEFAULT_DB_ALIAS]
+        database_name = connection.settings_dict['NAME']
+        started = time.perf_counter()
+        self.stdout.write('Creating the benchmark test database...')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=options['keepdb'])
+        try:
+            if clear():
+                self.stdout.write('Removed the data of a previous benchmark run')
+            self.stdout.write('Seeding ' + ', '.join(f'{key}={value}' for key, value in scale.items()) + '...')
+            seeding = time.perf_counter()
+            counts, accounts = seed(scale, random_seed=options['seed'], on_school=self._seeded)
+            self.stdout.write(f'Seeded {sum(counts.values())} rows in {time.perf_counter() - seeding:.1f}s')
+            results = self._run(scenarios, accounts, options)
+        finally:
+            if options['keepdb']:
+                clear()
+            connection.creation.destroy_test_db(database_name, verbosity=0, keepdb=options['keepdb'])
+            # The location tree cache was filled from the test database
+            invalidate_location_tree()
+
+        if options['save_baseline']:
+            previous = load_baseline(options['baseline'])
+            if options['only'] and previous is not None and previous['scale'] == scale:
+                # Re-recording some scenarios keeps the others
+                results = {**previous['scenarios'], **results}
+            save_baseline(results, scale, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(
+                f'\nBaseline of {len(results)} scenarios saved to {options["baseline"]}'
+            ))
+            return
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(
+                f'\nNo baseline at {options["baseline"]}; record one with --save-baseline'
+            ))
+            return
+
+        regressions = compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError(
+                f'{len(regressions)} regressions against {options["baseline"]}:\n- ' + '\n- '.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'\nBenchmarks completed in {time.perf_counter() - started:.1f}s:'
+            f'\n- Scenarios: {len(results)}'
+            f'\n- Regressions: none (tolerance {options["tolerance"]:.0%})'
+        ))
+
+    def _seeded(self, done, counts):
+        self.stdout.write(f'  {done} schools, {sum(counts.values())} rows')
+
+    def _run(self, scenarios, accounts, options):
+        clients = {}
+        results = {}
+        self.stdout.write(
+            f'\n{"scenario":<32} {"p50 ms":>9} {"p95 ms":>9} {"max ms":>9} {"queries":>8} {"peak KiB":>10}'
+        )
+        for name, account, path, params in scenarios:
+            client = clients.get(account)
+            if client is None:
+                client = clients[account] = APIClient()
+                if account is not None:
+                    client.force_authenticate(user=accounts[account])
+
+            def request():
+                response = client.get(path, params)
+                if response.status_code != 200:
+                    raise CommandError(f'{name}: GET {path} returned {response.status_code}')
+                return response
+
+            benchmark = Benchmark(name, rounds=options['rounds'], warmup_rounds=options['warmup'])
+            benchmark(request)
+            stats = results[name] = benchmark.stats
+            self.stdout.write(
+                f'{name:<32} {stats["p50_ms"]:>9.2f} {stats["p95_ms"]:>9.2f} {stats["max_ms"]:>9.2f} '
+                f'{stats["queries"]:>8} {stats["peak_kib"]:>10.1f}'
+            )
+        return results
@@ -0,0 +1,28 @@
+"""
+The hot endpoints measured by ``run_benchmarks``.
+
+Each scenario is ``(name, account, path, query parameters)``. ``account``
+is the role of the seeded user of the first benchmark school sending the
+request (see ``benchmarks.seed.seed``), or None for an anonymous request.
+Names are ``<app>.<endpoint>`` so ``--only`` can select an app.
+"""
+
+SCENARIOS = [
+    ('schools.locations', None, '/api/v1/schools/locations/', {}),
+    ('schools.public', None, '/api/v1/schools/public/', {'district': 'AJMER'}),
+    ('schools.dashboard', 'admin', '/api/v1/schools/dashboard/', {}),
+    ('schools.dashboard_students', 'admin', '/api/v1/schools/dashboard/students/', {}),
+    ('admissions.school_review', 'admin', '/api/v1/admissions/school-review/', {}),
+    ('admissions.fees', 'admin', '/api/v1/admissions/fees/', {}),
+    ('fees.all_payments', 'admin', '/api/v1/fees/invoices/all_payments/', {}),
+    ('fees.student_payments', 'student', '/api/v1/fees/invoices/all_payments/', {}),
+    ('attendance.records', 'faculty', '/api/v1/attendance/records/', {}),
+    ('attendance.student_records', 'student', '/api/v1/attendance/records/records/', {}),
+    ('exams.results', 'faculty', '/api/v1/exams/results/', {}),
+    ('exams.summary', 'student', '/api/v1/exams/results/summary/', {}),
+    ('hostel.rooms', 'warden', '/api/v1/hostel/rooms/', {}),
+    ('hostel.available_for_booking', 'student', '/api/v1/hostel/rooms/available_for_booking/', {}),
+    ('library.books', 'student', '/api/v1/library/books/', {}),
+    ('library.popular', 'student', '/api/v1/library/books/popular/', {}),
+    ('dashboard.admin', 'admin', '/api/v1/dashboard/admin/', {}),
+]
@@ -0,0 +1,336 @@
+"""
+Synthetic data for the benchmark suite.
+
+``seed(scale)`` fills the database with benchmark schools and everything
+that hangs off them, sized by ``scale`` (see ``DEFAULT_SCALE``):
+
+- ``schools`` active schools spread over a few districts and blocks,
+- per school: an admin, a librarian, a warden, one faculty member per
+  ``STUDENTS_PER_FACULTY`` students, ``students`` student accounts with
+  profiles and a term invoice each, ``rooms`` hostel rooms with their beds
+  and ``books`` library books,
+- ``attendance_days`` days of class sessions, one per course and day, with
+  a record for every student of the course,
+- ``exams`` exams per course, with a result for every student of the course,
+- ``applications`` admission applications in total, each naming up to three
+  benchmark schools, with their decision rows.
+
+Every table is written with ``bulk_create``, so no ``save()`` override or
+signal runs: the fields those fill in (reference ids, admission numbers,
+room capacities and fees, grades) are set here, and the attendance
+summaries and exam ranks are rebuilt afterwards. Values come from a seeded
+``random.Random``, so two runs at the same scale write the same data.
+
+Benchmark schools have codes starting with ``BENCHMARK_CODE_PREFIX`` and
+every other seeded row belongs to one of them, so ``clear()`` removes a
+run by deleting its schools. ``run_benchmarks`` seeds a throwaway test
+database, never the configured one.
+"""
+import random
+from datetime import date, time, timedelta
+from itertools import batched
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from admissions.models import AdmissionApplication, SchoolAdmissionDecision
+from attendance.models import AttendanceRecord, ClassSession
+from attendance.summaries import rebuild_summaries
+from exams.grading import assign_grades
+from exams.models import DEFAULT_GRADE_BOUNDARIES, Exam, ExamResult
+from exams.ranking import rank_exam
+from fees.models import FeeInvoice, FeeStructure
+from hostel.models import HostelBed, HostelBlock, HostelRoom
+from library.models import LibraryBook
+from schools.locations import invalidate_location_tree
+from schools.models import School
+from users.models import StaffProfile, StudentProfile, User
+
+BENCHMARK_CODE_PREFIX = 'BENCH'
+SEED_BATCH_SIZE = 1000
+
+DEFAULT_SCALE = {
+    'schools': 5,
+    'students': 200,          # per school
+    'applications': 1000,     # in total
+    'rooms': 60,              # per school
+    'books': 500,             # per school
+    'attendance_days': 20,
+    'exams': 2,               # per course and school
+}
+
+STUDENTS_PER_FACULTY = 40
+ROOMS_PER_BLOCK = 50
+COURSES = ['Class 10', 'Class 11', 'Class 12']
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'English', 'Hindi']
+DISTRICTS = ['AJMER', 'ALWAR', 'BIKANER', 'JAIPUR', 'JODHPUR', 'KOTA', 'UDAIPUR']
+BOOK_CATEGORIES = ['Fiction', 'Science', 'History', 'Mathematics', 'Reference']
+# (room type, beds, annual fee non-AC, annual fee AC), the values HostelRoom.save() sets
+ROOM_TYPES = [('2_beds', 2, 84000, 102000), ('3_beds', 3, 66000, 84000), ('4_beds', 4, 54000, 72000)]
+# Attendance statuses and how often each is drawn
+ATTENDANCE_WEIGHTS = {'present': 85, 'absent': 8, 'late': 5, 'excused': 2}
+
+
+def _insert(model, rows):
+    """``bulk_create`` an iterable of unsaved rows in batches; returns the number inserted"""
+    inserted = 0
+    for batch in batched(rows, SEED_BATCH_SIZE):
+        model.objects.bulk_create(batch)
+        inserted += len(batch)
+    return inserted
+
+
+def _school_codes(count):
+    return [f'{BENCHMARK_CODE_PREFIX}{index:08d}' for index in range(count)]
+
+
+def seed(scale, random_seed=0, on_school=None):
+    """
+    Write a benchmark data set of the given scale (missing keys default to
+    ``DEFAULT_SCALE``) in one transaction.
+
+    ``on_school(done, counts)`` is called after each school with the number
+    of schools seeded so far and the running row counts per table. Returns
+    ``(counts, accounts)``: rows written per table, and users of the first
+    school to send the requests as, by role (``admin``, ``librarian``,
+    ``warden``, ``faculty`` and ``student``, a hostelite).
+    """
+    scale = {**DEFAULT_SCALE, **scale}
+    rng = random.Random(random_seed)
+    marks_rng = np.random.default_rng(random_seed)
+    counts = {}
+
+    def written(label, rows):
+        counts[label] = counts.get(label, 0) + rows
+
+    with transaction.atomic():
+        schools = School.objects.bulk_create([
+            School(
+                school_code=code,
+                school_name=f'Benchmark School {index}',
+                district=DISTRICTS[index % len(DISTRICTS)],
+                block=f'BENCH BLOCK {index % 4}',
+                village=f'BENCH VILLAGE {index % 16}',
+                is_active=True,
+                activated_at=timezone.now(),
+                contact_email=f'{code.lower()}@bench.example.com'
+            )
+            for index, code in enumerate(_school_codes(scale['schools']))
+        ], batch_size=SEED_BATCH_SIZE)
+        written('schools', len(schools))
+
+        accounts = {}
+        for done, school in enumerate(schools, 1):
+            school_accounts = _seed_school(school, scale, rng, marks_rng, written)
+            accounts = accounts or school_accounts
+            if on_school is not None:
+                on_school(done, counts)
+        written('applications', _seed_applications(schools, scale['applications'], rng))
+        invalidate_location_tree()
+    return counts, accounts
+
+
+def _seed_school(school, scale, rng, marks_rng, written):
+    code = school.school_code
+    password = make_password(None)
+    today = timezone.localdate()
+
+    def user(role, number, **fields):
+        username = f'{code.lower()}_{role}{number}'
+        return User(username=username, email=f'{username}@bench.example.com', password=password,
+                    role=role, school=school, **fields)
+
+    faculty_count = max(1, scale['students'] // STUDENTS_PER_FACULTY)
+    staff_users = User.objects.bulk_create(
+        [user('admin', 0, first_name='School', last_name='Administrator'),
+         user('librarian', 0, first_name='Bench', last_name='Librarian'),
+         user('warden', 0, first_name='Bench', last_name='Warden')] +
+        [user('faculty', number, first_name='Faculty', last_name=str(number)) for number in range(faculty_count)]
+    )
+    staff = StaffProfile.objects.bulk_create([
+        StaffProfile(
+            user=staff_user, school=school, employee_id=f'{code}-E{number:04d}',
+            department='Academics' if staff_user.role == 'faculty' else 'Administration',
+            designation=staff_user.role.capitalize(), date_of_joining=today - timedelta(days=365 * (number % 10 + 1)),
+            experience_years=number % 10 + 1
+        )
+        for number, staff_user in enumerate(staff_users)
+    ])
+    faculty = staff[3:]
+
+    student_users = User.objects.bulk_create(
+        [user('student', number, first_name=f'Student{number}', last_name=school.district.title())
+         for number in range(scale['students'])],
+        batch_size=SEED_BATCH_SIZE
+    )
+    students = StudentProfile.objects.bulk_create([
+        StudentProfile(
+            user=student_user, school=school,
+            first_name=student_user.first_name, last_name=student_user.last_name,
+            admission_number=f'B{code[-4:]}{number:05d}', roll_number=str(number + 1),
+            course=COURSES[number % len(COURSES)], department='Science', semester=1,
+            date_of_birth=date(2008, 1, 1) + timedelta(days=rng.randrange(1000)),
+            address=f'{school.village}, {school.district}', emergency_contact='9000000000',
+            is_hostelite=number % 4 == 0, is_active=True
+        )
+        for number, student_user in enumerate(student_users)
+    ], batch_size=SEED_BATCH_SIZE)
+    written('users', len(staff_users) + len(student_users))
+    written('students', len(students))
+
+    by_course = {course: [student for student in students if student.course == course] for course in COURSES}
+    structures = FeeStructure.objects.bulk_create([
+        FeeStructure(school=school, course=course, semester=1, tuition_fee=24000, library_fee=1000,
+                     lab_fee=2000, exam_fee=1000, total_fee=28000)
+        for course in COURSES
+    ])
+    structure_by_course = {structure.course: structure for structure in structures}
+    written('invoices', _insert(FeeInvoice, (
+        FeeInvoice(
+            invoice_number=f'BI{code[-4:]}{number:06d}', student=student,
+            fee_structure=structure_by_course[student.course], description=f'{student.course} term fee',
+            amount=28000, due_date=today + timedelta(days=30), academic_year=today.year,
+            status='paid' if rng.random() < 0.6 else 'pending'
+        )
+        for number, student in enumerate(students)
+    )))
+
+    written('rooms', _seed_hostel(school, staff[2], scale['rooms']))
+    written('books', _insert(LibraryBook, (
+        LibraryBook(
+            school=school, title=f'Benchmark Book {number}', author=f'Author {number % 97}',
+            isbn=f'978{number:010d}', publisher='Bench Press', publication_year=1990 + number % 35,
+            category=BOOK_CATEGORIES[number % len(BOOK_CATEGORIES)], total_copies=copies,
+            available_copies=rng.randint(0, copies), shelf_location=f'S{number % 40}'
+        )
+        for number in range(scale['books'])
+        for copies in [rng.randint(1, 5)]
+    )))
+
+    written('attendance', _seed_attendance(school, faculty, by_course, scale['attendance_days'], today, rng))
+    written('exam_results', _seed_exams(school, faculty, by_course, scale['exams'], today, marks_rng))
+
+    return {
+        'admin': staff_users[0],
+        'librarian': staff_users[1],
+        'warden': staff_users[2],
+        'faculty': staff_users[3],
+        'student': student_users[0],
+    }
+
+
+def _seed_hostel(school, warden, room_count):
+    blocks = HostelBlock.objects.bulk_create([
+        HostelBlock(school=school, name=f'Block {chr(65 + number)}', warden=warden,
+                    total_rooms=min(ROOMS_PER_BLOCK, room_count - number * ROOMS_PER_BLOCK), total_floors=5)
+        for number in range(-(-room_count // ROOMS_PER_BLOCK))
+    ])
+    rooms = HostelRoom.objects.bulk_create([
+        HostelRoom(
+            block=blocks[number // ROOMS_PER_BLOCK], room_number=str(101 + number % ROOMS_PER_BLOCK),
+            room_type=room_type, ac_type='ac' if number % 3 == 0 else 'non_ac', capacity=beds,
+            annual_fee_non_ac=fee_non_ac, annual_fee_ac=fee_ac, floor_number=number % ROOMS_PER_BLOCK // 10
+        )
+        for number in range(room_count)
+        for room_type, beds, fee_non_ac, fee_ac in [ROOM_TYPES[number % len(ROOM_TYPES)]]
+    ], batch_size=SEED_BATCH_SIZE)
+    _insert(HostelBed, (
+        HostelBed(room=room, bed_number=chr(65 + bed))
+        for room in rooms
+        for bed in range(room.capacity)
+    ))
+    for block in blocks:
+        block.total_beds = sum(room.capacity for room in rooms if room.block_id == block.id)
+    HostelBlock.objects.bulk_update(blocks, ['total_beds'])
+    return len(rooms)
+
+
+def _seed_attendance(school, faculty, by_course, days, today, rng):
+    sessions = ClassSession.objects.bulk_create([
+        ClassSession(
+            school=school, course=course, subject=SUBJECTS[day % len(SUBJECTS)], batch='A',
+            date=today - timedelta(days=day + 1), start_time=time(9), end_time=time(10),
+            faculty=faculty[(day + number) % len(faculty)]
+        )
+        for day in range(days)
+        for number, course in enumerate(COURSES)
+    ], batch_size=SEED_BATCH_SIZE)
+    statuses = list(ATTENDANCE_WEIGHTS)
+    weights = list(ATTENDANCE_WEIGHTS.values())
+    records = _insert(AttendanceRecord, (
+        AttendanceRecord(session=session, student=student, marked_by=session.faculty,
+                         status=rng.choices(statuses, weights)[0])
+        for session in sessions
+        for student in by_course[session.course]
+    ))
+    rebuild_summaries(school=school)
+    return records
+
+
+def _seed_exams(school, faculty, by_course, exams_per_course, today, marks_rng):
+    exams = Exam.objects.bulk_create([
+        Exam(
+            school=school, name=f'{subject} test {number + 1}', exam_type='internal', course=course,
+            subject=subject, semester=1, date=today - timedelta(days=7 * (number + 1)), max_marks=100,
+            duration_minutes=90, created_by=faculty[number % len(faculty)]
+        )
+        for course in COURSES
+        for number in range(exams_per_course)
+        for subject in [SUBJECTS[number % len(SUBJECTS)]]
+    ])
+    results = 0
+    for exam in exams:
+        students = by_course[exam.course]
+        marks = np.clip(marks_rng.normal(65, 15, len(students)).round(1), 0, exam.max_marks)
+        grades = assign_grades(marks, exam.max_marks, DEFAULT_GRADE_BOUNDARIES)
+        results += _insert(ExamResult, (
+            ExamResult(exam=exam, student=student, marks_obtained=float(mark), grade=str(grade),
+                       entered_by=exam.created_by)
+            for student, mark, grade in zip(students, marks, grades)
+        ))
+        rank_exam(exam)
+    return results
+
+
+def _seed_applications(schools, count, rng):
+    applications = AdmissionApplication.objects.bulk_create([
+        AdmissionApplication(
+            reference_id=f'BENCHAPP{number:08d}', applicant_name=f'Applicant {number}',
+            date_of_birth=date(2009, 1, 1) + timedelta(days=rng.randrange(1000)),
+            email=f'applicant{number}@bench.example.com', phone_number='9000000000',
+            address='Benchmark address', category=rng.choice(AdmissionApplication.CATEGORY_CHOICES)[0],
+            course_applied=rng.choice(COURSES),
+            first_preference_school=choices[0],
+            second_preference_school=choices[1] if len(choices) > 1 else None,
+            third_preference_school=choices[2] if len(choices) > 2 else None,
+        )
+        for number in range(count)
+        for choices in [rng.sample(schools, min(3, len(schools)))]
+    ], batch_size=SEED_BATCH_SIZE)
+    _insert(SchoolAdmissionDecision, (
+        SchoolAdmissionDecision(
+            application=application, school=school, preference_order=order,
+            decision=decision, decision_date=None if decision == 'pending' else timezone.now()
+        )
+        for application in applications
+        for order, school in zip(['1st', '2nd', '3rd'], [
+            application.first_preference_school, application.second_preference_school,
+            application.third_preference_school
+        ])
+        if school is not None
+        for decision in [rng.choice(['pending', 'pending', 'accepted', 'rejected', 'waitlisted'])]
+    ))
+    return len(applications)
+
+
+def clear():
+    """Delete every benchmark school and, by cascade, all seeded rows. Returns the number of schools removed."""
+    schools = School.objects.filter(school_code__startswith=BENCHMARK_CODE_PREFIX)
+    removed = schools.count()
+    if removed:
+        with transaction.atomic():
+            schools.delete()
+            invalidate_location_tree()
+    return removed
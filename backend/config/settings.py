@@ -70,9 +70,11 @@ INSTALLED_APPS = [
     "analytics",
     "schools",  # New schools app
     "dashboard",  # Dashboard app
+    "benchmarks",  # Endpoint benchmark suite
 ]
 
 MIDDLEWARE = [
+    'utils.query_metrics.QueryMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -147,10 +149,22 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# WAL lets readers run alongside the writer and makes commits cheap, which high-rate
+# inserts such as payment webhooks depend on. The journal mode is stored in the
+# database file itself, so it is opt-in: turning it on converts db.sqlite3 for good.
+SQLITE_WAL = os.getenv('SQLITE_WAL', 'False').lower() == 'true'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock at BEGIN so concurrent transactions (e.g. library
+        # checkouts) queue up instead of failing with "database is locked"
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;' if SQLITE_WAL else '',
+        },
     }
 }
 
@@ -217,3 +231,18 @@ FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:8080')
 
 # AI Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+
+# Payment gateway webhooks: shared HMAC secret, and how old (in seconds) a signed timestamp may be
+PAYMENT_WEBHOOK_SECRET = os.getenv('PAYMENT_WEBHOOK_SECRET', '')
+PAYMENT_WEBHOOK_TOLERANCE = int(os.getenv('PAYMENT_WEBHOOK_TOLERANCE', '300'))
+# Whether the client may report a payment as completed (enrolment payment reference,
+# payment finalization, invoice pay). Off by default once the signed webhook is set up,
+# so only the gateway can mark money as received.
+PAYMENT_CLIENT_COMPLETION = os.getenv(
+    'PAYMENT_CLIENT_COMPLETION', 'False' if PAYMENT_WEBHOOK_SECRET else 'True'
+).lower() == 'true'
+
+# Per-request query metrics and query budgets (utils.query_metrics)
+QUERY_METRICS_ENABLED = os.getenv('QUERY_METRICS_ENABLED', 'False').lower() == 'true'
+QUERY_METRICS_WINDOW = int(os.getenv('QUERY_METRICS_WINDOW', '500'))  # Requests kept per route
+QUERY_BUDGET_ACTION = os.getenv('QUERY_BUDGET_ACTION', 'log')  # 'log', or 'raise' to fail tests
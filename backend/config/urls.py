@@ -19,6 +19,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from utils.query_metrics import QueryStatsAPIView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -38,6 +39,8 @@ urlpatterns = [
     path('api/v1/library/', include('library.urls')),
     path('api/v1/notifications/', include('notifications.urls')),
     path('api/v1/dashboard/', include('dashboard.urls')),
+    path('api/v1/analytics/', include('analytics.urls')),
+    path('api/v1/metrics/queries/', QueryStatsAPIView.as_view(), name='query-stats'),
 ]
 
 # Serve media files in development
@@ -7,7 +7,8 @@ from datetime import datetime, timedelta
 from users.models import StudentProfile, StaffProfile, ParentProfile
 from admissions.models import AdmissionApplication
 from fees.models import FeeInvoice
-from attendance.models import AttendanceRecord
+from attendance.models import AttendanceRecord, ClassSession
+from attendance.summaries import student_attendance_summary
 from exams.models import Exam, ExamResult
 from hostel.models import HostelAllocation
 from library.models import BookBorrowRecord
@@ -189,18 +190,14 @@ class StudentDashboardAPIView(APIView):
         try:
             student = StudentProfile.objects.get(id=student_id)
             
-            # Attendance summary
+            # Attendance summary (from the daily rollup)
+            overall = student_attendance_summary(student)
+            this_month = student_attendance_summary(student, date_from=timezone.localdate().replace(day=1))
             attendance_data = {
-                'total_present': AttendanceRecord.objects.filter(
-                    student=student, status='present'
-                ).count(),
-                'total_absent': AttendanceRecord.objects.filter(
-                    student=student, status='absent'
-                ).count(),
-                'this_month': AttendanceRecord.objects.filter(
-                    student=student,
-                    date__gte=timezone.now().replace(day=1)
-                ).count()
+                'total_present': overall['present'],
+                'total_absent': overall['absent'],
+                'this_month': this_month['total'],
+                'percentage': overall['percentage']
             }
             
             # Fee status
@@ -307,24 +304,26 @@ class FacultyDashboardAPIView(APIView):
 
     def get(self, request, faculty_id):
         try:
-            faculty = StaffProfile.objects.get(id=faculty_id)
+            faculty = StaffProfile.objects.select_related('user').get(id=faculty_id)
             
-            # Get classes taught (this would depend on your class/subject assignment model)
-            # For now, returning basic faculty info
+            # Sessions generated from the timetable; served by the (faculty, date, start_time) index
+            classes_today = list(ClassSession.objects.filter(
+                faculty=faculty, date=timezone.localdate()
+            ).order_by('start_time').values('id', 'course', 'subject', 'batch', 'start_time', 'end_time'))
             
             return Response({
                 'faculty_info': {
                     'name': faculty.user.full_name,
                     'email': faculty.user.email,
                     'department': faculty.department,
-                    'position': faculty.position
+                    'position': faculty.designation
                 },
-                'classes_today': [],  # To be implemented based on timetable model
+                'classes_today': classes_today,
                 'upcoming_exams': [],  # To be implemented
                 'pending_tasks': []   # To be implemented
             })
             
-        except StaffProfile.objects.DoesNotExist:
+        except StaffProfile.DoesNotExist:
             return Response({'error': 'Faculty not found'}, status=404)
 
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exam, ExamResult
+from .models import Exam, ExamResult, GradeBoundary, ExamRank
 
 
 @admin.register(Exam)
@@ -77,3 +77,36 @@ class ExamResultAdmin(admin.ModelAdmin):
         if not change and hasattr(request.user, 'staffprofile'):
             obj.entered_by = request.user.staffprofile
         super().save_model(request, obj, form, change)
+
+
+@admin.register(GradeBoundary)
+class GradeBoundaryAdmin(admin.ModelAdmin):
+    """Admin configuration for GradeBoundary model"""
+    
+    list_display = ['school', 'grade', 'min_percentage']
+    list_filter = ['school', 'grade']
+    search_fields = ['school__school_name']
+    
+    def get_queryset(self, request):
+        """Filter boundaries by user's school if not superuser"""
+        qs = super().get_queryset(request)
+        if not request.user.is_superuser and hasattr(request.user, 'school'):
+            qs = qs.filter(school=request.user.school)
+        return qs
+
+
+@admin.register(ExamRank)
+class ExamRankAdmin(admin.ModelAdmin):
+    """Admin configuration for ExamRank model"""
+    
+    list_display = ['exam', 'student', 'course', 'semester', 'rank', 'percentile', 'cohort_size', 'computed_at']
+    list_filter = ['exam__school', 'course', 'semester']
+    search_fields = ['exam__name', 'student__admission_number', 'student__roll_number']
+    readonly_fields = ['computed_at']
+    
+    def get_queryset(self, request):
+        """Filter ranks by user's school if not superuser"""
+        qs = super().get_queryset(request)
+        if not request.user.is_superuser and hasattr(request.user, 'school'):
+            qs = qs.filter(exam__school=request.user.school)
+        return qs
@@ -0,0 +1,247 @@
+"""
+Grade computation and bulk marks entry for an exam.
+
+A school's grade-boundary table (``GradeBoundary``, falling back to
+``DEFAULT_GRADE_BOUNDARIES``) maps the lowest percentage to each grade. A
+whole class is graded at once: marks are converted to a NumPy array of
+percentages and binned against the sorted boundaries with
+``np.searchsorted``, so grading 500 students is one vectorized call instead
+of a chain of ``if`` statements per student.
+
+``validate_marks`` checks every submitted row and returns per-row errors;
+``save_marks`` upserts the valid rows on the ``(exam, student)`` unique key
+in one transaction, so the same sheet can be re-submitted after corrections,
+and refreshes the exam's class ranks.
+"""
+import csv
+import io
+import math
+
+import numpy as np
+from django.db import transaction
+
+from users.models import StudentProfile
+from .models import ExamResult, GradeBoundary, DEFAULT_GRADE_BOUNDARIES
+from .ranking import rank_exam
+
+# Column names accepted for the marks value in an uploaded sheet
+MARKS_COLUMNS = ('marks_obtained', 'marks')
+
+
+def get_grade_boundaries(school):
+    """``(grade, min_percentage)`` pairs for a school, highest grade first"""
+    boundaries = []
+    if school is not None:
+        boundaries = list(GradeBoundary.objects.filter(school=school).order_by(
+            '-min_percentage'
+        ).values_list('grade', 'min_percentage'))
+    if not boundaries:
+        return list(DEFAULT_GRADE_BOUNDARIES)
+    if boundaries[-1][1] > 0:
+        # A partial table still needs a floor, otherwise every low mark would get its lowest configured grade
+        boundaries.append(('F', 0))
+    return boundaries
+
+
+def assign_grades(marks, max_marks, boundaries):
+    """
+    Grade an array of marks against ``boundaries``.
+
+    Returns a NumPy array of grade strings, one per mark. Marks below the
+    lowest boundary get the lowest grade. Raises ``ValueError`` when
+    ``max_marks`` is not positive, as no percentage can be computed.
+    """
+    if max_marks <= 0:
+        raise ValueError(f'max_marks must be positive to grade marks, not {max_marks}')
+    marks = np.asarray(marks, dtype=np.float64)
+    if not len(marks):
+        return np.empty(0, dtype=object)
+    ordered = sorted(boundaries, key=lambda boundary: boundary[1])
+    thresholds = np.array([minimum for _, minimum in ordered], dtype=np.float64)
+    grades = np.array([grade for grade, _ in ordered], dtype=object)
+    # Rounded so 89.99999 from float division does not fall under a 90% boundary
+    percentages = np.round(marks * 100.0 / max_marks, 6)
+    index = np.searchsorted(thresholds, percentages, side='right') - 1
+    return grades[np.clip(index, 0, len(grades) - 1)]
+
+
+def grade_for(marks_obtained, max_marks, boundaries):
+    """Grade for a single mark"""
+    return str(assign_grades([marks_obtained], max_marks, boundaries)[0])
+
+
+def parse_marks_csv(upload):
+    """
+    Read an uploaded CSV of marks into ``(line_number, row)`` pairs.
+
+    Header names are case-insensitive. Each row needs ``student`` (profile id)
+    or ``roll_number``, and ``marks_obtained`` (or ``marks``); ``remarks`` is
+    optional.
+    """
+    text = io.TextIOWrapper(upload.file if hasattr(upload, 'file') else upload, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            return []
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        return [
+            (reader.line_num, {key: (value or '').strip() for key, value in row.items() if key})
+            for row in reader
+            if any((value or '').strip() for value in row.values() if isinstance(value, str))
+        ]
+    finally:
+        text.detach()
+
+
+def _marks_value(row):
+    for column in MARKS_COLUMNS:
+        if row.get(column) not in (None, ''):
+            return row[column]
+    return None
+
+
+def validate_marks(exam, rows):
+    """
+    Check submitted marks rows against the exam's roster and ``max_marks``.
+
+    ``rows`` is a list of ``(row_number, row)`` pairs. Returns ``(entries, errors)``:
+    ``entries`` holds ``(student_id, marks, remarks)`` for valid rows and
+    ``errors`` holds ``{'row', 'student', 'errors'}`` for the rest.
+    """
+    roster = StudentProfile.objects.filter(
+        school=exam.school, course=exam.course, semester=exam.semester, is_active=True
+    )
+    ids = set()
+    roll_numbers = set()
+    for _, row in rows:
+        if row.get('student') not in (None, ''):
+            ids.add(str(row['student']).strip())
+        elif row.get('roll_number') not in (None, ''):
+            roll_numbers.add(str(row['roll_number']).strip())
+
+    # Two queries at most resolve the whole sheet, whichever identifier it uses
+    known_ids = set()
+    numeric_ids = [int(value) for value in ids if value.isdigit()]
+    if numeric_ids:
+        known_ids = set(roster.filter(id__in=numeric_ids).values_list('id', flat=True))
+    by_roll_number = {}
+    if roll_numbers:
+        for student_id, roll_number in roster.filter(roll_number__in=roll_numbers).values_list('id', 'roll_number'):
+            by_roll_number.setdefault(roll_number, []).append(student_id)
+
+    class_name = f'course {exam.course} semester {exam.semester}'
+    errors = []
+    student_ids = []
+    marks = []
+    remarks = []
+    row_numbers = []
+    seen = {}
+    for row_number, row in rows:
+        row_errors = []
+        identifier = row.get('student') if row.get('student') not in (None, '') else row.get('roll_number')
+        student_id = None
+        if row.get('student') not in (None, ''):
+            value = str(row['student']).strip()
+            if value.isdigit() and int(value) in known_ids:
+                student_id = int(value)
+            else:
+                row_errors.append(f"Student {value} is not enrolled in {class_name}")
+        elif row.get('roll_number') not in (None, ''):
+            matches = by_roll_number.get(str(row['roll_number']).strip(), [])
+            if len(matches) == 1:
+                student_id = matches[0]
+            elif matches:
+                row_errors.append(f"Roll number {row['roll_number']} matches more than one student")
+            else:
+                row_errors.append(f"Roll number {row['roll_number']} is not enrolled in {class_name}")
+        else:
+            row_errors.append('Either student or roll_number is required')
+
+        if student_id is not None and student_id in seen:
+            row_errors.append(f"Duplicate entry for this student (first given in row {seen[student_id]})")
+
+        value = _marks_value(row)
+        mark = None
+        if value is None:
+            row_errors.append('marks_obtained is required')
+        else:
+            try:
+                mark = float(value)
+            except (TypeError, ValueError):
+                row_errors.append(f"marks_obtained '{value}' is not a number")
+            else:
+                if not math.isfinite(mark):
+                    row_errors.append(f"marks_obtained '{value}' is not a number")
+                    mark = None
+
+        if row_errors:
+            errors.append({'row': row_number, 'student': identifier, 'errors': row_errors})
+            continue
+        seen[student_id] = row_number
+        student_ids.append(student_id)
+        marks.append(mark)
+        remarks.append(str(row.get('remarks') or '').strip())
+        row_numbers.append(row_number)
+
+    # Range check for the whole sheet at once; without a positive maximum no mark can be graded
+    marks_array = np.asarray(marks, dtype=np.float64)
+    if exam.max_marks > 0:
+        out_of_range = np.flatnonzero((marks_array < 0) | (marks_array > exam.max_marks))
+        message = f"marks_obtained must be between 0 and {exam.max_marks}"
+    else:
+        out_of_range = np.arange(len(marks_array))
+        message = f"the exam's max_marks is {exam.max_marks}; set a positive maximum before entering marks"
+    rejected = set(out_of_range.tolist())
+    for index in out_of_range:
+        errors.append({
+            'row': row_numbers[index],
+            'student': student_ids[index],
+            'errors': [message],
+        })
+    errors.sort(key=lambda error: error['row'])
+
+    entries = [
+        (student_id, mark, remark)
+        for index, (student_id, mark, remark) in enumerate(zip(student_ids, marks, remarks))
+        if index not in rejected
+    ]
+    return entries, errors
+
+
+def save_marks(exam, entries, entered_by, update_remarks=True):
+    """
+    Grade and upsert validated ``(student_id, marks, remarks)`` entries in one transaction.
+
+    Returns the number of rows written and the grade distribution of the sheet.
+    """
+    if not entries:
+        return 0, {}
+    boundaries = get_grade_boundaries(exam.school)
+    grades = assign_grades([mark for _, mark, _ in entries], exam.max_marks, boundaries)
+    results = [
+        ExamResult(
+            exam=exam,
+            student_id=student_id,
+            marks_obtained=mark,
+            grade=grade,
+            remarks=remark,
+            entered_by=entered_by
+        )
+        for (student_id, mark, remark), grade in zip(entries, grades)
+    ]
+    update_fields = ['marks_obtained', 'grade', 'entered_by']
+    if update_remarks:
+        update_fields.append('remarks')
+
+    with transaction.atomic():
+        ExamResult.objects.bulk_create(
+            results,
+            update_conflicts=True,
+            unique_fields=['exam', 'student'],
+            update_fields=update_fields
+        )
+        # bulk_create sends no signals, so the class ranks are refreshed here
+        rank_exam(exam)
+
+    names, counts = np.unique(grades.astype(str), return_counts=True)
+    return len(results), dict(zip(names.tolist(), counts.tolist()))
@@ -0,0 +1,77 @@
+import os
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schools.models import School
+from users.models import StudentProfile
+from exams.report_cards import (
+    collect_class_cards, generate_report_cards, prune_report_card_cache, report_card_filename
+)
+from utils.exports import stream_zip
+
+
+class Command(BaseCommand):
+    help = 'Render term report cards for every class of a school into the report card cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=str, required=True, help='School code')
+        parser.add_argument('--course', type=str, help='Only this course (class)')
+        parser.add_argument('--semester', type=int, help='Only this semester')
+        parser.add_argument('--date-from', type=str, help='First exam/attendance date of the term (YYYY-MM-DD)')
+        parser.add_argument('--date-to', type=str, help='Last exam/attendance date of the term (YYYY-MM-DD)')
+        parser.add_argument('--workers', type=int, help='Render processes (default: one per CPU)')
+        parser.add_argument('--zip-dir', type=str, help='Also write one ZIP per class into this directory')
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(school_code=options['school']).first()
+        if school is None:
+            raise CommandError(f'School "{options["school"]}" does not exist.')
+        try:
+            date_from = date.fromisoformat(options['date_from']) if options['date_from'] else None
+            date_to = date.fromisoformat(options['date_to']) if options['date_to'] else None
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+
+        classes = StudentProfile.objects.filter(school=school, is_active=True)
+        if options['course']:
+            classes = classes.filter(course=options['course'])
+        if options['semester'] is not None:
+            classes = classes.filter(semester=options['semester'])
+        classes = list(classes.order_by('course', 'semester').values_list('course', 'semester').distinct())
+        if not classes:
+            raise CommandError('No active students match the given class filters.')
+        if options['zip_dir']:
+            os.makedirs(options['zip_dir'], exist_ok=True)
+
+        started = timezone.now()
+        totals = {'total': 0, 'rendered': 0, 'cached': 0}
+        for course, semester in classes:
+            cards = collect_class_cards(school, course, semester, date_from, date_to)
+            files, stats = generate_report_cards(cards, workers=options['workers'])
+            for key in totals:
+                totals[key] += stats[key]
+            self.stdout.write(
+                f'{course} semester {semester}: {stats["total"]} cards '
+                f'({stats["rendered"]} rendered, {stats["cached"]} cached)'
+            )
+            if options['zip_dir']:
+                filename = f'report_cards_{course}_sem{semester}.zip'.replace(' ', '_').replace('/', '-')
+                archive = os.path.join(options['zip_dir'], filename)
+                with open(archive, 'wb') as output:
+                    for chunk in stream_zip([(report_card_filename(card), path) for card, path in files]):
+                        output.write(chunk)
+
+        pruned = prune_report_card_cache()
+        elapsed = (timezone.now() - started).total_seconds()
+        rate = totals['rendered'] / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nReport card generation completed in {elapsed:.1f}s:'
+                f'\n- Classes: {len(classes)}'
+                f'\n- Cards: {totals["total"]}'
+                f'\n- Rendered: {totals["rendered"]} ({rate:.0f} cards/s)'
+                f'\n- Served from cache: {totals["cached"]}'
+                f'\n- Pruned from cache: {pruned}'
+            )
+        )
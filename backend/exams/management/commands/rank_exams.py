@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schools.models import School
+from exams.models import Exam
+from exams.ranking import rank_exam
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the class rank and percentile table from exam results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=str, help='Only rank exams of the school with this school code')
+        parser.add_argument('--exam', type=int, help='Only rank the exam with this id')
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.filter(examresult__isnull=False).distinct().order_by('id')
+        if options['school']:
+            school = School.objects.filter(school_code=options['school']).first()
+            if school is None:
+                raise CommandError(f'School "{options["school"]}" does not exist.')
+            exams = exams.filter(school=school)
+        if options['exam']:
+            exams = exams.filter(id=options['exam'])
+
+        started = timezone.now()
+        ranked_exams = 0
+        ranked_results = 0
+        for exam in exams.iterator():
+            ranked_results += rank_exam(exam)
+            ranked_exams += 1
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nExam ranking completed in {elapsed:.1f}s:'
+                f'\n- Exams ranked: {ranked_exams}'
+                f'\n- Results ranked: {ranked_results}'
+            )
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_exam_school_exam_exams_exam_school__dddeed_idx_and_more'),
+        ('schools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.CharField(choices=[('A+', 'A+'), ('A', 'A'), ('A-', 'A-'), ('B+', 'B+'), ('B', 'B'), ('B-', 'B-'), ('C+', 'C+'), ('C', 'C'), ('C-', 'C-'), ('D', 'D'), ('F', 'F')], max_length=2)),
+                ('min_percentage', models.FloatField(help_text='Percentage at or above which this grade is awarded')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_boundaries', to='schools.school')),
+            ],
+            options={
+                'ordering': ['school', '-min_percentage'],
+                'unique_together': {('school', 'grade')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_grade_boundaries'),
+        ('users', '0011_staffprofile_school'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course', models.CharField(max_length=100)),
+                ('semester', models.IntegerField()),
+                ('rank', models.PositiveIntegerField(help_text='Dense rank by marks, 1 is the top score')),
+                ('percentile', models.FloatField(help_text='Percentage of the cohort scoring at or below this result')),
+                ('cohort_size', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='exams.exam')),
+                ('result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rank', to='exams.examresult')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_ranks', to='users.studentprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['exam', 'course', 'semester', 'rank'], name='exams_examr_exam_id_72bffc_idx'), models.Index(fields=['student', 'exam'], name='exams_examr_student_4b1808_idx')],
+                'unique_together': {('exam', 'student')},
+            },
+        ),
+    ]
@@ -2,6 +2,22 @@ from django.db import models
 
 from django.db import models
 
+# Lowest percentage that earns each grade, used when a school has not configured its own table
+DEFAULT_GRADE_BOUNDARIES = [
+    ('A+', 90),
+    ('A', 85),
+    ('A-', 80),
+    ('B+', 75),
+    ('B', 70),
+    ('B-', 65),
+    ('C+', 60),
+    ('C', 55),
+    ('C-', 50),
+    ('D', 40),
+    ('F', 0),
+]
+
+
 class Exam(models.Model):
     """Model for exams"""
     
@@ -68,3 +84,42 @@ class ExamResult(models.Model):
     
     def __str__(self):
         return f"{self.student.user.full_name} - {self.exam.name} ({self.marks_obtained}/{self.exam.max_marks}) [{self.exam.school.school_name}]"
+
+
+class GradeBoundary(models.Model):
+    """Lowest percentage that earns a grade in a school's exams"""
+    
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, related_name='grade_boundaries')
+    grade = models.CharField(max_length=2, choices=ExamResult.GRADE_CHOICES)
+    min_percentage = models.FloatField(help_text="Percentage at or above which this grade is awarded")
+    
+    class Meta:
+        unique_together = ['school', 'grade']
+        ordering = ['school', '-min_percentage']
+    
+    def __str__(self):
+        return f"{self.grade} >= {self.min_percentage}% [{self.school.school_name}]"
+
+
+class ExamRank(models.Model):
+    """Precomputed class standing of a result within its (exam, course, semester) cohort"""
+    
+    result = models.OneToOneField(ExamResult, on_delete=models.CASCADE, related_name='rank')
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='ranks')
+    student = models.ForeignKey('users.StudentProfile', on_delete=models.CASCADE, related_name='exam_ranks')
+    course = models.CharField(max_length=100)
+    semester = models.IntegerField()
+    rank = models.PositiveIntegerField(help_text="Dense rank by marks, 1 is the top score")
+    percentile = models.FloatField(help_text="Percentage of the cohort scoring at or below this result")
+    cohort_size = models.PositiveIntegerField()
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['exam', 'student']
+        indexes = [
+            models.Index(fields=['exam', 'course', 'semester', 'rank']),
+            models.Index(fields=['student', 'exam']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student} - {self.exam.name}: #{self.rank} ({self.percentile:.1f} percentile)"
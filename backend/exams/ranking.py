@@ -0,0 +1,93 @@
+"""
+Class rank and percentile of every result in an exam.
+
+Results are ranked within their (exam, course, semester) cohort and stored
+in ``ExamRank``, so result pages answer "where does my child stand?" with one
+join instead of loading every result of the exam.
+
+- ``rank`` is a dense rank by marks, highest first (equal marks share a rank).
+- ``percentile`` is the percentage of the cohort scoring at or below the
+  result, so the top score is always 100.
+
+The ranks are computed in the database with ``DENSE_RANK()`` and
+``CUME_DIST()`` window functions. Databases without window support fall
+back to sorting the marks column with NumPy.
+"""
+import logging
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import CumeDist, DenseRank
+
+from .models import Exam, ExamResult, ExamRank
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 1000
+
+
+def _ranks_with_window(results):
+    cohort = [F('student__course'), F('student__semester')]
+    return list(results.annotate(
+        dense_rank=Window(DenseRank(), partition_by=cohort, order_by=F('marks_obtained').desc()),
+        cume_dist=Window(CumeDist(), partition_by=cohort, order_by=F('marks_obtained').asc()),
+        cohort_size=Window(Count('id'), partition_by=cohort),
+    ).values_list(
+        'id', 'student_id', 'student__course', 'student__semester', 'dense_rank', 'cume_dist', 'cohort_size'
+    ))
+
+
+def _ranks_with_numpy(results):
+    rows = list(results.values_list('id', 'student_id', 'student__course', 'student__semester', 'marks_obtained'))
+    cohorts = {}
+    for index, row in enumerate(rows):
+        cohorts.setdefault((row[2], row[3]), []).append(index)
+
+    ranked = []
+    for indices in cohorts.values():
+        marks = np.array([rows[index][4] for index in indices], dtype=np.float64)
+        ordered = np.sort(marks)
+        distinct = np.unique(marks)
+        # Dense rank counts the distinct marks above each one; cume_dist counts the marks at or below it
+        dense_ranks = len(distinct) - np.searchsorted(distinct, marks)
+        cume_dist = np.searchsorted(ordered, marks, side='right') / len(marks)
+        for index, dense_rank, fraction in zip(indices, dense_ranks.tolist(), cume_dist.tolist()):
+            result_id, student_id, course, semester, _ = rows[index]
+            ranked.append((result_id, student_id, course, semester, dense_rank, fraction, len(indices)))
+    return ranked
+
+
+def rank_exam(exam):
+    """Recompute the ``ExamRank`` rows of one exam. Returns the number of ranked results."""
+    results = ExamResult.objects.filter(exam=exam).order_by()
+    if connection.features.supports_over_clause:
+        ranked = _ranks_with_window(results)
+    else:
+        ranked = _ranks_with_numpy(results)
+
+    ranks = [
+        ExamRank(
+            result_id=result_id,
+            exam_id=exam.id,
+            student_id=student_id,
+            course=course,
+            semester=semester,
+            rank=dense_rank,
+            percentile=round(fraction * 100, 2),
+            cohort_size=cohort_size
+        )
+        for result_id, student_id, course, semester, dense_rank, fraction, cohort_size in ranked
+    ]
+    with transaction.atomic():
+        ExamRank.objects.filter(exam=exam).delete()
+        ExamRank.objects.bulk_create(ranks, batch_size=WRITE_BATCH_SIZE)
+    logger.info('Ranked %d results for exam %s', len(ranks), exam.id)
+    return len(ranks)
+
+
+def rank_exam_by_id(exam_id):
+    """Recompute ranks for an exam id, ignoring exams that have since been deleted"""
+    exam = Exam.objects.filter(id=exam_id).first()
+    if exam is not None:
+        rank_exam(exam)
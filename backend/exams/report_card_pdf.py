@@ -0,0 +1,168 @@
+"""
+PDF rendering for report cards.
+
+This module deliberately imports nothing from Django: the functions here
+run in worker processes of a process pool and receive plain dicts built by
+``exams.report_cards``, so workers never touch the database and can be
+started with the ``spawn`` method.
+
+Rendered cards are stored content-addressed: the file name is the SHA-256
+of the card data plus ``RENDERER_VERSION``. A card whose data has not
+changed since the last run maps to a file that already exists and is not
+rendered again. Bump ``RENDERER_VERSION`` whenever the layout changes.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+RENDERER_VERSION = 1
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 50
+ROW_HEIGHT = 18
+RESULT_COLUMNS = [
+    ('Exam', 0),
+    ('Subject', 150),
+    ('Marks', 265),
+    ('Grade', 325),
+    ('Rank', 375),
+    ('Percentile', 425),
+]
+
+
+def card_digest(data):
+    """Content address of a card: changes whenever anything printed on it changes"""
+    payload = json.dumps([RENDERER_VERSION, data], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def card_path(cache_dir, digest):
+    """Cached PDF location, fanned out by the first two hex digits"""
+    return os.path.join(cache_dir, digest[:2], f'{digest}.pdf')
+
+
+def _heading(pdf, y, text):
+    pdf.setFont('Helvetica-Bold', 12)
+    pdf.setFillColor(colors.HexColor('#1f3b73'))
+    pdf.drawString(MARGIN, y, text)
+    pdf.setFillColor(colors.black)
+    pdf.line(MARGIN, y - 4, PAGE_WIDTH - MARGIN, y - 4)
+    return y - 22
+
+
+def _new_page(pdf):
+    pdf.showPage()
+    return PAGE_HEIGHT - MARGIN
+
+
+def render_card(data):
+    """Render one report card and return the PDF bytes"""
+    buffer = io.BytesIO()
+    # invariant drops the timestamp and random document id, so the same data always gives the same bytes
+    pdf = canvas.Canvas(buffer, pagesize=A4, pageCompression=1, invariant=1)
+    pdf.setTitle(f"Report Card - {data['student']['name']}")
+
+    y = PAGE_HEIGHT - MARGIN
+    pdf.setFont('Helvetica-Bold', 16)
+    pdf.drawCentredString(PAGE_WIDTH / 2, y, data['school']['name'])
+    y -= 20
+    pdf.setFont('Helvetica', 11)
+    pdf.drawCentredString(PAGE_WIDTH / 2, y, f"Report Card - {data['term']}")
+    y -= 30
+
+    student = data['student']
+    pdf.setFont('Helvetica', 10)
+    for label, value in [
+        ('Name', student['name']),
+        ('Admission No.', student['admission_number'] or '-'),
+        ('Roll No.', student['roll_number']),
+        ('Class', f"{student['course']} (Semester {student['semester']})"),
+    ]:
+        pdf.drawString(MARGIN, y, f'{label}:')
+        pdf.drawString(MARGIN + 90, y, str(value))
+        y -= 15
+    y -= 10
+
+    y = _heading(pdf, y, 'Academic Performance')
+    pdf.setFont('Helvetica-Bold', 9)
+    for title, offset in RESULT_COLUMNS:
+        pdf.drawString(MARGIN + offset, y, title)
+    y -= ROW_HEIGHT
+    pdf.setFont('Helvetica', 9)
+    if not data['results']:
+        pdf.drawString(MARGIN, y, 'No results recorded for this term.')
+        y -= ROW_HEIGHT
+    for result in data['results']:
+        if y < MARGIN + 120:
+            y = _new_page(pdf)
+            pdf.setFont('Helvetica', 9)
+        rank = f"{result['rank']} / {result['cohort_size']}" if result['rank'] else '-'
+        percentile = f"{result['percentile']:.1f}" if result['percentile'] is not None else '-'
+        values = [
+            result['exam'][:28],
+            result['subject'][:20],
+            f"{result['marks']:g} / {result['max_marks']}",
+            result['grade'],
+            rank,
+            percentile,
+        ]
+        for (_, offset), value in zip(RESULT_COLUMNS, values):
+            pdf.drawString(MARGIN + offset, y, value)
+        y -= ROW_HEIGHT
+    if data['results']:
+        pdf.setFont('Helvetica-Bold', 9)
+        pdf.drawString(MARGIN, y, f"Overall: {data['overall_percentage']:.2f}%")
+        y -= ROW_HEIGHT
+    y -= 10
+
+    attendance = data['attendance']
+    y = _heading(pdf, y, 'Attendance')
+    pdf.setFont('Helvetica', 10)
+    pdf.drawString(
+        MARGIN, y,
+        f"Present {attendance['present']} of {attendance['total']} sessions "
+        f"({attendance['percentage']:.2f}%) - late {attendance['late']}, excused {attendance['excused']}"
+    )
+    y -= 30
+
+    fees = data['fees']
+    y = _heading(pdf, y, 'Fee Status')
+    pdf.setFont('Helvetica', 10)
+    pdf.drawString(
+        MARGIN, y,
+        f"Invoiced {fees['invoiced']}   Paid {fees['paid']}   Outstanding {fees['outstanding']}"
+    )
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+def render_to_cache(data, cache_dir):
+    """
+    Render a card into the cache unless it is already there.
+
+    Returns ``(digest, rendered)``. The file is written to a temporary name
+    and renamed into place, so concurrent runs never see a partial PDF.
+    """
+    digest = card_digest(data)
+    path = card_path(cache_dir, digest)
+    if os.path.exists(path):
+        return digest, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    content = render_card(data)
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(handle, 'wb') as output:
+        output.write(content)
+    os.replace(temporary, path)
+    return digest, True
+
+
+def render_batch(cards, cache_dir):
+    """Worker entry point: render a list of cards, returning their ``(digest, rendered)`` pairs"""
+    return [render_to_cache(data, cache_dir) for data in cards]
@@ -0,0 +1,273 @@
+"""
+Term report cards for a class: exam results with class rank, attendance
+from the daily rollup, and fee status.
+
+``collect_class_cards`` loads everything for one (school, course, semester)
+in four queries, whatever the class size: students, results joined to their
+exam and rank, attendance totals grouped by student, and invoice totals
+grouped by student. The result is a list of plain dicts, one per student.
+
+``generate_report_cards`` renders the cards that are not already in the
+content-addressed cache under ``MEDIA_ROOT/report_cards`` (see
+``exams.report_card_pdf``). Large batches are spread over a process pool;
+small ones render inline, where handing them to workers would cost more
+than it saves. Web requests share one pool per server process, started on
+first use, so its workers import Django once rather than once per request;
+the management command passes ``workers`` and gets a pool of its own.
+
+The cache is pruned at most once every ``CACHE_PRUNE_INTERVAL`` seconds:
+cards unused for ``CACHE_MAX_AGE`` go first, then the least recently used
+until the cache fits in ``CACHE_MAX_BYTES``. Serving a cached card counts
+as a use.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q, Sum
+
+from attendance.models import AttendanceSummary
+from fees.models import FeeInvoice
+from users.models import StudentProfile
+from .models import ExamResult
+from .report_card_pdf import card_digest, card_path, render_batch
+
+logger = logging.getLogger(__name__)
+
+REPORT_CARD_DIR = 'report_cards'
+POOL_THRESHOLD = 32  # Fewer missing cards than this are rendered in-process
+RENDER_BATCH_SIZE = 25
+CACHE_MAX_AGE = 30 * 24 * 3600
+CACHE_MAX_BYTES = 1024 ** 3
+CACHE_PRUNE_INTERVAL = 3600
+ATTENDANCE_FIELDS = ['total', 'present', 'absent', 'late', 'excused']
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def report_card_cache_dir():
+    return os.path.join(settings.MEDIA_ROOT, REPORT_CARD_DIR)
+
+
+def _new_pool(workers=None):
+    # spawn, not fork: workers must not inherit the parent's database connections
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _get_shared_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = _new_pool()
+        return _shared_pool
+
+
+def _discard_shared_pool(pool):
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is pool:
+            _shared_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_in_pool(pool, missing, cache_dir):
+    batches = [missing[start:start + RENDER_BATCH_SIZE] for start in range(0, len(missing), RENDER_BATCH_SIZE)]
+    return sum(
+        was_rendered
+        for batch_result in pool.map(render_batch, batches, [cache_dir] * len(batches))
+        for _, was_rendered in batch_result
+    )
+
+
+def prune_report_card_cache(cache_dir=None, max_age=CACHE_MAX_AGE, max_bytes=CACHE_MAX_BYTES, keep=()):
+    """
+    Delete cached cards unused for ``max_age`` seconds, then the least
+    recently used ones until the cache is within ``max_bytes``.
+
+    Paths in ``keep`` are never deleted, nor are temporary files younger
+    than ``max_age``. Returns the number of files removed.
+    """
+    cache_dir = cache_dir or report_card_cache_dir()
+    keep = set(keep)
+    entries = []
+    for directory, _, filenames in os.walk(cache_dir):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    cutoff = time.time() - max_age
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for modified, size, path in sorted(entries):
+        if path in keep or modified >= cutoff and (total <= max_bytes or path.endswith('.tmp')):
+            continue  # Fresh temporary files belong to renders in progress
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def _prune_if_due(cache_dir, keep):
+    global _last_prune
+    now = time.monotonic()
+    if _last_prune and now - _last_prune < CACHE_PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    removed = prune_report_card_cache(cache_dir, keep=keep)
+    if removed:
+        logger.info('Report cards: pruned %d cached files', removed)
+
+
+def _date_filter(prefix, date_from, date_to):
+    condition = Q()
+    if date_from:
+        condition &= Q(**{f'{prefix}__gte': date_from})
+    if date_to:
+        condition &= Q(**{f'{prefix}__lte': date_to})
+    return condition
+
+
+def term_label(course, semester, date_from=None, date_to=None):
+    label = f'{course} - Semester {semester}'
+    if date_from or date_to:
+        label += f" ({date_from or 'start'} to {date_to or 'date'})"
+    return label
+
+
+def collect_class_cards(school, course, semester, date_from=None, date_to=None, student_ids=None):
+    """Report card data for every active student of a class, in roll number order"""
+    students = StudentProfile.objects.filter(school=school, course=course, semester=semester, is_active=True)
+    if student_ids is not None:
+        students = students.filter(id__in=student_ids)
+    student_rows = list(students.order_by('roll_number', 'id').values(
+        'id', 'first_name', 'last_name', 'admission_number', 'roll_number', 'course', 'semester'
+    ))
+    if not student_rows:
+        return []
+    roster = students.values('id')
+
+    results = {}
+    for row in ExamResult.objects.filter(
+        _date_filter('exam__date', date_from, date_to),
+        student__in=roster,
+        exam__school=school,
+        exam__course=course,
+        exam__semester=semester
+    ).order_by('exam__date', 'exam__subject', 'id').values_list(
+        'student_id', 'exam__name', 'exam__subject', 'exam__date', 'exam__max_marks',
+        'marks_obtained', 'grade', 'rank__rank', 'rank__percentile', 'rank__cohort_size'
+    ):
+        student_id, name, subject, exam_date, max_marks, marks, grade, rank, percentile, cohort_size = row
+        results.setdefault(student_id, []).append({
+            'exam': name,
+            'subject': subject,
+            'date': exam_date.isoformat(),
+            'max_marks': max_marks,
+            'marks': marks,
+            'grade': grade,
+            'rank': rank,
+            'percentile': percentile,
+            'cohort_size': cohort_size,
+        })
+
+    attendance = {
+        row.pop('student_id'): row
+        for row in AttendanceSummary.objects.filter(
+            _date_filter('date', date_from, date_to),
+            student__in=roster
+        ).order_by().values('student_id').annotate(**{field: Sum(field) for field in ATTENDANCE_FIELDS})
+    }
+
+    fees = {
+        row.pop('student_id'): row
+        for row in FeeInvoice.objects.filter(student__in=roster).exclude(status='cancelled').order_by().values(
+            'student_id'
+        ).annotate(invoiced=Sum('amount'), paid=Sum('amount', filter=Q(status='paid')))
+    }
+
+    school_data = {'name': school.school_name, 'code': school.school_code}
+    term = term_label(course, semester, date_from, date_to)
+    cards = []
+    for student in student_rows:
+        student_results = results.get(student['id'], [])
+        obtained = sum(result['marks'] for result in student_results)
+        maximum = sum(result['max_marks'] for result in student_results)
+        counts = attendance.get(student['id'], {})
+        counts = {field: counts.get(field) or 0 for field in ATTENDANCE_FIELDS}
+        counts['percentage'] = round(counts['present'] / counts['total'] * 100, 2) if counts['total'] else 0
+        invoiced = fees.get(student['id'], {}).get('invoiced') or Decimal('0')
+        paid = fees.get(student['id'], {}).get('paid') or Decimal('0')
+        name = f"{student['first_name'] or ''} {student['last_name'] or ''}".strip()
+        cards.append({
+            'school': school_data,
+            'term': term,
+            'student': {
+                'id': student['id'],
+                'name': name or f"Student {student['admission_number']}",
+                'admission_number': student['admission_number'],
+                'roll_number': student['roll_number'],
+                'course': student['course'],
+                'semester': student['semester'],
+            },
+            'results': student_results,
+            'overall_percentage': round(obtained / maximum * 100, 2) if maximum else 0,
+            'attendance': counts,
+            'fees': {'invoiced': str(invoiced), 'paid': str(paid), 'outstanding': str(invoiced - paid)},
+        })
+    return cards
+
+
+def generate_report_cards(cards, workers=None):
+    """
+    Make sure every card in ``cards`` is rendered into the cache.
+
+    Returns ``(files, stats)``: ``files`` pairs each card with its cached PDF
+    path, ``stats`` counts the cards rendered now and those already cached.
+    """
+    cache_dir = report_card_cache_dir()
+    paths = [card_path(cache_dir, card_digest(card)) for card in cards]
+    missing = []
+    for card, path in zip(cards, paths):
+        try:
+            os.utime(path)  # Mark the cached card as recently used
+        except FileNotFoundError:
+            missing.append(card)
+
+    if len(missing) < POOL_THRESHOLD:
+        rendered = sum(was_rendered for _, was_rendered in render_batch(missing, cache_dir))
+    elif workers is not None:
+        with _new_pool(workers) as pool:
+            rendered = _render_in_pool(pool, missing, cache_dir)
+    else:
+        pool = _get_shared_pool()
+        try:
+            rendered = _render_in_pool(pool, missing, cache_dir)
+        except BrokenProcessPool:
+            logger.exception('Report card render pool died, rendering inline')
+            _discard_shared_pool(pool)
+            rendered = sum(was_rendered for _, was_rendered in render_batch(missing, cache_dir))
+
+    _prune_if_due(cache_dir, keep=paths)
+    logger.info('Report cards: %d rendered, %d cached', rendered, len(cards) - rendered)
+    return list(zip(cards, paths)), {'total': len(cards), 'rendered': rendered, 'cached': len(cards) - rendered}
+
+
+def report_card_filename(card):
+    student = card['student']
+    return f"{student['roll_number'] or student['id']}_{student['name']}.pdf".replace('/', '-').replace(' ', '_')
@@ -1,5 +1,8 @@
+import csv
+
 from rest_framework import serializers
-from .models import Exam, ExamResult
+from .models import Exam, ExamResult, GradeBoundary
+from .grading import parse_marks_csv
 from users.serializers import StudentProfileSerializer, StaffProfileSerializer
 
 
@@ -12,6 +15,11 @@ class ExamSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['created_at']
 
+    def validate_max_marks(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("max_marks must be positive")
+        return value
+
 
 class ExamResultSerializer(serializers.ModelSerializer):
     """Serializer for ExamResult model"""
@@ -24,6 +32,9 @@ class ExamResultSerializer(serializers.ModelSerializer):
     student_admission_number = serializers.CharField(source='student.admission_number', read_only=True)
     entered_by_name = serializers.CharField(source='entered_by.user.get_full_name', read_only=True)
     percentage = serializers.SerializerMethodField()
+    class_rank = serializers.IntegerField(source='rank.rank', read_only=True, default=None)
+    class_percentile = serializers.FloatField(source='rank.percentile', read_only=True, default=None)
+    cohort_size = serializers.IntegerField(source='rank.cohort_size', read_only=True, default=None)
     
     class Meta:
         model = ExamResult
@@ -44,4 +55,53 @@ class ExamResultDetailSerializer(ExamResultSerializer):
     entered_by = StaffProfileSerializer(read_only=True)
     
     class Meta(ExamResultSerializer.Meta):
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class GradeBoundarySerializer(serializers.ModelSerializer):
+    """Serializer for GradeBoundary model"""
+    
+    class Meta:
+        model = GradeBoundary
+        fields = ['id', 'school', 'grade', 'min_percentage']
+        read_only_fields = ['school']
+    
+    def validate_min_percentage(self, value):
+        if value < 0 or value > 100:
+            raise serializers.ValidationError("min_percentage must be between 0 and 100")
+        return value
+
+
+class BulkMarksEntrySerializer(serializers.Serializer):
+    """Serializer for entering a whole class's marks for an exam in one request"""
+    MAX_ROWS = 2000
+    
+    results = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        allow_empty=False,
+        help_text="List of {\"student\": <id> or \"roll_number\": \"...\", \"marks_obtained\": 78, \"remarks\": \"\"}"
+    )
+    file = serializers.FileField(
+        required=False,
+        help_text="CSV with columns student or roll_number, marks_obtained, and optional remarks"
+    )
+    
+    def validate(self, data):
+        if ('results' in data) == ('file' in data):
+            raise serializers.ValidationError("Provide either results or a CSV file, not both")
+        if 'file' in data:
+            try:
+                rows = parse_marks_csv(data['file'])
+            except (UnicodeDecodeError, csv.Error) as exc:
+                raise serializers.ValidationError({'file': f"Could not read CSV: {exc}"})
+            if not rows:
+                raise serializers.ValidationError({'file': "The CSV has no rows"})
+        else:
+            rows = list(enumerate(data['results'], start=1))
+        if len(rows) > self.MAX_ROWS:
+            raise serializers.ValidationError(f"Cannot enter more than {self.MAX_ROWS} results at once")
+        data['rows'] = rows
+        data['update_remarks'] = any('remarks' in row for _, row in rows)
+        return data
+
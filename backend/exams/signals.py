@@ -0,0 +1,14 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import ExamResult
+from .ranking import rank_exam_by_id
+
+
+@receiver(post_save, sender=ExamResult)
+@receiver(post_delete, sender=ExamResult)
+def update_exam_ranks(sender, instance, **kwargs):
+    """Re-rank the exam once the change to a single result is committed"""
+    transaction.on_commit(partial(rank_exam_by_id, instance.exam_id))
@@ -5,6 +5,7 @@ from . import views
 router = DefaultRouter()
 router.register(r'exams', views.ExamViewSet, basename='exam')
 router.register(r'results', views.ExamResultViewSet, basename='exam-result')
+router.register(r'grade-boundaries', views.GradeBoundaryViewSet, basename='grade-boundary')
 
 urlpatterns = [
     path('', include(router.urls)),
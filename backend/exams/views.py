@@ -1,11 +1,30 @@
+import zipfile
+from datetime import date
+
+import numpy as np
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.db import models
+from django.db.models import Avg, Count, F, FloatField
+from django.db.models.functions import Cast, NullIf
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Exam, ExamResult
-from .serializers import ExamSerializer, ExamResultSerializer, ExamResultDetailSerializer
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from .models import Exam, ExamResult, GradeBoundary
+from .serializers import (
+    ExamSerializer, ExamResultSerializer, ExamResultDetailSerializer,
+    GradeBoundarySerializer, BulkMarksEntrySerializer
+)
+from .grading import validate_marks, save_marks, get_grade_boundaries
+from .report_cards import collect_class_cards, generate_report_cards, report_card_filename
+from utils.exports import stream_zip
+from utils.schools import get_user_school
+
+# Percentage of a result against its own exam's maximum; NULL when max_marks is 0
+PERCENTAGE = F('marks_obtained') * 100.0 / NullIf(Cast('exam__max_marks', FloatField()), 0.0)
+ANALYTICS_PERCENTILES = [10, 25, 50, 75, 90]
 
 
 class ExamViewSet(viewsets.ModelViewSet):
@@ -17,6 +36,185 @@ class ExamViewSet(viewsets.ModelViewSet):
     search_fields = ['exam_type', 'course', 'subject', 'semester']
     ordering = ['-date', '-created_at']
 
+    @action(detail=True, methods=['post'])
+    def marks(self, request, pk=None):
+        """
+        Enter the marks of a whole class for this exam in one request.
+
+        Accepts JSON ({"results": [{"student": 12, "marks_obtained": 78}, ...]})
+        or a multipart CSV upload in ``file``. Grades are computed from the
+        school's grade boundaries. If any row is invalid nothing is saved and
+        the response lists the errors per row; existing results are updated
+        in place, so the corrected sheet can simply be sent again.
+        """
+        if request.user.role not in ['faculty', 'admin']:
+            return Response({'error': 'Only faculty and admins can enter marks'}, status=status.HTTP_403_FORBIDDEN)
+
+        exam = self.get_object()
+        if not request.user.is_superuser and exam.school_id != getattr(get_user_school(request.user), 'id', None):
+            return Response({'error': 'You can only enter marks for exams in your school'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BulkMarksEntrySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data['rows']
+
+        entries, errors = validate_marks(exam, rows)
+        if errors:
+            return Response({
+                'error': f'{len(errors)} of {len(rows)} rows are invalid; no marks were saved',
+                'row_errors': errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        entered_by = getattr(request.user, 'staff_profile', None) or exam.created_by
+        saved, grade_distribution = save_marks(
+            exam, entries, entered_by, update_remarks=serializer.validated_data['update_remarks']
+        )
+        return Response({
+            'success': True,
+            'exam': exam.id,
+            'saved': saved,
+            'grade_distribution': grade_distribution,
+        })
+
+    @action(detail=True, methods=['get'])
+    def analytics(self, request, pk=None):
+        """Distribution of marks for this exam: mean, median, percentiles, spread and grades"""
+        exam = self.get_object()
+        results = ExamResult.objects.filter(exam=exam).order_by()
+        # One column is all the statistics need
+        marks = np.fromiter(results.values_list('marks_obtained', flat=True), dtype=np.float64)
+        grade_counts = dict(results.values('grade').annotate(count=Count('id')).values_list('grade', 'count'))
+
+        response = {
+            'exam': exam.id,
+            'name': exam.name,
+            'subject': exam.subject,
+            'course': exam.course,
+            'max_marks': exam.max_marks,
+            'count': int(marks.size),
+            'grade_distribution': {
+                grade: grade_counts[grade] for grade, _ in ExamResult.GRADE_CHOICES if grade_counts.get(grade)
+            },
+        }
+        if not marks.size:
+            return Response(response)
+
+        percentiles = np.percentile(marks, ANALYTICS_PERCENTILES)
+        response['marks'] = {
+            'mean': round(float(marks.mean()), 2),
+            'median': round(float(np.median(marks)), 2),
+            'std': round(float(marks.std()), 2),
+            'min': float(marks.min()),
+            'max': float(marks.max()),
+            'percentiles': {
+                f'p{rank}': round(float(value), 2) for rank, value in zip(ANALYTICS_PERCENTILES, percentiles)
+            },
+        }
+        if exam.max_marks > 0:
+            scale = 100.0 / exam.max_marks
+            response['percentage'] = {
+                'mean': round(float(marks.mean() * scale), 2),
+                'median': round(float(np.median(marks) * scale), 2),
+                'std': round(float(marks.std() * scale), 2),
+                'percentiles': {
+                    f'p{rank}': round(float(value * scale), 2) for rank, value in zip(ANALYTICS_PERCENTILES, percentiles)
+                },
+            }
+        return Response(response)
+
+    @action(detail=False, methods=['get'], url_path='report-cards')
+    def report_cards(self, request):
+        """
+        Download the term report cards of a class as a ZIP, or one student's card as a PDF.
+
+        Query params: course, semester, optional date_from/date_to (YYYY-MM-DD)
+        and student (profile id). Cards whose data has not changed since they
+        were last rendered are served from the cache.
+        """
+        if request.user.role not in ['faculty', 'admin', 'management']:
+            return Response({'error': 'Only staff can download report cards'}, status=status.HTTP_403_FORBIDDEN)
+        school = get_user_school(request.user)
+        if school is None:
+            return Response({'error': 'User is not associated with any school'}, status=status.HTTP_400_BAD_REQUEST)
+
+        course = request.query_params.get('course')
+        semester = request.query_params.get('semester')
+        student_id = request.query_params.get('student')
+        if not course or not semester:
+            return Response({'error': 'course and semester are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            semester = int(semester)
+            date_from = date.fromisoformat(request.query_params['date_from']) if request.query_params.get('date_from') else None
+            date_to = date.fromisoformat(request.query_params['date_to']) if request.query_params.get('date_to') else None
+            student_ids = [int(student_id)] if student_id else None
+        except ValueError:
+            return Response({'error': 'semester and student must be integers and dates YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        cards = collect_class_cards(school, course, semester, date_from, date_to, student_ids=student_ids)
+        if not cards:
+            return Response({'error': 'No active students found for this class'}, status=status.HTTP_404_NOT_FOUND)
+        files, _ = generate_report_cards(cards)
+
+        if student_ids:
+            card, path = files[0]
+            return FileResponse(open(path, 'rb'), as_attachment=True, filename=report_card_filename(card),
+                                content_type='application/pdf')
+
+        # PDF pages are already compressed, so the archive only stores them
+        response = StreamingHttpResponse(
+            stream_zip([(report_card_filename(card), path) for card, path in files], compression=zipfile.ZIP_STORED),
+            content_type='application/zip'
+        )
+        filename = f'report_cards_{course}_sem{semester}.zip'.replace(' ', '_').replace('/', '-')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class GradeBoundaryViewSet(viewsets.ModelViewSet):
+    """Grade boundaries of the user's school: readable by the school, writable by its admins"""
+    serializer_class = GradeBoundarySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return GradeBoundary.objects.filter(school=get_user_school(self.request.user)).order_by('-min_percentage')
+
+    def list(self, request, *args, **kwargs):
+        """The school's boundaries, or the defaults when none are configured"""
+        queryset = self.get_queryset()
+        if queryset.exists():
+            return super().list(request, *args, **kwargs)
+        return Response([
+            {'id': None, 'school': None, 'grade': grade, 'min_percentage': minimum}
+            for grade, minimum in get_grade_boundaries(None)
+        ])
+
+    def check_admin(self):
+        if self.request.user.role != 'admin' or get_user_school(self.request.user) is None:
+            raise PermissionDenied('Only school admins can change grade boundaries')
+
+    def perform_create(self, serializer):
+        self.check_admin()
+        school = get_user_school(self.request.user)
+        if GradeBoundary.objects.filter(school=school, grade=serializer.validated_data['grade']).exists():
+            raise ValidationError({'grade': 'A boundary for this grade already exists'})
+        serializer.save(school=school)
+
+    def perform_update(self, serializer):
+        self.check_admin()
+        grade = serializer.validated_data.get('grade', serializer.instance.grade)
+        if GradeBoundary.objects.filter(school=serializer.instance.school, grade=grade).exclude(
+            id=serializer.instance.id
+        ).exists():
+            raise ValidationError({'grade': 'A boundary for this grade already exists'})
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        self.check_admin()
+        instance.delete()
+
 
 class ExamResultViewSet(viewsets.ModelViewSet):
     """ViewSet for ExamResult model"""
@@ -27,14 +225,16 @@ class ExamResultViewSet(viewsets.ModelViewSet):
     ordering = ['-exam__date', '-entered_at']
     
     def get_queryset(self):
-        queryset = ExamResult.objects.all()
+        queryset = ExamResult.objects.select_related(
+            'exam', 'student__user', 'entered_by__user', 'rank'
+        ).order_by(*self.ordering)
         user = self.request.user
         
         # Filter based on user role
         if user.role == 'student':
             # Students can only see their own results
             try:
-                student_profile = user.studentprofile
+                student_profile = user.student_profile
                 queryset = queryset.filter(student=student_profile)
             except:
                 queryset = queryset.none()
@@ -87,8 +287,11 @@ class ExamResultViewSet(viewsets.ModelViewSet):
         """Get exam results summary for the current user"""
         queryset = self.get_queryset()
         
-        # Calculate summary statistics
-        total_exams = queryset.count()
+        # Grade histogram and total in one grouped query
+        grade_counts = dict(
+            queryset.order_by().values('grade').annotate(count=Count('id')).values_list('grade', 'count')
+        )
+        total_exams = sum(grade_counts.values())
         if total_exams == 0:
             return Response({
                 'total_exams': 0,
@@ -97,34 +300,20 @@ class ExamResultViewSet(viewsets.ModelViewSet):
                 'recent_results': []
             })
         
-        # Calculate average percentage
-        avg_percentage = queryset.aggregate(
-            avg_marks=models.Avg('marks_obtained'),
-            avg_max_marks=models.Avg('exam__max_marks')
-        )
-        
-        if avg_percentage['avg_max_marks'] and avg_percentage['avg_max_marks'] > 0:
-            average_percentage = round(
-                (avg_percentage['avg_marks'] / avg_percentage['avg_max_marks']) * 100, 2
-            )
-        else:
-            average_percentage = 0
+        # Mean of each result's own percentage, so exams with different maxima are weighted correctly
+        average_percentage = queryset.aggregate(average=Avg(PERCENTAGE))['average'] or 0
         
-        # Grade distribution
-        grade_distribution = {}
-        for choice in ExamResult.GRADE_CHOICES:
-            grade = choice[0]
-            count = queryset.filter(grade=grade).count()
-            if count > 0:
-                grade_distribution[grade] = count
+        grade_distribution = {
+            grade: grade_counts[grade] for grade, _ in ExamResult.GRADE_CHOICES if grade_counts.get(grade)
+        }
         
         # Recent results (last 5)
-        recent_results = queryset[:5]
+        recent_results = queryset.order_by(*self.ordering)[:5]
         recent_serializer = self.get_serializer(recent_results, many=True)
         
         return Response({
             'total_exams': total_exams,
-            'average_percentage': average_percentage,
+            'average_percentage': round(average_percentage, 2),
             'grade_distribution': grade_distribution,
             'recent_results': recent_serializer.data
         })
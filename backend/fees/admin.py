@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from django.contrib import admin
-from .models import FeeStructure, FeeInvoice, Payment
+from .models import FeeStructure, FeeInvoice, Payment, WebhookEvent
 
 @admin.register(FeeStructure)
 class FeeStructureAdmin(admin.ModelAdmin):
@@ -39,3 +39,13 @@ class PaymentAdmin(admin.ModelAdmin):
     list_filter = ['payment_method', 'payment_date']
     search_fields = ['transaction_id', 'invoice__invoice_number']
     readonly_fields = ['transaction_id', 'payment_date']
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    """Admin configuration for WebhookEvent"""
+    
+    list_display = ['event_id', 'event_type', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'event_type', 'received_at']
+    search_fields = ['event_id']
+    readonly_fields = ['event_id', 'event_type', 'payload', 'received_at', 'processed_at']
@@ -0,0 +1,152 @@
+"""
+Term billing: one tuition invoice per active student from their class's
+``FeeStructure``.
+
+The run is set-based. The school's fee structures are loaded once into a
+``(course, semester)`` map and the roster is streamed in chunks of plain
+tuples. For each chunk, one query finds the students already invoiced and
+the rest are written with one ``bulk_create``, so the number of queries
+depends on the number of chunks, not students.
+
+Reruns are idempotent. A student who already has an invoice for the same
+fee structure and academic year is skipped, and the
+``fees_unique_term_invoice`` constraint backs this up when two runs
+overlap: a chunk that collides with the other run's rows drops them and is
+inserted again, so each run only counts the invoices it wrote. Invoice
+numbers are derived from the year, fee structure and student (``T`` +
+year + structure id + student id), so a rerun or a retried chunk always
+produces the same number and two invoices never share one.
+"""
+import logging
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from users.models import StudentProfile
+from .models import FeeStructure, FeeInvoice
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_STRUCTURE_ID = 999_999
+MAX_STUDENT_ID = 99_999_999
+
+
+def term_invoice_number(academic_year, fee_structure_id, student_id):
+    """Deterministic 19-character invoice number for a term invoice"""
+    if fee_structure_id > MAX_STRUCTURE_ID or student_id > MAX_STUDENT_ID:
+        raise ValueError('Fee structure or student id too large for a term invoice number')
+    return f"T{academic_year:04d}{fee_structure_id:06d}{student_id:08d}"
+
+
+def _invoiced(billable, academic_year):
+    """``(student id, fee structure id)`` pairs among ``billable`` that already have an invoice for the year"""
+    return set(FeeInvoice.objects.filter(
+        student_id__in=[student_id for student_id, _ in billable],
+        fee_structure_id__in={structure.id for _, structure in billable},
+        academic_year=academic_year
+    ).values_list('student_id', 'fee_structure_id'))
+
+
+def _insert_invoices(invoices, billable, academic_year):
+    """
+    Insert a chunk's invoices and return the ones this run wrote.
+
+    If an overlapping run invoiced some of the students in the meantime, the
+    insert fails on ``fees_unique_term_invoice``; those students are dropped
+    and the rest inserted again.
+    """
+    while invoices:
+        try:
+            with transaction.atomic():
+                FeeInvoice.objects.bulk_create(invoices)
+            return invoices
+        except IntegrityError:
+            taken = _invoiced(billable, academic_year)
+            remaining = [
+                invoice for invoice in invoices if (invoice.student_id, invoice.fee_structure_id) not in taken
+            ]
+            if len(remaining) == len(invoices):
+                raise
+            invoices = remaining
+    return invoices
+
+
+def run_term_billing(school, academic_year, due_date, course=None, semester=None,
+                     dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Invoice every active student of ``school`` for ``academic_year`` from their fee structure.
+
+    Returns totals: students considered, invoices created, students already
+    invoiced, students whose class has no fee structure (with the classes),
+    and the amount billed.
+    """
+    started = timezone.now()
+    structures = {
+        (structure.course, structure.semester): structure
+        for structure in FeeStructure.objects.filter(school=school)
+    }
+    students = StudentProfile.objects.filter(school=school, is_active=True)
+    if course:
+        students = students.filter(course=course)
+    if semester is not None:
+        students = students.filter(semester=semester)
+    rows = students.order_by('id').values_list('id', 'course', 'semester').iterator(chunk_size=chunk_size)
+
+    totals = {
+        'students': 0,
+        'created': 0,
+        'already_invoiced': 0,
+        'without_structure': 0,
+        'amount': Decimal('0'),
+    }
+    missing_classes = {}
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        totals['students'] += len(chunk)
+
+        billable = []
+        for student_id, student_course, student_semester in chunk:
+            structure = structures.get((student_course, student_semester))
+            if structure is None:
+                key = f'{student_course} / semester {student_semester}'
+                missing_classes[key] = missing_classes.get(key, 0) + 1
+                continue
+            billable.append((student_id, structure))
+        totals['without_structure'] += len(chunk) - len(billable)
+
+        existing = _invoiced(billable, academic_year)
+
+        invoices = [
+            FeeInvoice(
+                invoice_number=term_invoice_number(academic_year, structure.id, student_id),
+                student_id=student_id,
+                fee_structure=structure,
+                fee_type='tuition',
+                description=f'Term Fee - {structure.course} Semester {structure.semester} ({academic_year})',
+                amount=structure.total_fee,
+                due_date=due_date,
+                academic_year=academic_year,
+                status='pending'
+            )
+            for student_id, structure in billable
+            if (student_id, structure.id) not in existing
+        ]
+        if not dry_run:
+            invoices = _insert_invoices(invoices, billable, academic_year)
+        totals['already_invoiced'] += len(billable) - len(invoices)
+        totals['created'] += len(invoices)
+        totals['amount'] += sum((invoice.amount for invoice in invoices), Decimal('0'))
+
+    totals['missing_structures'] = missing_classes
+    totals['elapsed_seconds'] = round((timezone.now() - started).total_seconds(), 2)
+    logger.info(
+        'Term billing for %s %s: %d created, %d already invoiced, %d without fee structure%s',
+        school.school_code, academic_year, totals['created'], totals['already_invoiced'],
+        totals['without_structure'], ' (dry run)' if dry_run else ''
+    )
+    return totals
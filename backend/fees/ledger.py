@@ -0,0 +1,124 @@
+"""
+Unified fee ledger: term/hostel invoices with their payments and enrolment
+admission fees in one list.
+
+The ledger is ordered and paginated in the database. A ``UNION ALL`` of two
+narrow projections, ``(entry_type, entry_id, entry_date)`` from
+``FeeInvoice`` and from enrolled ``SchoolAdmissionDecision`` rows, is sorted
+newest first and sliced to the requested page. Only the rows on that page
+are then loaded in full: invoices with their fee structure, student and a
+``Prefetch`` of payments, and decisions with their application and school,
+priced in one call to the admission fee resolver. A page costs a fixed
+number of queries however long the ledger is.
+"""
+from django.db.models import CharField, DateTimeField, F, Prefetch, Value
+from django.db.models.functions import Coalesce
+
+from admissions.fee_resolver import bulk_fee_amounts
+from admissions.models import SchoolAdmissionDecision
+from .models import FeeInvoice, Payment
+
+LEDGER_ORDERING = ['-entry_date', 'entry_type', '-entry_id']
+
+
+def ledger_rows(invoices, decisions):
+    """Ordered ``(entry_type, entry_id, entry_date)`` rows for the invoices and admission decisions"""
+    invoice_rows = invoices.order_by().annotate(
+        entry_type=Value('fee', output_field=CharField()),
+        entry_id=F('id'),
+        entry_date=F('created_date')
+    ).values_list('entry_type', 'entry_id', 'entry_date')
+    admission_rows = decisions.order_by().annotate(
+        entry_type=Value('admission', output_field=CharField()),
+        entry_id=F('id'),
+        entry_date=Coalesce('enrollment_date', 'decision_date', output_field=DateTimeField())
+    ).values_list('entry_type', 'entry_id', 'entry_date')
+    return invoice_rows.union(admission_rows, all=True).order_by(*LEDGER_ORDERING)
+
+
+def enrolled_admission_decisions(user):
+    """Admission decisions whose fee belongs in a student's ledger"""
+    if user.role != 'student':
+        return SchoolAdmissionDecision.objects.none()
+    return SchoolAdmissionDecision.objects.filter(student_user=user, enrollment_status='enrolled')
+
+
+def _invoice_description(invoice):
+    if invoice.fee_type == 'hostel':
+        return invoice.description or f"Hostel Fee - Academic Year {invoice.academic_year}"
+    if invoice.fee_structure:
+        return f"Academic Fee - {invoice.fee_structure.course} Semester {invoice.fee_structure.semester}"
+    return invoice.description or f"{invoice.get_fee_type_display()} - Academic Year {invoice.academic_year}"
+
+
+def invoice_entry(invoice):
+    entry = {
+        'id': f"fee_{invoice.id}",
+        'type': 'fee',
+        'description': _invoice_description(invoice),
+        'amount': float(invoice.amount),
+        'status': invoice.status,
+        'due_date': invoice.due_date.isoformat() if invoice.due_date else None,
+        'created_date': invoice.created_date.isoformat(),
+        'invoice_number': invoice.invoice_number,
+        'student_name': f"{invoice.student.first_name} {invoice.student.last_name}",
+        'category': invoice.fee_type
+    }
+    if invoice.status == 'paid' and invoice.ledger_payments:
+        payment = invoice.ledger_payments[0]
+        entry.update({
+            'payment_method': payment.payment_method,
+            'payment_date': payment.payment_date.isoformat(),
+            'transaction_id': payment.transaction_id
+        })
+    return entry
+
+
+def admission_entry(decision, amount):
+    created = decision.enrollment_date or decision.decision_date
+    entry = {
+        'id': f"admission_{decision.id}",
+        'type': 'admission',
+        'description': f"Admission Fee - {decision.school.school_name}",
+        'amount': amount,
+        'status': decision.payment_status,
+        'due_date': None,
+        'created_date': created.isoformat() if created else None,
+        'invoice_number': f"ADM-{decision.application.reference_id}",
+        'student_name': decision.application.applicant_name,
+        'category': 'admission_fee'
+    }
+    if decision.payment_status == 'completed':
+        entry.update({
+            'payment_method': 'online',  # Admission payments do not record a method
+            'payment_date': decision.payment_completed_at.isoformat() if decision.payment_completed_at else None,
+            'transaction_id': decision.payment_reference
+        })
+    return entry
+
+
+def build_ledger_entries(rows):
+    """Load the invoices and decisions on one page of ``ledger_rows`` and return their entries in order"""
+    invoice_ids = [entry_id for entry_type, entry_id, _ in rows if entry_type == 'fee']
+    decision_ids = [entry_id for entry_type, entry_id, _ in rows if entry_type == 'admission']
+
+    invoices = {}
+    if invoice_ids:
+        invoices = FeeInvoice.objects.select_related('fee_structure', 'student').prefetch_related(
+            Prefetch('payment_set', queryset=Payment.objects.order_by('id'), to_attr='ledger_payments')
+        ).in_bulk(invoice_ids)
+    decisions = {}
+    admission_fees = {}
+    if decision_ids:
+        decisions = SchoolAdmissionDecision.objects.select_related('application', 'school').in_bulk(decision_ids)
+        admission_fees = dict(zip(
+            decisions, bulk_fee_amounts([decision.application for decision in decisions.values()])
+        ))
+
+    entries = []
+    for entry_type, entry_id, _ in rows:
+        if entry_type == 'fee' and entry_id in invoices:
+            entries.append(invoice_entry(invoices[entry_id]))
+        elif entry_type == 'admission' and entry_id in decisions:
+            entries.append(admission_entry(decisions[entry_id], admission_fees[entry_id]))
+    return entries
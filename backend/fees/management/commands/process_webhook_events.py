@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from fees.webhooks import WEBHOOK_BATCH_SIZE, process_pending_events
+
+
+class Command(BaseCommand):
+    help = 'Apply payment gateway events queued in the webhook inbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=WEBHOOK_BATCH_SIZE, help='Events read per query')
+        parser.add_argument('--max-events', type=int, help='Stop after this many events')
+        parser.add_argument('--shard', type=str, help='INDEX/COUNT: only handle this share of the events, '
+                                                      'to run COUNT workers side by side')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the inbox instead of exiting')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        shard = None
+        if options['shard']:
+            try:
+                shard = tuple(int(part) for part in options['shard'].split('/'))
+            except ValueError:
+                shard = ()
+            if len(shard) != 2 or not 0 <= shard[0] < shard[1]:
+                raise CommandError('--shard must be INDEX/COUNT with 0 <= INDEX < COUNT, e.g. 0/4')
+
+        while True:
+            started = time.perf_counter()
+            stats = process_pending_events(
+                batch_size=options['batch_size'], max_events=options['max_events'], shard=shard
+            )
+            elapsed = time.perf_counter() - started
+            handled = sum(stats.values())
+            if handled or not options['loop']:
+                rate = handled / elapsed if elapsed else 0
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'\nWebhook processing completed in {elapsed:.1f}s ({rate:.0f} events/s):'
+                        f'\n- Processed: {stats["processed"]}'
+                        f'\n- Ignored (unknown type): {stats["ignored"]}'
+                        f'\n- Failed: {stats["failed"]}'
+                        f'\n- Queued for retry: {stats["received"]}'
+                        f'\n- Taken by another worker: {stats["skipped"]}'
+                    )
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
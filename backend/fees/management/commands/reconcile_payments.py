@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from fees.payments import reconcile_payments
+
+
+class Command(BaseCommand):
+    help = 'Retry failed payment effects and repair or report invoice/payment mismatches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be repaired without writing')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stats = reconcile_payments(dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        if stats['paid_without_payment']:
+            self.stdout.write(self.style.WARNING(
+                f'{stats["paid_without_payment"]} invoices are marked paid but have no payment'
+            ))
+        if stats['invoices_paid_twice']:
+            self.stdout.write(self.style.WARNING(
+                f'{stats["invoices_paid_twice"]} invoices have more than one payment (see the log for ids)'
+            ))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nPayment reconciliation {"dry run " if options["dry_run"] else ""}completed in {elapsed:.1f}s:'
+                f'\n- Payments with pending effects: {stats["effects_retried"]}'
+                f'\n- Effects applied now: {stats["effects_applied"]}'
+                f'\n- Invoices marked paid: {stats["invoices_marked_paid"]}'
+            )
+        )
@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from schools.models import School
+from fees.billing import run_term_billing, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Generate term invoices for every active student of a school from the fee structures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=str, required=True, help='School code')
+        parser.add_argument('--academic-year', type=int, required=True, help='Academic year to bill, e.g. 2026')
+        parser.add_argument('--due-date', type=str, required=True, help='Invoice due date (YYYY-MM-DD)')
+        parser.add_argument('--course', type=str, help='Only bill this course')
+        parser.add_argument('--semester', type=int, help='Only bill this semester')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Students per insert batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be invoiced without writing')
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(school_code=options['school']).first()
+        if school is None:
+            raise CommandError(f'School "{options["school"]}" does not exist.')
+        try:
+            due_date = date.fromisoformat(options['due_date'])
+        except ValueError:
+            raise CommandError('--due-date must be in YYYY-MM-DD format')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        totals = run_term_billing(
+            school, options['academic_year'], due_date,
+            course=options['course'],
+            semester=options['semester'],
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size']
+        )
+
+        for label, count in sorted(totals['missing_structures'].items()):
+            self.stdout.write(self.style.WARNING(f'No fee structure for {label}: {count} students not billed'))
+        elapsed = totals['elapsed_seconds']
+        rate = totals['students'] / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nTerm billing {"dry run " if options["dry_run"] else ""}completed in {elapsed:.1f}s:'
+                f'\n- Students considered: {totals["students"]} ({rate:.0f}/s)'
+                f'\n- Invoices created: {totals["created"]}'
+                f'\n- Already invoiced: {totals["already_invoiced"]}'
+                f'\n- Without fee structure: {totals["without_structure"]}'
+                f'\n- Amount billed: {totals["amount"]}'
+            )
+        )
@@ -0,0 +1,232 @@
+"""
+Local payment gateway simulator for load-testing the webhook flow.
+
+Creates throwaway invoices, then plays the gateway: it sends one signed
+``payment.succeeded`` callback per invoice plus a share of duplicates, half
+of them redeliveries of the same event and half new events for the same
+payment. Callbacks are sent from ``--workers`` processes, together paced to
+``--rate`` per second. By default each process calls the webhook endpoint
+in-process through the Django test client, standing in for one server worker,
+so no server or external service is needed; ``--url`` sends real HTTP
+requests to a running server instead.
+
+Afterwards the inbox is drained by the same number of sharded workers, and
+the run checks that every invoice was paid exactly once. Throughput and
+latency percentiles are reported for both stages.
+"""
+import json
+import multiprocessing
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from urllib import error, request as urlrequest
+
+import django
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from fees.models import FeeInvoice, Payment, WebhookEvent
+from fees.webhooks import SIGNATURE_HEADER, process_pending_events, sign_payload
+from users.models import StudentProfile
+
+INVOICE_AMOUNT = '100.00'
+
+
+def _post_in_process(client, url, body, signature):
+    return client.post(url, data=body, content_type='application/json', headers={SIGNATURE_HEADER: signature}).status_code
+
+
+def _post_http(url, body, signature):
+    outgoing = urlrequest.Request(
+        url, data=body, method='POST', headers={'Content-Type': 'application/json', SIGNATURE_HEADER: signature}
+    )
+    try:
+        with urlrequest.urlopen(outgoing, timeout=30) as response:
+            return response.status
+    except error.HTTPError as e:
+        return e.code
+
+
+def send_callbacks(events, interval, secret, url=None):
+    """
+    Sender process: post ``events`` one every ``interval`` seconds.
+
+    Returns ``(first_sent, last_done, accepted, errors, latencies)`` with wall-clock times.
+    """
+    if url:
+        send = lambda body, signature: _post_http(url, body, signature)
+        settings_context = nullcontext()
+    else:
+        client = Client()
+        endpoint = reverse('payment-webhook')
+        send = lambda body, signature: _post_in_process(client, endpoint, body, signature)
+        settings_context = override_settings(PAYMENT_WEBHOOK_SECRET=secret)
+
+    accepted = errors = 0
+    latencies = []
+    with settings_context:
+        began = time.perf_counter()
+        first_sent = time.time()
+        for position, event in enumerate(events):
+            delay = began + position * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            body = json.dumps(event).encode()
+            sent_at = time.perf_counter()
+            code = send(body, sign_payload(body, int(time.time()), secret))
+            latencies.append(time.perf_counter() - sent_at)
+            if code == 200:
+                accepted += 1
+            else:
+                errors += 1
+    connection.close()
+    return first_sent, time.time(), accepted, errors, latencies
+
+
+def drain_shard(index, count):
+    """Worker process: apply this shard's queued events. Returns ``(started, finished, stats)``."""
+    started = time.time()
+    stats = process_pending_events(shard=(index, count))
+    connection.close()
+    return started, time.time(), stats
+
+
+class Command(BaseCommand):
+    help = 'Simulate a payment gateway sending signed webhook callbacks, then process and verify them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--callbacks', type=int, default=5000, help='Callbacks to send, duplicates included')
+        parser.add_argument('--rate', type=float, default=1000, help='Target callbacks per second (0 = unpaced)')
+        parser.add_argument('--workers', type=int, default=4, help='Sender processes, and inbox workers afterwards')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.2, help='Share of callbacks that are duplicates')
+        parser.add_argument('--url', type=str, help='Webhook URL of a running server (default: in-process)')
+        parser.add_argument('--secret', type=str, default='simulator-secret',
+                            help='Signing secret; must match PAYMENT_WEBHOOK_SECRET when using --url')
+        parser.add_argument('--student', type=str, help='Admission number of the student to bill (default: any)')
+        parser.add_argument('--seed', type=int, default=7, help='Random seed for duplicates and ordering')
+        parser.add_argument('--keep', action='store_true', help='Keep the test invoices, payments and events')
+
+    def handle(self, *args, **options):
+        callbacks = options['callbacks']
+        workers = options['workers']
+        ratio = options['duplicate_ratio']
+        if callbacks < 1 or workers < 1 or options['rate'] < 0 or not 0 <= ratio < 1:
+            raise CommandError('--callbacks and --workers must be positive, --rate not negative '
+                               'and --duplicate-ratio in [0, 1)')
+
+        students = StudentProfile.objects.all()
+        if options['student']:
+            students = students.filter(admission_number=options['student'])
+        student = students.order_by('id').first()
+        if student is None:
+            raise CommandError('No student found to bill')
+
+        run = uuid.uuid4().hex[:8]
+        invoice_ids = [invoice.id for invoice in FeeInvoice.objects.bulk_create([
+            FeeInvoice(
+                invoice_number=f'SIM{run}{index:06d}',
+                student=student,
+                fee_type='other',
+                description='simulate_payment_gateway',
+                amount=INVOICE_AMOUNT,
+                due_date=timezone.localdate() + timedelta(days=30),
+                status='pending'
+            )
+            for index in range(max(1, round(callbacks * (1 - ratio))))
+        ], batch_size=1000)]
+        events = self._build_events(run, invoice_ids, callbacks, random.Random(options['seed']))
+        interval = workers / options['rate'] if options['rate'] else 0
+        connection.close()
+
+        try:
+            # spawn, not fork: workers must not inherit the parent's database connections
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+            ) as pool:
+                sent = list(pool.map(
+                    send_callbacks,
+                    [events[index::workers] for index in range(workers)],
+                    [interval] * workers, [options['secret']] * workers, [options['url']] * workers
+                ))
+                stored = WebhookEvent.objects.filter(event_id__startswith=f'evt_{run}_').count()
+                errors = self._report_sending(sent, stored)
+
+                drained = list(pool.map(drain_shard, range(workers), [workers] * workers))
+                self._report_processing(drained)
+
+            paid_once = Payment.objects.filter(invoice_id__in=invoice_ids).values('invoice_id').annotate(
+                payments=Count('id')
+            ).filter(payments=1).count()
+            unpaid = FeeInvoice.objects.filter(id__in=invoice_ids).exclude(status='paid').count()
+        finally:
+            if not options['keep']:
+                WebhookEvent.objects.filter(event_id__startswith=f'evt_{run}_').delete()
+                Payment.objects.filter(invoice_id__in=invoice_ids).delete()
+                FeeInvoice.objects.filter(id__in=invoice_ids).delete()
+
+        if paid_once == len(invoice_ids) and not unpaid and not errors:
+            self.stdout.write(self.style.SUCCESS(f'All {len(invoice_ids)} invoices were paid exactly once'))
+        else:
+            raise CommandError(
+                f'{paid_once} of {len(invoice_ids)} invoices paid exactly once, {unpaid} unpaid, '
+                f'{errors} callbacks rejected'
+            )
+
+    def _build_events(self, run, invoice_ids, callbacks, rng):
+        """One event per invoice, then duplicates: redeliveries and second events for the same payment"""
+        events = [
+            {
+                'id': f'evt_{run}_{invoice_id}',
+                'type': 'payment.succeeded',
+                'data': {
+                    'payment_id': f'pay_{run}_{invoice_id}',
+                    'reference': f'invoice:{invoice_id}',
+                    'amount': INVOICE_AMOUNT,
+                    'method': 'online',
+                },
+            }
+            for invoice_id in invoice_ids
+        ]
+        originals = list(events)
+        for index in range(callbacks - len(originals)):
+            original = rng.choice(originals)
+            if index % 2:
+                events.append(original)
+            else:
+                events.append({**original, 'id': f"{original['id']}_again{index}"})
+        rng.shuffle(events)
+        return events
+
+    def _report_sending(self, sent, stored):
+        elapsed = max(result[1] for result in sent) - min(result[0] for result in sent)
+        accepted = sum(result[2] for result in sent)
+        errors = sum(result[3] for result in sent)
+        total = accepted + errors
+        p50, p95, p99 = np.percentile(np.concatenate([result[4] for result in sent]) * 1000, [50, 95, 99])
+        self.stdout.write(
+            f'Ingestion: {total} callbacks in {elapsed:.2f}s ({total / elapsed:.0f}/s), '
+            f'{accepted} acknowledged, {errors} rejected, {stored} stored in the inbox '
+            f'({accepted - stored} redeliveries dropped); latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms'
+        )
+        return errors
+
+    def _report_processing(self, drained):
+        elapsed = max(result[1] for result in drained) - min(result[0] for result in drained)
+        stats = {}
+        for _, _, shard_stats in drained:
+            for outcome, count in shard_stats.items():
+                stats[outcome] = stats.get(outcome, 0) + count
+        handled = sum(stats.values())
+        self.stdout.write(
+            f'Processing: {handled} events in {elapsed:.2f}s ({handled / elapsed if elapsed else 0:.0f}/s) '
+            f'by {len(drained)} workers: {stats["processed"]} processed, {stats["failed"]} failed, '
+            f'{stats["received"]} queued for retry'
+        )
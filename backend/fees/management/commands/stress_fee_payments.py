@@ -0,0 +1,150 @@
+"""
+Concurrency harness for the fee payment pipeline.
+
+Creates throwaway invoices for one student, then submits every payment
+several times at once from many threads, as double clicks and gateway
+retries would. Half of the duplicates reuse one idempotency key, the other
+half each use a fresh key. Whichever submission pays an invoice first, the
+others must then be answered by its key: submissions repeating the key of
+the payment are replayed, and those with any other key are refused because
+the invoice is already paid. So when a fresh-key retry wins, the reused-key
+submissions are refused too. Afterwards it checks that every invoice is
+paid exactly once and that every submission got the answer its key calls
+for.
+
+As with ``stress_library_inventory``, run it against PostgreSQL to exercise
+real row locking; SQLite serialises writers, so it only checks correctness
+there.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.db.models import Count
+from django.utils import timezone
+
+from fees.models import FeeInvoice, Payment
+from fees.payments import PaymentError, process_payment
+from users.models import StudentProfile
+
+
+class Command(BaseCommand):
+    help = 'Submit duplicate payments for the same invoices from many threads and verify each is paid once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invoices', type=int, default=50, help='Invoices to create and pay')
+        parser.add_argument('--duplicates', type=int, default=8, help='Submissions per invoice')
+        parser.add_argument('--threads', type=int, default=16, help='Number of worker threads')
+        parser.add_argument('--student', type=str, help='Admission number of the student to bill (default: any)')
+        parser.add_argument('--keep', action='store_true', help='Keep the test invoices and payments afterwards')
+
+    def handle(self, *args, **options):
+        invoices = options['invoices']
+        duplicates = options['duplicates']
+        threads = options['threads']
+        if invoices < 1 or duplicates < 1 or threads < 1:
+            raise CommandError('--invoices, --duplicates and --threads must be positive')
+
+        students = StudentProfile.objects.all()
+        if options['student']:
+            students = students.filter(admission_number=options['student'])
+        student = students.order_by('id').first()
+        if student is None:
+            raise CommandError('No student found to bill')
+
+        run = uuid.uuid4().hex[:8]
+        invoice_ids = [invoice.id for invoice in FeeInvoice.objects.bulk_create([
+            FeeInvoice(
+                invoice_number=f'STR{run}{index:05d}',
+                student=student,
+                fee_type='other',
+                description='stress_fee_payments',
+                amount=100,
+                due_date=timezone.localdate() + timedelta(days=30),
+                status='pending'
+            )
+            for index in range(invoices)
+        ])]
+
+        # Each invoice gets one "real" submission repeated with the same key, plus retries with new keys
+        submissions = []
+        for invoice_id in invoice_ids:
+            for attempt in range(duplicates):
+                reuse = attempt % 2 == 0
+                key = f'{run}-{invoice_id}' if reuse else f'{run}-{invoice_id}-{attempt}'
+                transaction_id = f'TXN-{run}-{invoice_id}' if reuse else f'TXN-{run}-{invoice_id}-{attempt}'
+                submissions.append((invoice_id, transaction_id, key))
+
+        try:
+            results = self._hammer(threads, submissions)
+            paid_once = Payment.objects.filter(invoice_id__in=invoice_ids).values('invoice_id').annotate(
+                payments=Count('id')
+            ).filter(payments=1).count()
+            unpaid = FeeInvoice.objects.filter(id__in=invoice_ids).exclude(status='paid').count()
+            # A submission succeeds (created or replayed) exactly when its key is the one the invoice was paid with
+            paid_keys = dict(
+                Payment.objects.filter(invoice_id__in=invoice_ids).values_list('invoice_id', 'idempotency_key')
+            )
+            misanswered = sum(
+                1 for invoice_id, key, outcome in results['outcomes']
+                if (outcome in ('created', 'replayed')) != (key == paid_keys.get(invoice_id))
+            )
+            elapsed = results['elapsed']
+            self.stdout.write(
+                f'{len(submissions)} submissions for {len(invoice_ids)} invoices from {threads} threads in {elapsed:.2f}s '
+                f'({len(submissions) / elapsed:.0f}/s): {results["created"]} created, {results["replayed"]} replayed, '
+                f'{results["refused"]} refused, {results["errors"]} errors'
+            )
+        finally:
+            if not options['keep']:
+                Payment.objects.filter(invoice_id__in=invoice_ids).delete()
+                FeeInvoice.objects.filter(id__in=invoice_ids).delete()
+
+        if results['created'] != len(invoice_ids) or paid_once != len(invoice_ids) or unpaid or results['errors']:
+            raise CommandError(
+                f'Duplicate or missing payments: {paid_once} of {len(invoice_ids)} invoices paid once, '
+                f'{unpaid} unpaid'
+            )
+        if misanswered:
+            raise CommandError(
+                f'{misanswered} submissions were not answered by their key: a repeat of the paying key must be '
+                'replayed and any other key refused'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Every invoice was paid exactly once and every duplicate was replayed or refused by its key'
+        ))
+
+    def _hammer(self, threads, submissions):
+        """Run the submissions over ``threads`` workers that start together"""
+        results = {'created': 0, 'replayed': 0, 'refused': 0, 'errors': 0, 'outcomes': []}
+        lock = threading.Lock()
+        start_gate = threading.Barrier(threads)
+        shares = [submissions[index::threads] for index in range(threads)]
+
+        def worker(share):
+            close_old_connections()
+            try:
+                start_gate.wait()
+                for invoice_id, transaction_id, key in share:
+                    try:
+                        _, created = process_payment(invoice_id, transaction_id, 'online', key)
+                        outcome = 'created' if created else 'replayed'
+                    except PaymentError:
+                        outcome = 'refused'
+                    except Exception:
+                        outcome = 'errors'
+                    with lock:
+                        results[outcome] += 1
+                        results['outcomes'].append((invoice_id, key, outcome))
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, shares))
+        results['elapsed'] = time.perf_counter() - started
+        return results
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0003_feeinvoice_academic_year_feeinvoice_description_and_more'),
+        ('users', '0011_staffprofile_school'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='feeinvoice',
+            constraint=models.UniqueConstraint(condition=models.Q(('fee_structure__isnull', False)), fields=('student', 'fee_structure', 'academic_year'), name='fees_unique_term_invoice'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:57
+
+from django.db import migrations, models
+
+
+def mark_existing_payments_applied(apps, schema_editor):
+    # Payments made before the pipeline already had their effects applied inline
+    Payment = apps.get_model('fees', 'Payment')
+    Payment.objects.filter(effects_applied_at__isnull=True).update(effects_applied_at=models.F('payment_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0004_unique_term_invoice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='effects_applied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('effects_applied_at__isnull', True)), fields=['payment_date'], name='fees_payment_effects_pending'),
+        ),
+        migrations.RunPython(mark_existing_payments_applied, migrations.RunPython.noop),
+    ]
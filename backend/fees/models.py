@@ -63,6 +63,14 @@ class FeeInvoice(models.Model):
             models.Index(fields=['fee_type', 'student']),
             models.Index(fields=['academic_year', 'student']),
         ]
+        constraints = [
+            # One term invoice per student, fee structure and year, so billing runs can be repeated safely
+            models.UniqueConstraint(
+                fields=['student', 'fee_structure', 'academic_year'],
+                condition=models.Q(fee_structure__isnull=False),
+                name='fees_unique_term_invoice'
+            ),
+        ]
     
     def __str__(self):
         if self.fee_structure:
@@ -87,6 +95,49 @@ class Payment(models.Model):
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHOD_CHOICES)
     payment_date = models.DateTimeField(auto_now_add=True)
     receipt_path = models.CharField(max_length=500, blank=True)  # S3 path for receipt
+    # Client-supplied key: retries and double submissions of the same payment share it
+    idempotency_key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    # Set once the fee type's downstream effects (see fees.payments) have been applied
+    effects_applied_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # Small partial index for the reconciliation job's "effects not applied" scan
+            models.Index(
+                fields=['payment_date'],
+                condition=models.Q(effects_applied_at__isnull=True),
+                name='fees_payment_effects_pending'
+            ),
+        ]
     
     def __str__(self):
         return f"Payment {self.transaction_id} - {self.amount}"
+
+
+class WebhookEvent(models.Model):
+    """Inbox of payment gateway callbacks, stored as received and processed by a worker"""
+    
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+    
+    event_id = models.CharField(max_length=100, unique=True)  # Gateway event id; retried deliveries repeat it
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            models.Index(fields=['event_type', 'received_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
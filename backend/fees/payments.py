@@ -0,0 +1,208 @@
+"""
+Payment pipeline for fee invoices.
+
+``process_payment`` records a payment, marks the invoice paid and applies the
+fee type's downstream effects (activating a hostel allocation, finalizing an
+admission) in one transaction, with the invoice row locked by
+``select_for_update`` for the duration.
+
+Every payment carries an idempotency key, supplied by the client in the
+``Idempotency-Key`` header or defaulting to the gateway transaction id.
+Repeating a request with the same key returns the original payment instead
+of charging again, so double clicks and gateway retries are harmless. The
+unique constraints on the key and on ``transaction_id`` back this up on
+databases without row locks.
+
+Downstream effects are registered per ``fee_type`` with
+``register_payment_handler``. A handler runs in a savepoint: if it fails, its
+changes are rolled back but the payment itself is kept, and
+``Payment.effects_applied_at`` stays empty so ``reconcile_payments`` retries
+it later. Handlers must therefore be safe to run more than once.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import FeeInvoice, Payment
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_HANDLERS = {}
+
+
+class PaymentError(Exception):
+    """A payment that cannot be accepted; ``status_code`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def register_payment_handler(fee_type):
+    """Register ``handler(invoice, payment)`` as the downstream effect of paying a ``fee_type`` invoice"""
+    def decorator(handler):
+        PAYMENT_HANDLERS[fee_type] = handler
+        return handler
+    return decorator
+
+
+def apply_payment_effects(invoice, payment):
+    """Run the fee type's handler in a savepoint. Returns True if the effects are applied."""
+    handler = PAYMENT_HANDLERS.get(invoice.fee_type)
+    try:
+        if handler is not None:
+            with transaction.atomic():
+                handler(invoice, payment)
+    except Exception:
+        logger.exception(
+            'Applying %s payment effects failed for payment %s (invoice %s)',
+            invoice.fee_type, payment.transaction_id, invoice.invoice_number
+        )
+        return False
+    payment.effects_applied_at = timezone.now()
+    Payment.objects.filter(id=payment.id).update(effects_applied_at=payment.effects_applied_at)
+    return True
+
+
+def process_payment(invoice_id, transaction_id, payment_method='online', idempotency_key=None, amount=None):
+    """
+    Pay an invoice in full.
+
+    ``amount``, when given, is the amount actually paid and must match the
+    invoice. Returns ``(payment, created)``; ``created`` is False when the
+    request repeats an earlier one with the same idempotency key. Raises
+    ``PaymentError`` when the invoice cannot be paid.
+    """
+    key = idempotency_key or transaction_id
+    try:
+        with transaction.atomic():
+            try:
+                invoice = FeeInvoice.objects.select_for_update().get(id=invoice_id)
+            except FeeInvoice.DoesNotExist:
+                raise PaymentError('Invoice not found', status_code=404)
+
+            # Checked after taking the lock, so a concurrent duplicate has either committed or not started
+            existing = Payment.objects.filter(idempotency_key=key).first()
+            if existing is not None:
+                if existing.invoice_id != invoice.id:
+                    raise PaymentError('Idempotency key was already used for another invoice', status_code=409)
+                return existing, False
+            if invoice.status == 'paid':
+                raise PaymentError('Invoice already paid')
+            if invoice.status == 'cancelled':
+                raise PaymentError('Invoice has been cancelled')
+            if amount is not None and amount != invoice.amount:
+                raise PaymentError(f'Paid amount {amount} does not match invoice amount {invoice.amount}')
+
+            has_effects = invoice.fee_type in PAYMENT_HANDLERS
+            payment = Payment.objects.create(
+                invoice=invoice,
+                transaction_id=transaction_id,
+                amount=invoice.amount,
+                payment_method=payment_method,
+                idempotency_key=key,
+                effects_applied_at=None if has_effects else timezone.now()
+            )
+            invoice.status = 'paid'
+            invoice.save(update_fields=['status'])
+            if has_effects:
+                apply_payment_effects(invoice, payment)
+    except IntegrityError:
+        # A concurrent duplicate committed first on a database without row locks, or the transaction id is reused
+        existing = Payment.objects.filter(idempotency_key=key).first()
+        if existing is not None and existing.invoice_id == invoice_id:
+            return existing, False
+        raise PaymentError('Transaction ID has already been used', status_code=409)
+
+    logger.info('Payment %s recorded for invoice %s', payment.transaction_id, invoice.invoice_number)
+    return payment, True
+
+
+@register_payment_handler('hostel')
+def activate_hostel_allocation(invoice, payment):
+    """Activate the student's pending hostel allocation for this fee and link it to the payment"""
+    from hostel.models import HostelAllocation
+
+    if HostelAllocation.objects.filter(payment=payment).exists():
+        return
+    allocation = HostelAllocation.objects.select_for_update().filter(
+        student_id=invoice.student_id,
+        status='pending',
+        hostel_fee_amount=invoice.amount
+    ).order_by('created_at').first()
+    if allocation is None:
+        logger.warning(
+            'No pending hostel allocation found for student %s with amount %s',
+            invoice.student_id, invoice.amount
+        )
+        return
+    allocation.status = 'active'
+    allocation.payment = payment
+    allocation.save()  # Also updates room occupancy
+    logger.info('Activated hostel allocation %s for student %s', allocation.id, invoice.student_id)
+
+
+@register_payment_handler('admission')
+def finalize_admission_payment(invoice, payment):
+    """Mark the student's enrolled admission decision paid and finalize it"""
+    from admissions.models import SchoolAdmissionDecision
+
+    decision = SchoolAdmissionDecision.objects.select_for_update().filter(
+        student_user__student_profile=invoice.student_id,
+        enrollment_status='enrolled'
+    ).first()
+    if decision is None:
+        logger.warning('No enrolled admission decision found for student %s', invoice.student_id)
+        return
+    if decision.payment_status != 'completed':
+        decision.payment_status = 'completed'
+        decision.payment_reference = payment.transaction_id
+        decision.payment_completed_at = payment.payment_date
+    if not decision.finalize_payment():
+        decision.save()
+    logger.info('Finalized admission payment for decision %s', decision.id)
+
+
+def reconcile_payments(dry_run=False):
+    """
+    Repair and report inconsistencies between invoices and payments.
+
+    - Payments whose effects were never applied have their handlers retried.
+    - Unpaid invoices that have a payment are marked paid.
+    - Paid invoices without a payment and invoices paid more than once are
+      reported; they need a person to look at them.
+
+    Returns a dict of counts.
+    """
+    stats = {'effects_retried': 0, 'effects_applied': 0, 'invoices_marked_paid': 0}
+
+    pending_effects = list(
+        Payment.objects.filter(effects_applied_at__isnull=True).order_by('payment_date').values_list('id', 'invoice_id')
+    )
+    stats['effects_retried'] = len(pending_effects)
+    if not dry_run:
+        for payment_id, invoice_id in pending_effects:
+            with transaction.atomic():
+                invoice = FeeInvoice.objects.select_for_update().get(id=invoice_id)
+                # Re-read under the invoice lock: a concurrent run may have applied it already
+                payment = Payment.objects.get(id=payment_id)
+                if payment.effects_applied_at is None and apply_payment_effects(invoice, payment):
+                    stats['effects_applied'] += 1
+
+    has_payment = Exists(Payment.objects.filter(invoice=OuterRef('pk')))
+    unpaid_with_payment = FeeInvoice.objects.filter(has_payment).exclude(status__in=['paid', 'cancelled'])
+    if dry_run:
+        stats['invoices_marked_paid'] = unpaid_with_payment.count()
+    else:
+        stats['invoices_marked_paid'] = unpaid_with_payment.update(status='paid')
+
+    stats['paid_without_payment'] = FeeInvoice.objects.filter(status='paid').exclude(has_payment).count()
+    duplicates = list(
+        Payment.objects.order_by().values('invoice_id').annotate(payments=Count('id')).filter(payments__gt=1)
+    )
+    stats['invoices_paid_twice'] = len(duplicates)
+    for row in duplicates:
+        logger.warning('Invoice %s has %d payments', row['invoice_id'], row['payments'])
+    return stats
@@ -43,7 +43,7 @@ class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = '__all__'
-        read_only_fields = ['payment_date']
+        read_only_fields = ['payment_date', 'idempotency_key', 'effects_applied_at']
 
 
 class FeeInvoiceDetailSerializer(FeeInvoiceSerializer):
@@ -59,4 +59,13 @@ class FeeInvoiceDetailSerializer(FeeInvoiceSerializer):
 class PaymentCreateSerializer(serializers.Serializer):
     """Serializer for creating payments"""
     payment_method = serializers.ChoiceField(choices=Payment.PAYMENT_METHOD_CHOICES)
-    transaction_id = serializers.CharField(max_length=100)
\ No newline at end of file
+    transaction_id = serializers.CharField(max_length=100)
+
+
+class TermBillingSerializer(serializers.Serializer):
+    """Serializer for generating a term's invoices from the fee structures"""
+    academic_year = serializers.IntegerField(min_value=2000, max_value=9999)
+    due_date = serializers.DateField()
+    course = serializers.CharField(required=False, allow_blank=True)
+    semester = serializers.IntegerField(required=False, min_value=1)
+    dry_run = serializers.BooleanField(default=False)
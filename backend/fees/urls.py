@@ -8,5 +8,6 @@ router.register(r'invoices', views.FeeInvoiceViewSet)
 router.register(r'payments', views.PaymentViewSet)
 
 urlpatterns = [
+    path('webhooks/payment/', views.PaymentWebhookAPIView.as_view(), name='payment-webhook'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,18 +1,33 @@
+import json
+import logging
+
+from django.conf import settings
 from django.shortcuts import render
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.db.models import Q
 from django.utils import timezone
 # from django_filters.rest_framework import DjangoFilterBackend
 from .models import FeeStructure, FeeInvoice, Payment
 from .serializers import (
     FeeStructureSerializer, FeeInvoiceSerializer, 
-    PaymentSerializer, FeeInvoiceDetailSerializer
+    PaymentSerializer, FeeInvoiceDetailSerializer, TermBillingSerializer
 )
-from admissions.models import SchoolAdmissionDecision
+from .billing import run_term_billing
+from .ledger import ledger_rows, enrolled_admission_decisions, build_ledger_entries
+from .payments import PaymentError, process_payment
+from .webhooks import SIGNATURE_HEADER, WebhookSignatureError, record_event, verify_signature
+from utils.exports import ExportMixin
+from utils.api_responses import StandardPagination
+from utils.query_metrics import query_budget
+from utils.schools import get_user_school
+
+logger = logging.getLogger(__name__)
+
 
 class FeeStructureViewSet(viewsets.ModelViewSet):
     """ViewSet for FeeStructure"""
@@ -21,7 +36,7 @@ class FeeStructureViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
 
-class FeeInvoiceViewSet(viewsets.ModelViewSet):
+class FeeInvoiceViewSet(ExportMixin, viewsets.ModelViewSet):
     """ViewSet for FeeInvoice"""
     queryset = FeeInvoice.objects.all()
     serializer_class = FeeInvoiceSerializer
@@ -29,6 +44,20 @@ class FeeInvoiceViewSet(viewsets.ModelViewSet):
     # filter_backends = [DjangoFilterBackend]
     # filterset_fields = ['student', 'status']
     ordering = ['-created_date']
+    export_filename = 'fee_invoices'
+    export_fields = [
+        ('invoice_number', 'Invoice Number'),
+        ('student__admission_number', 'Admission Number'),
+        ('student__first_name', 'First Name'),
+        ('student__last_name', 'Last Name'),
+        ('fee_type', 'Fee Type'),
+        ('description', 'Description'),
+        ('amount', 'Amount'),
+        ('due_date', 'Due Date'),
+        ('academic_year', 'Academic Year'),
+        ('status', 'Status'),
+        ('created_date', 'Created'),
+    ]
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -54,112 +83,59 @@ class FeeInvoiceViewSet(viewsets.ModelViewSet):
             queryset = queryset.none()
         # Staff and admin can see all invoices
         
-        return queryset
+        return queryset.order_by(*self.ordering)
     
+    @query_budget(8)
     @action(detail=False, methods=['get'])
     def all_payments(self, request):
-        """Get all payments for the current user including admission fees"""
-        user = request.user
-        all_payments = []
-        
-        # Get regular fee invoices
-        queryset = self.get_queryset()
-        fee_invoices = queryset.select_related('fee_structure', 'student__user')
-        
-        for invoice in fee_invoices:
-            # Set description based on fee type
-            if invoice.fee_type == 'hostel':
-                description = invoice.description or f"Hostel Fee - Academic Year {invoice.academic_year}"
-            elif invoice.fee_structure:
-                description = f"Academic Fee - {invoice.fee_structure.course} Semester {invoice.fee_structure.semester}"
-            else:
-                description = invoice.description or f"{invoice.get_fee_type_display()} - Academic Year {invoice.academic_year}"
-            
-            payment_data = {
-                'id': f"fee_{invoice.id}",
-                'type': 'fee',
-                'description': description,
-                'amount': float(invoice.amount),
-                'status': invoice.status,
-                'due_date': invoice.due_date.isoformat() if invoice.due_date else None,
-                'created_date': invoice.created_date.isoformat(),
-                'invoice_number': invoice.invoice_number,
-                'student_name': f"{invoice.student.first_name} {invoice.student.last_name}",
-                'category': invoice.fee_type
-            }
-            
-            # Add payment details if paid
-            if invoice.status == 'paid':
-                try:
-                    payment = Payment.objects.filter(invoice=invoice).first()
-                    if payment:
-                        payment_data.update({
-                            'payment_method': payment.payment_method,
-                            'payment_date': payment.payment_date.isoformat(),
-                            'transaction_id': payment.transaction_id
-                        })
-                except:
-                    pass
-            
-            all_payments.append(payment_data)
-        
-        # Get admission fees if user is a student
-        if user.role == 'student':
-            try:
-                # Import AdmissionFeeStructure to calculate proper fee
-                from admissions.models import AdmissionFeeStructure
-                
-                # Find admission decisions for this student
-                decisions = SchoolAdmissionDecision.objects.filter(
-                    student_user=user,
-                    enrollment_status='enrolled'
-                ).select_related('application', 'school')
-                
-                for decision in decisions:
-                    # Calculate admission fee based on student's course and category
-                    admission_fee = AdmissionFeeStructure.get_fee_amount_for_student(
-                        decision.application.course_applied,
-                        decision.application.category
-                    )
-                    
-                    payment_data = {
-                        'id': f"admission_{decision.id}",
-                        'type': 'admission',
-                        'description': f"Admission Fee - {decision.school.school_name}",
-                        'amount': admission_fee,
-                        'status': decision.payment_status,
-                        'due_date': None,
-                        'created_date': decision.enrollment_date.isoformat() if decision.enrollment_date else decision.decision_date.isoformat() if decision.decision_date else None,
-                        'invoice_number': f"ADM-{decision.application.reference_id}",
-                        'student_name': decision.application.applicant_name,
-                        'category': 'admission_fee'
-                    }
-                    
-                    if decision.payment_status == 'completed':
-                        payment_data.update({
-                            'payment_method': 'online',  # Default since we don't track method for admission
-                            'payment_date': decision.payment_completed_at.isoformat() if decision.payment_completed_at else None,
-                            'transaction_id': decision.payment_reference
-                        })
-                    
-                    all_payments.append(payment_data)
-            except Exception as e:
-                # Log the error but continue
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Error fetching admission payments for user {user.id}: {e}")
-                pass
-        
-        # Sort by created_date (newest first)
-        all_payments.sort(key=lambda x: x.get('created_date', ''), reverse=True)
+        """
+        Get all payments for the current user including admission fees.
+
+        ``data`` is one page of the ledger, newest first; ``pagination``
+        describes the page (``?page=`` and ``?page_size=``, up to 100).
+        """
+        rows = ledger_rows(
+            self.get_queryset(),
+            enrolled_admission_decisions(request.user)
+        )
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
         
         return Response({
             'success': True,
             'message': 'Payments retrieved successfully',
             'timestamp': timezone.now().isoformat(),
-            'data': all_payments
+            'data': build_ledger_entries(page),
+            'pagination': {
+                'count': paginator.page.paginator.count,
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
+                'page_size': paginator.get_page_size(request),
+                'total_pages': paginator.page.paginator.num_pages,
+                'current_page': paginator.page.number
+            }
         })
 
+    @action(detail=False, methods=['post'], url_path='generate-term')
+    def generate_term(self, request):
+        """Invoice every active student of the school from their fee structure (admins only)"""
+        if request.user.role != 'admin':
+            return Response({'error': 'Only admins can generate term invoices'}, status=status.HTTP_403_FORBIDDEN)
+        school = get_user_school(request.user)
+        if school is None:
+            return Response({'error': 'User is not associated with a school'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = TermBillingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        totals = run_term_billing(
+            school, data['academic_year'], data['due_date'],
+            course=data.get('course') or None,
+            semester=data.get('semester'),
+            dry_run=data['dry_run']
+        )
+        return Response({'success': True, 'dry_run': data['dry_run'], **totals})
+
     @action(detail=False, methods=['get'])
     def invoices(self, request):
         """Get fee invoices for the current user"""
@@ -181,18 +157,24 @@ class FeeInvoiceViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def pay(self, request, pk=None):
-        """Process payment for an invoice"""
-        invoice = self.get_object()
-        
-        if invoice.status == 'paid':
+        """
+        Process payment for an invoice.
+
+        Send an ``Idempotency-Key`` header (or ``idempotency_key``) to make
+        retries safe; it defaults to the transaction ID. A repeated request
+        returns the original payment with ``replayed: true``.
+        """
+        if not settings.PAYMENT_CLIENT_COMPLETION:
             return Response(
-                {'error': 'Invoice already paid'}, 
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Invoices are paid when the payment gateway confirms the payment'},
+                status=status.HTTP_403_FORBIDDEN
             )
+        invoice = self.get_object()
         
         # Simple payment processing - in production, integrate with payment gateway
         transaction_id = request.data.get('transaction_id')
         payment_method = request.data.get('payment_method', 'online')
+        idempotency_key = request.headers.get('Idempotency-Key') or request.data.get('idempotency_key')
         
         if not transaction_id:
             return Response(
@@ -200,46 +182,15 @@ class FeeInvoiceViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create payment record
-        payment = Payment.objects.create(
-            invoice=invoice,
-            transaction_id=transaction_id,
-            amount=invoice.amount,
-            payment_method=payment_method
-        )
-        
-        # Update invoice status
-        invoice.status = 'paid'
-        invoice.save()
-        
-        # Activate hostel allocation if this is a hostel fee payment
-        if invoice.fee_type == 'hostel':
-            from hostel.models import HostelAllocation
-            try:
-                # Find the pending hostel allocation for this student
-                hostel_allocation = HostelAllocation.objects.filter(
-                    student=invoice.student,
-                    status='pending',
-                    hostel_fee_amount=invoice.amount
-                ).first()
-                
-                if hostel_allocation:
-                    # Activate the allocation and link it to the payment
-                    hostel_allocation.status = 'active'
-                    hostel_allocation.payment = payment
-                    hostel_allocation.save()  # This will trigger room occupancy update
-                    
-                    print(f"✅ Activated hostel allocation {hostel_allocation.id} for student {invoice.student.user.full_name}")
-                else:
-                    print(f"⚠️ No pending hostel allocation found for student {invoice.student.user.full_name} with amount {invoice.amount}")
-                    
-            except Exception as e:
-                print(f"❌ Error activating hostel allocation: {str(e)}")
-                # Don't fail the payment if allocation activation fails
-                pass
+        try:
+            payment, created = process_payment(invoice.id, transaction_id, payment_method, idempotency_key)
+        except PaymentError as e:
+            return Response({'error': str(e)}, status=e.status_code)
         
+        invoice.refresh_from_db()
         return Response({
-            'message': 'Payment successful',
+            'message': 'Payment successful' if created else 'Payment already processed',
+            'replayed': not created,
             'payment': PaymentSerializer(payment).data,
             'invoice': FeeInvoiceSerializer(invoice).data
         })
@@ -250,3 +201,31 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+
+
+class PaymentWebhookAPIView(APIView):
+    """
+    Receives payment gateway callbacks.
+
+    The signature is verified and the event is stored in the webhook inbox;
+    ``process_webhook_events`` applies it. Redelivered events are
+    acknowledged without being stored again.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        body = request.body
+        try:
+            verify_signature(body, request.headers.get(SIGNATURE_HEADER))
+        except WebhookSignatureError as e:
+            logger.warning('Rejected payment webhook: %s', e)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            payload = json.loads(body)
+            created = record_event(payload)
+        except (ValueError, KeyError, TypeError):
+            return Response({'error': 'Malformed event'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'received': True, 'duplicate': not created, 'event_id': str(payload['id'])})
@@ -0,0 +1,247 @@
+"""
+Payment gateway webhooks.
+
+Callbacks arrive at ``PaymentWebhookAPIView``, which only verifies the
+signature and stores the event in the ``WebhookEvent`` inbox, so the gateway
+gets its answer in one INSERT. The worker (``process_webhook_events``)
+applies stored events later.
+
+Signatures use a shared secret (``settings.PAYMENT_WEBHOOK_SECRET``). The
+gateway sends::
+
+    X-Payment-Signature: t=<unix timestamp>,v1=<hex HMAC-SHA256 of "<t>." + body>
+
+and timestamps older than ``PAYMENT_WEBHOOK_TOLERANCE`` seconds are refused,
+so a captured callback cannot be replayed later.
+
+Events are deduplicated twice. A redelivered event repeats its ``id`` and is
+dropped by the unique ``event_id`` on arrival. Two different events for the
+same payment are both stored, but the gateway payment id is used as the
+idempotency key of ``process_payment``, so the invoice is still paid once.
+
+A payment is refused (``PaymentError``, not retried) when its amount differs
+from what is owed: the invoice amount, or for an admission the fee of the
+application's course and category. Admission fees are only accepted for
+enrolled decisions.
+
+Event body::
+
+    {"id": "evt_...", "type": "payment.succeeded",
+     "data": {"payment_id": "pay_...", "reference": "invoice:<id>" | "admission:<decision id>",
+              "amount": "100.00", "method": "online"}}
+"""
+import hashlib
+import hmac
+import logging
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from .models import WebhookEvent
+from .payments import PaymentError, process_payment
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Payment-Signature'
+WEBHOOK_BATCH_SIZE = 500
+WEBHOOK_MAX_ATTEMPTS = 5
+
+WEBHOOK_HANDLERS = {}
+
+
+class WebhookSignatureError(Exception):
+    """The callback is not signed with the shared secret, or the signature has expired"""
+
+
+def register_webhook_handler(event_type):
+    """Register ``handler(data)`` to apply events of ``event_type``"""
+    def decorator(handler):
+        WEBHOOK_HANDLERS[event_type] = handler
+        return handler
+    return decorator
+
+
+def sign_payload(body, timestamp, secret):
+    """Signature header value for a callback body, as the gateway computes it"""
+    digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def verify_signature(body, header, secret=None, tolerance=None, now=None):
+    """Raise ``WebhookSignatureError`` unless ``header`` is a fresh, valid signature of ``body``"""
+    secret = secret if secret is not None else settings.PAYMENT_WEBHOOK_SECRET
+    tolerance = tolerance if tolerance is not None else settings.PAYMENT_WEBHOOK_TOLERANCE
+    if not secret:
+        raise WebhookSignatureError('Webhook secret is not configured')
+
+    parts = dict(part.split('=', 1) for part in (header or '').split(',') if '=' in part)
+    try:
+        timestamp = int(parts['t'])
+        signature = parts['v1']
+    except (KeyError, ValueError):
+        raise WebhookSignatureError('Missing or malformed signature')
+    if abs((now or time.time()) - timestamp) > tolerance:
+        raise WebhookSignatureError('Signature timestamp is outside the tolerance window')
+    if not hmac.compare_digest(sign_payload(body, timestamp, secret), f't={timestamp},v1={signature}'):
+        raise WebhookSignatureError('Signature does not match')
+
+
+def record_event(payload):
+    """Store a verified event in the inbox. Returns False for a redelivery, which is not stored again."""
+    try:
+        with transaction.atomic():
+            WebhookEvent.objects.create(
+                event_id=str(payload['id']),
+                event_type=str(payload['type']),
+                payload=payload
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def _reference(data):
+    kind, _, object_id = str(data.get('reference', '')).partition(':')
+    if not object_id.isdigit():
+        raise PaymentError(f"Malformed payment reference '{data.get('reference')}'")
+    return kind, int(object_id)
+
+
+def _amount(data):
+    try:
+        return Decimal(str(data['amount']))
+    except (KeyError, InvalidOperation):
+        raise PaymentError('Missing or malformed amount')
+
+
+def _payment_id(data):
+    payment_id = data.get('payment_id')
+    if not payment_id:
+        raise PaymentError('Missing payment id')
+    return str(payment_id)
+
+
+@register_webhook_handler('payment.succeeded')
+def payment_succeeded(data):
+    kind, object_id = _reference(data)
+    payment_id = _payment_id(data)
+    if kind == 'invoice':
+        process_payment(
+            object_id, payment_id, data.get('method', 'online'),
+            idempotency_key=payment_id, amount=_amount(data)
+        )
+    elif kind == 'admission':
+        complete_admission_payment(object_id, payment_id, _amount(data))
+    else:
+        raise PaymentError(f"Unknown payment reference type '{kind}'")
+
+
+@register_webhook_handler('payment.failed')
+def payment_failed(data):
+    from admissions.models import SchoolAdmissionDecision
+
+    kind, object_id = _reference(data)
+    if kind == 'admission':
+        # A late failure notice never overrides a completed payment
+        SchoolAdmissionDecision.objects.filter(id=object_id, payment_status='pending').update(payment_status='failed')
+
+
+def complete_admission_payment(decision_id, payment_id, amount):
+    """
+    Record a gateway payment against an enrolled admission decision; repeating it is harmless.
+
+    ``amount`` is the amount actually paid and must match the admission fee
+    of the application's course and category.
+    """
+    from admissions.fee_resolver import fee_amount
+    from admissions.models import SchoolAdmissionDecision
+
+    decision = SchoolAdmissionDecision.objects.select_for_update().select_related('application').filter(
+        id=decision_id
+    ).first()
+    if decision is None:
+        raise PaymentError('School decision not found', status_code=404)
+    if decision.payment_status == 'completed':
+        if decision.payment_reference != payment_id:
+            raise PaymentError('Admission fee already paid with another payment', status_code=409)
+        return
+    if decision.enrollment_status != 'enrolled':
+        raise PaymentError(f'Admission is {decision.enrollment_status}, not enrolled', status_code=409)
+    application = decision.application
+    expected = Decimal(str(fee_amount(application.course_applied, application.category)))
+    if amount != expected:
+        raise PaymentError(f'Paid amount {amount} does not match admission fee {expected}')
+    decision.payment_status = 'completed'
+    decision.payment_reference = payment_id
+    decision.payment_completed_at = timezone.now()
+    decision.save(update_fields=['payment_status', 'payment_reference', 'payment_completed_at'])
+
+
+def process_event(event_id):
+    """
+    Apply one inbox event. Returns its new status, or None if another worker has it.
+
+    The event row is locked for the whole transaction, so it is applied once
+    even with several workers. Rejected payments fail at once; unexpected
+    errors leave the event queued until ``WEBHOOK_MAX_ATTEMPTS``.
+    """
+    with transaction.atomic():
+        event = WebhookEvent.objects.select_for_update(skip_locked=True).filter(
+            id=event_id, status='received'
+        ).first()
+        if event is None:
+            return None
+        event.attempts += 1
+        handler = WEBHOOK_HANDLERS.get(event.event_type)
+        if handler is None:
+            event.status = 'ignored'
+        else:
+            try:
+                with transaction.atomic():
+                    handler(event.payload.get('data') or {})
+                event.status = 'processed'
+                event.last_error = ''
+            except PaymentError as e:
+                event.status = 'failed'
+                event.last_error = str(e)
+            except Exception as e:
+                logger.exception('Webhook event %s failed (attempt %d)', event.event_id, event.attempts)
+                event.status = 'failed' if event.attempts >= WEBHOOK_MAX_ATTEMPTS else 'received'
+                event.last_error = str(e)
+        if event.status != 'received':
+            event.processed_at = timezone.now()
+        event.save(update_fields=['status', 'attempts', 'last_error', 'processed_at'])
+    return event.status
+
+
+def process_pending_events(batch_size=WEBHOOK_BATCH_SIZE, max_events=None, shard=None):
+    """
+    Apply queued events in arrival order, each at most once per call.
+
+    ``shard=(index, count)`` restricts the call to events whose id modulo
+    ``count`` is ``index``, so ``count`` workers can drain the inbox side by
+    side without contending for the same rows.
+
+    Returns a dict counting the events by resulting status.
+    """
+    stats = {'processed': 0, 'ignored': 0, 'failed': 0, 'received': 0, 'skipped': 0}
+    pending = WebhookEvent.objects.filter(status='received')
+    if shard is not None:
+        index, count = shard
+        pending = pending.alias(shard=Mod('id', count)).filter(shard=index)
+    last_id = 0
+    handled = 0
+    while max_events is None or handled < max_events:
+        limit = batch_size if max_events is None else min(batch_size, max_events - handled)
+        ids = list(pending.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:limit])
+        if not ids:
+            break
+        for event_id in ids:
+            stats[process_event(event_id) or 'skipped'] += 1
+        handled += len(ids)
+        last_id = ids[-1]
+    return stats
@@ -9,6 +9,7 @@ from datetime import timedelta
 from django.db.models import Q, F
 from django.contrib.auth import get_user_model
 from .models import HostelBlock, HostelRoom, HostelBed, HostelAllocation, HostelComplaint, HostelLeaveRequest
+from utils.exports import ExportMixin
 from .serializers import (
     HostelBlockSerializer, RoomSerializer, HostelBedSerializer, 
     HostelAllocationSerializer, HostelComplaintSerializer, HostelLeaveRequestSerializer
@@ -504,11 +505,25 @@ class HostelBedViewSet(viewsets.ModelViewSet):
         })
 
 
-class HostelAllocationViewSet(viewsets.ModelViewSet):
+class HostelAllocationViewSet(ExportMixin, viewsets.ModelViewSet):
     """ViewSet for hostel allocations"""
     queryset = HostelAllocation.objects.all()
     serializer_class = HostelAllocationSerializer
     permission_classes = [IsAuthenticated]
+    export_filename = 'hostel_allocations'
+    export_fields = [
+        ('student__admission_number', 'Admission Number'),
+        ('student__first_name', 'First Name'),
+        ('student__last_name', 'Last Name'),
+        ('bed__room__block__name', 'Block'),
+        ('bed__room__room_number', 'Room'),
+        ('bed__bed_number', 'Bed'),
+        ('allocation_date', 'Allocation Date'),
+        ('vacation_date', 'Vacation Date'),
+        ('status', 'Status'),
+        ('hostel_fee_amount', 'Hostel Fee'),
+        ('payment__transaction_id', 'Payment Transaction'),
+    ]
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import LibraryBook, UserBook, Search, LibraryTransaction
+from .models import LibraryBook, UserBook, Search, LibraryTransaction, LibraryBalance, BookHold
 
 
 @admin.register(LibraryBook)
@@ -114,4 +114,29 @@ class LibraryTransactionAdmin(admin.ModelAdmin):
     def user_name(self, obj):
         return obj.user.get_full_name() or obj.user.username
     user_name.short_description = 'User'
-    user_name.admin_order_field = 'user__username'
\ No newline at end of file
+    user_name.admin_order_field = 'user__username'
+
+
+@admin.register(LibraryBalance)
+class LibraryBalanceAdmin(admin.ModelAdmin):
+    """Admin configuration for LibraryBalance model"""
+    
+    list_display = ['user_name', 'school', 'outstanding_amount', 'overdue_loans', 'last_accrued_at']
+    list_filter = ['school', 'last_accrued_at']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['outstanding_amount', 'overdue_loans', 'last_accrued_at', 'updated_at']
+    
+    def user_name(self, obj):
+        return obj.user.get_full_name() or obj.user.username
+    user_name.short_description = 'User'
+    user_name.admin_order_field = 'user__username'
+
+
+@admin.register(BookHold)
+class BookHoldAdmin(admin.ModelAdmin):
+    """Admin configuration for BookHold model"""
+    
+    list_display = ['book', 'user', 'status', 'created_at', 'ready_at', 'expires_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['book__title', 'user__username', 'user__email']
+    readonly_fields = ['created_at', 'ready_at', 'expires_at', 'closed_at']
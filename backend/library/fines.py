@@ -0,0 +1,203 @@
+"""
+Overdue fine accrual for library loans.
+
+``UserBook.calculate_fine`` answers "what is this loan's fine right now" for a
+single record. The functions here persist that answer for every overdue loan
+of a school at once so that outstanding-fine reports and overdue dashboards can
+read stored values instead of recomputing them per row:
+
+- ``accrue_school_fines`` brings ``UserBook.fine_amount`` up to date with one
+  UPDATE statement and writes the increase to the ``LibraryTransaction`` ledger
+  with ``bulk_create``.
+- ``refresh_school_balances`` rebuilds the per-user ``LibraryBalance`` rollup
+  from a single grouped aggregate.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DateTimeField, DecimalField, ExpressionWrapper, F, Func, IntegerField, Q, Sum, Value
+from django.utils import timezone
+
+from .models import UserBook, LibraryTransaction, LibraryBalance, FINE_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+LEDGER_BATCH_SIZE = 1000
+
+
+class DaysOverdue(Func):
+    """
+    Whole days between a due date and ``as_of``, truncated like ``timedelta.days``.
+
+    Only meaningful for rows where the due date is before ``as_of``.
+    """
+    output_field = IntegerField()
+    arg_joiner = ' - '
+    template = 'FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400)'
+
+    def __init__(self, due_date, as_of, **extra):
+        super().__init__(Value(as_of, output_field=DateTimeField()), due_date, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(',
+            **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='FLOOR((UNIX_TIMESTAMP(%(expressions)s)) / 86400)',
+            arg_joiner=') - UNIX_TIMESTAMP(',
+            **extra_context
+        )
+
+
+def accrued_fine_expression(as_of):
+    """Database expression equivalent to ``UserBook.calculate_fine`` evaluated at ``as_of``"""
+    return ExpressionWrapper(
+        DaysOverdue(F('due_date'), as_of) * Value(FINE_PER_DAY),
+        output_field=DecimalField(max_digits=8, decimal_places=2)
+    )
+
+
+def overdue_loans(school, as_of):
+    """Active borrowed loans past due at ``as_of`` for users of ``school`` (``None`` = users without a school)"""
+    queryset = UserBook.objects.filter(type='BORROWED', status='active', due_date__lt=as_of)
+    if school is None:
+        return queryset.filter(user__school__isnull=True)
+    return queryset.filter(user__school=school)
+
+
+def accrue_school_fines(school, as_of=None):
+    """
+    Persist accrued fines for every overdue loan of a school.
+
+    Loans whose stored fine is already up to date are left untouched, so the
+    job can be re-run on the same day without writing duplicate ledger entries.
+
+    Returns a dict with the number of loans updated and the total fine accrued.
+    """
+    as_of = as_of or timezone.now()
+    accrued = accrued_fine_expression(as_of)
+    pending = overdue_loans(school, as_of).filter(fine_amount__lt=accrued)
+
+    loans_updated = 0
+    total_accrued = Decimal('0')
+
+    with transaction.atomic():
+        ledger_rows = pending.annotate(accrued=accrued).values_list(
+            'id', 'user_id', 'book__title', 'fine_amount', 'accrued'
+        )
+        batch = []
+        for user_book_id, user_id, title, fine_amount, new_fine in ledger_rows.iterator(chunk_size=LEDGER_BATCH_SIZE):
+            increase = Decimal(new_fine) - fine_amount
+            total_accrued += increase
+            batch.append(LibraryTransaction(
+                user_id=user_id,
+                user_book_id=user_book_id,
+                transaction_type='fine_accrual',
+                amount=increase,
+                description=f"Overdue fine accrued for '{title}' (total ${new_fine})"
+            ))
+            if len(batch) >= LEDGER_BATCH_SIZE:
+                LibraryTransaction.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            LibraryTransaction.objects.bulk_create(batch)
+
+        # One set-based statement for the whole school
+        loans_updated = pending.update(fine_amount=accrued, updated_at=as_of)
+
+    return {
+        'loans_updated': loans_updated,
+        'total_accrued': total_accrued,
+    }
+
+
+def _balance_rows(loans, as_of):
+    """Group unpaid fines per user: one row with the outstanding total and overdue loan count"""
+    return loans.filter(type='BORROWED', fine_paid=False).values('user_id', 'user__school_id').annotate(
+        outstanding=Sum('fine_amount', filter=Q(fine_amount__gt=0)),
+        overdue=Count('id', filter=Q(status='active', due_date__lt=as_of)),
+    ).filter(Q(outstanding__gt=0) | Q(overdue__gt=0))
+
+
+def _save_balances(rows, as_of):
+    balances = [
+        LibraryBalance(
+            user_id=row['user_id'],
+            school_id=row['user__school_id'],
+            outstanding_amount=row['outstanding'] or 0,
+            overdue_loans=row['overdue'],
+            last_accrued_at=as_of,
+            updated_at=as_of,
+        )
+        for row in rows
+    ]
+    LibraryBalance.objects.bulk_create(
+        balances,
+        batch_size=LEDGER_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['school', 'outstanding_amount', 'overdue_loans', 'last_accrued_at', 'updated_at'],
+    )
+    return balances
+
+
+def refresh_school_balances(school, as_of=None):
+    """Rebuild ``LibraryBalance`` rows for all users of a school from one grouped aggregate"""
+    as_of = as_of or timezone.now()
+    if school is None:
+        loans = UserBook.objects.filter(user__school__isnull=True)
+    else:
+        loans = UserBook.objects.filter(user__school=school)
+
+    with transaction.atomic():
+        # Reset first so users who settled everything since the last run drop back to zero
+        LibraryBalance.objects.filter(school=school).update(
+            outstanding_amount=0, overdue_loans=0, last_accrued_at=as_of, updated_at=as_of
+        )
+        balances = _save_balances(_balance_rows(loans, as_of), as_of)
+    return len(balances)
+
+
+def refresh_user_balance(user, as_of=None):
+    """Rebuild the ``LibraryBalance`` row of a single user, e.g. right after a return"""
+    as_of = as_of or timezone.now()
+    rows = list(_balance_rows(UserBook.objects.filter(user=user), as_of))
+    if rows:
+        _save_balances(rows, as_of)
+    else:
+        LibraryBalance.objects.filter(user=user).update(
+            outstanding_amount=0, overdue_loans=0, updated_at=as_of
+        )
+
+
+def run_fine_accrual(schools, as_of=None, include_unassigned=True):
+    """
+    Nightly entry point: accrue fines and refresh balances school by school.
+
+    Each school is processed in its own transaction so one failure does not roll
+    back the rest of the run. Returns a list of per-school summaries.
+    """
+    as_of = as_of or timezone.now()
+    targets = list(schools)
+    if include_unassigned:
+        targets.append(None)
+
+    summaries = []
+    for school in targets:
+        try:
+            result = accrue_school_fines(school, as_of)
+            result['balances'] = refresh_school_balances(school, as_of)
+            result['error'] = None
+        except Exception as e:
+            logger.error(f"Fine accrual failed for {school or 'unassigned users'}: {e}")
+            result = {'loans_updated': 0, 'total_accrued': Decimal('0'), 'balances': 0, 'error': str(e)}
+        result['school'] = school
+        summaries.append(result)
+    return summaries
@@ -0,0 +1,146 @@
+"""
+Copy inventory and hold queues for library books.
+
+``LibraryBook.available_copies`` is only ever changed here, and only through
+conditional UPDATE statements evaluated by the database, e.g.::
+
+    UPDATE library_librarybook
+       SET available_copies = available_copies - 1
+     WHERE id = %s AND available_copies > 0
+
+so concurrent checkouts of the same book can never lose an update or lend
+more copies than exist. When a copy comes back while students are waiting,
+it is reserved for the oldest hold instead of going back on the shelf.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LibraryBook, BookHold, HOLD_PICKUP_DAYS
+
+
+def take_copy(book_id):
+    """Atomically take one copy off the shelf. Returns False when none are left."""
+    return LibraryBook.objects.filter(
+        id=book_id, available_copies__gt=0
+    ).update(available_copies=F('available_copies') - 1) == 1
+
+
+def put_copy(book_id):
+    """Atomically put one copy back on the shelf, never exceeding ``total_copies``"""
+    return LibraryBook.objects.filter(
+        id=book_id, available_copies__lt=F('total_copies')
+    ).update(available_copies=F('available_copies') + 1) == 1
+
+
+def retire_copy(book_id):
+    """Remove a lost copy from the book's inventory"""
+    return LibraryBook.objects.filter(
+        id=book_id, total_copies__gt=F('available_copies')
+    ).update(total_copies=F('total_copies') - 1) == 1
+
+
+def _reserve_for_next_hold(book_id, now):
+    """Hand a returned copy to the oldest waiting hold. Returns the hold, or None if nobody is waiting."""
+    while True:
+        hold = BookHold.objects.select_for_update(skip_locked=True).filter(
+            book_id=book_id, status='waiting'
+        ).order_by('created_at').first()
+        if hold is None:
+            return None
+        # Conditional on status so a hold cancelled in the meantime is skipped
+        if BookHold.objects.filter(id=hold.id, status='waiting').update(
+            status='ready', ready_at=now, expires_at=now + timedelta(days=HOLD_PICKUP_DAYS)
+        ):
+            hold.refresh_from_db()
+            return hold
+
+
+def release_copy(book_id):
+    """
+    Return a copy to circulation.
+
+    The copy goes to the next waiting hold if there is one, otherwise back on
+    the shelf. Returns the hold that received the copy, or None.
+    """
+    with transaction.atomic():
+        hold = _reserve_for_next_hold(book_id, timezone.now())
+        if hold is None:
+            put_copy(book_id)
+        return hold
+
+
+def claim_hold(user, book_id):
+    """
+    Convert the user's ready hold into a checkout.
+
+    The copy was already taken off the shelf when the hold became ready, so no
+    inventory change is needed. Returns True if a ready hold was claimed.
+    """
+    return BookHold.objects.filter(
+        user=user, book_id=book_id, status='ready', expires_at__gte=timezone.now()
+    ).update(status='fulfilled', closed_at=timezone.now()) == 1
+
+
+def fulfil_waiting_hold(user, book_id):
+    """
+    Close the user's waiting hold once they have taken a copy from the shelf.
+
+    Otherwise the hold would stay queued and later reserve a second copy for
+    a book the user already has. Returns True if a hold was closed.
+    """
+    return BookHold.objects.filter(
+        user=user, book_id=book_id, status='waiting'
+    ).update(status='fulfilled', closed_at=timezone.now()) == 1
+
+
+def place_hold(user, book_id):
+    """
+    Queue the user for a copy of the book.
+
+    If a copy is still on the shelf it is reserved immediately and the hold is
+    returned as ready. Returns ``(hold, created)``.
+    """
+    existing = BookHold.objects.filter(user=user, book_id=book_id, status__in=BookHold.ACTIVE_STATUSES).first()
+    if existing:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            hold = BookHold.objects.create(user=user, book_id=book_id)
+            if take_copy(book_id):
+                now = timezone.now()
+                hold.status = 'ready'
+                hold.ready_at = now
+                hold.expires_at = now + timedelta(days=HOLD_PICKUP_DAYS)
+                hold.save(update_fields=['status', 'ready_at', 'expires_at'])
+    except IntegrityError:
+        # A concurrent request for the same user and book won the race
+        return BookHold.objects.get(user=user, book_id=book_id, status__in=BookHold.ACTIVE_STATUSES), False
+    return hold, True
+
+
+def cancel_hold(hold, status='cancelled'):
+    """Close an active hold, passing its reserved copy on if it had one. Returns False if already closed."""
+    with transaction.atomic():
+        was_ready = hold.status == 'ready'
+        closed = BookHold.objects.filter(id=hold.id, status=hold.status).update(
+            status=status, closed_at=timezone.now()
+        ) == 1
+        if closed and was_ready:
+            release_copy(hold.book_id)
+    if closed:
+        hold.status = status
+    return closed
+
+
+def expire_ready_holds(now=None):
+    """Expire ready holds that were not picked up in time and pass their copies on. Returns the count."""
+    now = now or timezone.now()
+    expired = 0
+    for hold in list(BookHold.objects.filter(status='ready', expires_at__lt=now)):
+        if cancel_hold(hold, status='expired'):
+            expired += 1
+    return expired
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schools.models import School
+from library.fines import run_fine_accrual
+
+
+class Command(BaseCommand):
+    help = 'Accrue overdue library fines and rebuild outstanding balances (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school',
+            type=str,
+            help='Only process the school with this school code'
+        )
+        parser.add_argument(
+            '--include-inactive',
+            action='store_true',
+            help='Also process schools that are not active'
+        )
+
+    def handle(self, *args, **options):
+        if options['school']:
+            schools = School.objects.filter(school_code=options['school'])
+            if not schools.exists():
+                raise CommandError(f'School "{options["school"]}" does not exist.')
+            include_unassigned = False
+        else:
+            schools = School.objects.all() if options['include_inactive'] else School.objects.filter(is_active=True)
+            include_unassigned = True
+
+        started = timezone.now()
+        summaries = run_fine_accrual(schools.order_by('id'), as_of=started, include_unassigned=include_unassigned)
+
+        loans_updated = 0
+        total_accrued = 0
+        failures = 0
+        for summary in summaries:
+            name = summary['school'].school_name if summary['school'] else 'Users without a school'
+            if summary['error']:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{name}: {summary["error"]}'))
+                continue
+            loans_updated += summary['loans_updated']
+            total_accrued += summary['total_accrued']
+            if summary['loans_updated'] or summary['balances']:
+                self.stdout.write(
+                    f'{name}: {summary["loans_updated"]} loans updated, '
+                    f'{summary["total_accrued"]} accrued in fines, {summary["balances"]} balances'
+                )
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nFine accrual completed in {elapsed:.1f}s:'
+                f'\n- Schools processed: {len(summaries)}'
+                f'\n- Loans updated: {loans_updated}'
+                f'\n- Total fines accrued: {total_accrued}'
+                f'\n- Failures: {failures}'
+            )
+        )
@@ -0,0 +1,134 @@
+"""
+Benchmark page-number vs keyset pagination on the library transaction list.
+
+Seeds a throwaway student with enough ``LibraryTransaction`` rows to reach
+the deepest requested page, then requests each page through
+``LibraryTransactionViewSet`` three ways:
+
+- ``?page=N``                  OFFSET pagination with COUNT(*)
+- ``?cursor=...``              keyset pagination with COUNT(*)
+- ``?cursor=...&count=false``  keyset pagination without the count
+
+and reports the median time and query count per request. Keyset pages
+should cost the same at page 1 and at page 5,000; OFFSET pages should not.
+Each keyset page is also checked against the OFFSET page for the same rows.
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from library.models import LibraryTransaction
+from library.views import LibraryTransactionViewSet
+from users.models import User
+from utils.pagination import KeysetPagination
+
+BENCHMARK_USERNAME = 'keyset_pagination_benchmark'
+SEED_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Compare OFFSET and keyset pagination cost at increasing page depths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', default='1,50,500,5000', help='Comma-separated page numbers to measure')
+        parser.add_argument('--page-size', type=int, default=20, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per measurement (median is reported)')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows for the next run')
+
+    def handle(self, *args, **options):
+        try:
+            pages = sorted({int(page) for page in options['pages'].split(',') if page.strip()})
+        except ValueError:
+            raise CommandError('--pages must be a comma-separated list of integers')
+        page_size = options['page_size']
+        repeat = options['repeat']
+        if not pages or pages[0] < 1 or page_size < 1 or page_size > KeysetPagination.max_page_size or repeat < 1:
+            raise CommandError(
+                f'--pages must be positive, --page-size between 1 and {KeysetPagination.max_page_size}, '
+                '--repeat positive'
+            )
+
+        user, _ = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME,
+            defaults={'email': f'{BENCHMARK_USERNAME}@example.com', 'role': 'student'}
+        )
+        rows_needed = pages[-1] * page_size
+        self._seed(user, rows_needed)
+
+        view = LibraryTransactionViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        ordering = ['-created_at', '-pk']
+        boundaries = LibraryTransaction.objects.filter(user=user).order_by(*ordering)
+
+        self.stdout.write(
+            f'{rows_needed} transactions, {page_size} per page, median of {repeat} requests\n'
+            f'{"page":>8} {"offset ms":>10} {"queries":>8} {"keyset ms":>10} {"queries":>8} '
+            f'{"no-count ms":>12} {"queries":>8}'
+        )
+        try:
+            for page in pages:
+                offset_result = self._measure(view, factory, user, {'page': page, 'page_size': page_size}, repeat)
+                params = {'page_size': page_size}
+                if page > 1:
+                    created_at, pk = boundaries.values_list('created_at', 'pk')[(page - 1) * page_size - 1]
+                    params['cursor'] = KeysetPagination.make_cursor(ordering, [created_at, pk])
+                keyset_result = self._measure(view, factory, user, params, repeat)
+                no_count_result = self._measure(view, factory, user, dict(params, count='false'), repeat)
+
+                if keyset_result['ids'] != offset_result['ids'] or no_count_result['ids'] != offset_result['ids']:
+                    raise CommandError(f'Keyset page {page} returned different rows than OFFSET page {page}')
+
+                self.stdout.write(
+                    f'{page:>8} {offset_result["ms"]:>10.2f} {offset_result["queries"]:>8} '
+                    f'{keyset_result["ms"]:>10.2f} {keyset_result["queries"]:>8} '
+                    f'{no_count_result["ms"]:>12.2f} {no_count_result["queries"]:>8}'
+                )
+        finally:
+            if not options['keep']:
+                LibraryTransaction.objects.filter(user=user).delete()
+                user.delete()
+
+        self.stdout.write(self.style.SUCCESS('Keyset pages match OFFSET pages at every measured depth'))
+
+    def _seed(self, user, rows_needed):
+        existing = LibraryTransaction.objects.filter(user=user).count()
+        if existing >= rows_needed:
+            return
+        self.stdout.write(f'Seeding {rows_needed - existing} transactions...')
+        started = timezone.now() - timedelta(days=365)
+        with transaction.atomic():
+            for start in range(existing, rows_needed, SEED_BATCH_SIZE):
+                size = min(SEED_BATCH_SIZE, rows_needed - start)
+                created = LibraryTransaction.objects.bulk_create([
+                    LibraryTransaction(user=user, transaction_type='fine_payment', amount=1,
+                                       description=f'Benchmark transaction {start + offset}')
+                    for offset in range(size)
+                ])
+                # created_at is auto_now_add, so each batch shares one timestamp; ties exercise the pk tie-breaker
+                LibraryTransaction.objects.filter(id__in=[row.id for row in created]).update(
+                    created_at=started + timedelta(minutes=start // SEED_BATCH_SIZE)
+                )
+
+    def _measure(self, view, factory, user, params, repeat):
+        timings = []
+        for _ in range(repeat):
+            request = factory.get('/api/v1/library/transactions/', params)
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request)
+                response.render()
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'Request with {params} failed: {response.status_code} {response.data}')
+        return {
+            'ms': statistics.median(timings),
+            'queries': len(queries.captured_queries),
+            'ids': [row['id'] for row in response.data['results']],
+        }
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from schools.models import School
+from library.recommendations import (
+    build_school_recommendations, DEFAULT_TOP_K, DEFAULT_POPULAR_LIMIT, DEFAULT_MIN_SUPPORT,
+    DEFAULT_CHUNK_ROWS, DEFAULT_MEMORY_BUDGET_MB, MAX_LOANS_PER_USER
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute popular books and "also borrowed" recommendations for each school library'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=str, help='Only process the school with this school code')
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Recommendations kept per book')
+        parser.add_argument('--popular-limit', type=int, default=DEFAULT_POPULAR_LIMIT, help='Books kept in the popular list')
+        parser.add_argument(
+            '--min-support',
+            type=int,
+            default=DEFAULT_MIN_SUPPORT,
+            help='Minimum number of students who borrowed both books'
+        )
+        parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Loan rows processed per chunk')
+        parser.add_argument(
+            '--memory-budget-mb',
+            type=int,
+            default=DEFAULT_MEMORY_BUDGET_MB,
+            help='Memory allowed for co-borrow counts; beyond it only the strongest pairs are kept'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_rows'] < MAX_LOANS_PER_USER:
+            raise CommandError(f'--chunk-rows must be at least {MAX_LOANS_PER_USER}')
+
+        if options['school']:
+            schools = School.objects.filter(school_code=options['school'])
+            if not schools.exists():
+                raise CommandError(f'School "{options["school"]}" does not exist.')
+        else:
+            schools = School.objects.filter(is_active=True)
+
+        total_rows = 0
+        started = time.perf_counter()
+        for school in schools.order_by('id'):
+            school_started = time.perf_counter()
+            result = build_school_recommendations(
+                school,
+                top_k=options['top_k'],
+                popular_limit=options['popular_limit'],
+                min_support=options['min_support'],
+                chunk_rows=options['chunk_rows'],
+                memory_budget_mb=options['memory_budget_mb'],
+            )
+            total_rows += result['rows_read']
+            if not result['rows_read']:
+                continue
+
+            message = (
+                f'{school.school_name}: {result["rows_read"]} loans -> {result["popular"]} popular, '
+                f'{result["recommendations"]} recommendations in {time.perf_counter() - school_started:.1f}s'
+            )
+            if result['approximate']:
+                self.stdout.write(self.style.WARNING(f'{message} (memory budget reached, weakest pairs dropped)'))
+            else:
+                self.stdout.write(message)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nRecommendations built for {schools.count()} schools: '
+                f'{total_rows} loans in {elapsed:.1f}s ({total_rows / elapsed if elapsed else 0:.0f} loans/s)'
+            )
+        )
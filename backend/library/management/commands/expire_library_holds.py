@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from library.inventory import expire_ready_holds
+
+
+class Command(BaseCommand):
+    help = 'Expire reserved copies that were not picked up and pass them to the next hold (run daily)'
+
+    def handle(self, *args, **options):
+        expired = expire_ready_holds()
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} holds'))
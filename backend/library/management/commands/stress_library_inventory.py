@@ -0,0 +1,120 @@
+"""
+Concurrency harness for the library inventory counters.
+
+Creates a throwaway book, then hammers it from many threads with checkouts
+and returns. Afterwards it verifies that no more copies were lent than exist
+and that every returned copy is accounted for. Run it against the same
+database engine as production (PostgreSQL) to exercise real row locking;
+SQLite serialises writers, so it only checks correctness there.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, close_old_connections
+from django.db.models import F
+from library.models import LibraryBook
+from library.inventory import take_copy, release_copy
+
+
+class Command(BaseCommand):
+    help = 'Hammer a single library book from many threads and verify the copy counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Number of worker threads')
+        parser.add_argument('--attempts', type=int, default=500, help='Checkout attempts across all threads')
+        parser.add_argument('--copies', type=int, default=10, help='Copies of the test book')
+        parser.add_argument(
+            '--naive',
+            action='store_true',
+            help='Use read-modify-write (book.available_copies -= 1; book.save()) to demonstrate lost updates'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the test book afterwards')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        attempts = options['attempts']
+        copies = options['copies']
+        if threads < 1 or attempts < 1 or copies < 1:
+            raise CommandError('--threads, --attempts and --copies must be positive')
+
+        book = LibraryBook.objects.create(
+            title='Inventory stress test',
+            author='stress_library_inventory',
+            total_copies=copies,
+            available_copies=copies,
+        )
+        checkout = self._naive_checkout if options['naive'] else take_copy
+        checkin = self._naive_checkin if options['naive'] else release_copy
+
+        try:
+            # Phase 1: every thread races for the same few copies
+            start_gate = threading.Barrier(threads)
+            lent = self._hammer(threads, attempts, lambda: checkout(book.id), start_gate)
+            book.refresh_from_db()
+            self.stdout.write(
+                f'Checkout: {attempts} attempts on {copies} copies from {threads} threads -> '
+                f'{lent["ok"]} lent, {lent["failed"]} refused, {lent["errors"]} errors '
+                f'in {lent["elapsed"]:.2f}s; available_copies={book.available_copies}'
+            )
+            checkout_ok = lent['ok'] <= copies and book.available_copies == copies - lent['ok']
+
+            # Phase 2: return everything that was lent, concurrently
+            start_gate = threading.Barrier(min(threads, max(lent['ok'], 1)))
+            returned = self._hammer(start_gate.parties, lent['ok'], lambda: checkin(book.id) or True, start_gate)
+            book.refresh_from_db()
+            self.stdout.write(
+                f'Return: {returned["ok"]} copies returned, {returned["errors"]} errors in {returned["elapsed"]:.2f}s; '
+                f'available_copies={book.available_copies}'
+            )
+            return_ok = returned['errors'] == 0 and book.available_copies == copies - lent['ok'] + returned['ok']
+        finally:
+            if not options['keep']:
+                LibraryBook.objects.filter(id=book.id).delete()
+
+        if checkout_ok and return_ok:
+            self.stdout.write(self.style.SUCCESS('Inventory counters are consistent under concurrency'))
+        else:
+            raise CommandError('Inventory counters are inconsistent: lost updates or over-lending detected')
+
+    def _hammer(self, threads, calls, func, start_gate):
+        """Run ``func`` ``calls`` times spread over ``threads`` workers that start together"""
+        results = {'ok': 0, 'failed': 0, 'errors': 0}
+        lock = threading.Lock()
+        per_thread = [calls // threads + (1 if i < calls % threads else 0) for i in range(threads)]
+
+        def worker(count):
+            close_old_connections()
+            try:
+                start_gate.wait()
+                for _ in range(count):
+                    try:
+                        outcome = 'ok' if func() else 'failed'
+                    except Exception:
+                        outcome = 'errors'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, per_thread))
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def _naive_checkout(self, book_id):
+        book = LibraryBook.objects.get(id=book_id)
+        if book.available_copies <= 0:
+            return False
+        time.sleep(0)  # yield to widen the race window, as a busy server would
+        book.available_copies -= 1
+        book.save()
+        return True
+
+    def _naive_checkin(self, book_id):
+        book = LibraryBook.objects.get(id=book_id)
+        book.available_copies += 1
+        book.save()
+        return True
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_bookrequest'),
+        ('schools', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='librarytransaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('fine_payment', 'Fine Payment'), ('fine_accrual', 'Fine Accrual'), ('book_purchase', 'Book Purchase'), ('damage_fee', 'Damage Fee'), ('deposit', 'Security Deposit'), ('refund', 'Refund')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='LibraryBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outstanding_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('overdue_loans', models.IntegerField(default=0)),
+                ('last_accrued_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='schools.school')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='library_balance', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'outstanding_amount'], name='library_lib_school__d86377_idx')],
+            },
+        ),
+    ]
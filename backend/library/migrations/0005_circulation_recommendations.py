@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_bookhold'),
+        ('schools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('co_borrow_count', models.IntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='library.librarybook')),
+                ('recommended_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='library.librarybook')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='book_recommendations', to='schools.school')),
+            ],
+            options={
+                'ordering': ['book', 'rank'],
+                'indexes': [models.Index(fields=['book', 'rank'], name='library_boo_book_id_a312b5_idx'), models.Index(fields=['school'], name='library_boo_school__171ac1_idx')],
+                'unique_together': {('book', 'recommended_book')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PopularBook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('borrow_count', models.IntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='library.librarybook')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='popular_books', to='schools.school')),
+            ],
+            options={
+                'ordering': ['school', 'rank'],
+                'indexes': [models.Index(fields=['school', 'rank'], name='library_pop_school__a2bb22_idx')],
+                'unique_together': {('school', 'book')},
+            },
+        ),
+    ]
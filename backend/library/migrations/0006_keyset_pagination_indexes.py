@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_circulation_recommendations'),
+        ('schools', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='librarytransaction',
+            name='library_lib_user_id_c41453_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='search',
+            name='library_sea_user_id_0173ec_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='search',
+            name='library_sea_school__786b4d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='librarytransaction',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='library_lib_user_id_ae6a3d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='librarytransaction',
+            index=models.Index(fields=['created_at', 'id'], name='library_lib_created_cefd6d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='search',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='library_sea_user_id_b825eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='search',
+            index=models.Index(fields=['school', 'created_at', 'id'], name='library_sea_school__5b4b8f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='search',
+            index=models.Index(fields=['created_at', 'id'], name='library_sea_created_e5d54c_idx'),
+        ),
+    ]
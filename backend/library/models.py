@@ -8,6 +8,7 @@ import base64
 CHECKOUT_LIMIT = 3
 DUE_DAYS = 14  # 2 weeks for library books
 FINE_PER_DAY = 10  # Fine amount per day for overdue books
+HOLD_PICKUP_DAYS = 3  # Days a reserved copy is kept for the hold holder
 
 class LibraryBook(models.Model):
     """Model for books in the library system - both local collection and Google Books API cached results"""
@@ -145,8 +146,10 @@ class Search(models.Model):
     
     class Meta:
         indexes = [
-            models.Index(fields=['user', 'created_at']),
-            models.Index(fields=['school', 'created_at']),
+            # Composite indexes ending in (created_at, id) match the keyset ordering of the search history list
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(fields=['school', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
             models.Index(fields=['query', 'source']),
         ]
     
@@ -159,6 +162,7 @@ class LibraryTransaction(models.Model):
     
     TRANSACTION_TYPES = [
         ('fine_payment', 'Fine Payment'),
+        ('fine_accrual', 'Fine Accrual'),
         ('book_purchase', 'Book Purchase'),
         ('damage_fee', 'Damage Fee'),
         ('deposit', 'Security Deposit'),
@@ -175,7 +179,9 @@ class LibraryTransaction(models.Model):
     
     class Meta:
         indexes = [
-            models.Index(fields=['user', 'created_at']),
+            # Composite indexes ending in (created_at, id) match the keyset ordering of the transaction list
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
             models.Index(fields=['transaction_type', 'created_at']),
         ]
     
@@ -183,6 +189,64 @@ class LibraryTransaction(models.Model):
         return f"{self.user.username} - {self.get_transaction_type_display()}: ${self.amount}"
 
 
+class LibraryBalance(models.Model):
+    """Per-user rollup of unpaid library fines, rebuilt by the nightly fine accrual job"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='library_balance')
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, null=True, blank=True)
+    outstanding_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    overdue_loans = models.IntegerField(default=0)
+    last_accrued_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['school', 'outstanding_amount']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} owes ${self.outstanding_amount} ({self.overdue_loans} overdue)"
+
+
+class BookHold(models.Model):
+    """Queue entry for a book with no copies left; the next returned copy is reserved for the oldest hold"""
+    
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('ready', 'Ready for Pickup'),
+        ('fulfilled', 'Fulfilled'),
+        ('cancelled', 'Cancelled'),
+        ('expired', 'Expired'),
+    ]
+    
+    ACTIVE_STATUSES = ['waiting', 'ready']
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='book_holds')
+    book = models.ForeignKey(LibraryBook, on_delete=models.CASCADE, related_name='holds')
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='waiting')
+    created_at = models.DateTimeField(auto_now_add=True)
+    ready_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['book', 'status', 'created_at']),
+            models.Index(fields=['user', 'status']),
+            models.Index(fields=['status', 'expires_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'book'],
+                condition=models.Q(status__in=['waiting', 'ready']),
+                name='library_unique_active_hold'
+            ),
+        ]
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"{self.user.username} holds '{self.book.title}' - {self.status}"
+
+
 class BookRequest(models.Model):
     """Model for student book requests to librarian"""
     URGENCY_CHOICES = [
@@ -246,6 +310,46 @@ class BookRequest(models.Model):
         return f"{self.user.username} requested '{self.title}' by {self.author} - {self.status}"
 
 
+class PopularBook(models.Model):
+    """Precomputed "popular in your school" list, rebuilt by build_library_recommendations"""
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, related_name='popular_books')
+    book = models.ForeignKey(LibraryBook, on_delete=models.CASCADE, related_name='+')
+    borrow_count = models.IntegerField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['school', 'book']
+        indexes = [
+            models.Index(fields=['school', 'rank']),
+        ]
+        ordering = ['school', 'rank']
+    
+    def __str__(self):
+        return f"#{self.rank} {self.book.title} ({self.borrow_count} loans)"
+
+
+class BookRecommendation(models.Model):
+    """Precomputed "students who borrowed X also borrowed Y" pairs, rebuilt by build_library_recommendations"""
+    school = models.ForeignKey('schools.School', on_delete=models.CASCADE, related_name='book_recommendations')
+    book = models.ForeignKey(LibraryBook, on_delete=models.CASCADE, related_name='recommendations')
+    recommended_book = models.ForeignKey(LibraryBook, on_delete=models.CASCADE, related_name='+')
+    co_borrow_count = models.IntegerField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['book', 'recommended_book']
+        indexes = [
+            models.Index(fields=['book', 'rank']),
+            models.Index(fields=['school']),
+        ]
+        ordering = ['book', 'rank']
+    
+    def __str__(self):
+        return f"{self.book.title} -> {self.recommended_book.title} ({self.co_borrow_count})"
+
+
 # Keep the original models for backward compatibility but mark as deprecated
 class Book(LibraryBook):
     """Deprecated: Use LibraryBook instead"""
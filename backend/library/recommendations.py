@@ -0,0 +1,223 @@
+"""
+Circulation analytics for the library: "popular in your school" and
+"students who borrowed X also borrowed Y".
+
+Both lists are precomputed per school by the ``build_library_recommendations``
+management command and stored in ``PopularBook`` / ``BookRecommendation`` so
+the API only does an indexed read.
+
+The borrow history is streamed from the database as ``(user_id, book_id)``
+pairs ordered by user, converted to NumPy arrays chunk by chunk, and reduced
+to sparse co-borrow counts: every pair of books borrowed by the same user is
+encoded as one int64 key (``book_a * n_books + book_b``) and counted with
+``np.unique``. Memory is bounded by the chunk size and by ``max_pairs``, the
+number of distinct book pairs kept between chunks.
+"""
+import logging
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import LibraryBook, UserBook, PopularBook, BookRecommendation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+DEFAULT_POPULAR_LIMIT = 50
+DEFAULT_MIN_SUPPORT = 2
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_MEMORY_BUDGET_MB = 256
+MAX_LOANS_PER_USER = 200  # Caps the pairs a single heavy borrower can contribute
+PAIR_DTYPE = np.dtype((np.int64, 2))
+BYTES_PER_PAIR = 96  # key + count, plus the temporaries np.unique needs while merging
+WRITE_BATCH_SIZE = 1000
+
+
+def iter_loan_chunks(rows, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Group an iterator of ``(user_id, book_id)`` rows, sorted by user, into NumPy chunks.
+
+    A user's loans are never split across two chunks unless that user alone
+    has more than ``chunk_rows`` loans.
+    """
+    rows = iter(rows)
+    carry = np.empty((0, 2), dtype=np.int64)
+    while True:
+        block = np.fromiter(islice(rows, chunk_rows), dtype=PAIR_DTYPE)
+        if len(block) < chunk_rows:
+            block = np.concatenate([carry, block])
+            if len(block):
+                yield block
+            return
+        block = np.concatenate([carry, block])
+        cut = np.searchsorted(block[:, 0], block[-1, 0], side='left')
+        if cut == 0:
+            yield block
+            carry = np.empty((0, 2), dtype=np.int64)
+        else:
+            yield block[:cut]
+            carry = block[cut:]
+
+
+class CoBorrowCounter:
+    """Sparse symmetric co-borrow counts stored as sorted ``(key, count)`` arrays"""
+
+    def __init__(self, n_books, max_pairs, min_support=1):
+        self.n_books = n_books
+        self.max_pairs = max_pairs
+        self.min_support = min_support
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.pruned = False
+
+    def add_chunk(self, users, books):
+        """Count every ordered pair of distinct books borrowed by the same user in this chunk"""
+        if len(users) < 2:
+            return
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        sizes = np.diff(np.r_[starts, len(users)])
+        rank = np.arange(len(users)) - np.repeat(starts, sizes)
+        keep = rank < MAX_LOANS_PER_USER
+        users, books = users[keep], books[keep]
+
+        pending = []
+        pending_size = 0
+        flush_size = max(self.max_pairs // 2, 1000)
+        # Offset d pairs each loan with the loan d positions later of the same user
+        for d in range(1, int(min(sizes.max(), MAX_LOANS_PER_USER))):
+            same_user = users[d:] == users[:-d]
+            if not same_user.any():
+                break
+            first = books[:-d][same_user]
+            second = books[d:][same_user]
+            distinct = first != second
+            first, second = first[distinct], second[distinct]
+            pending.append(first * self.n_books + second)
+            pending.append(second * self.n_books + first)
+            pending_size += 2 * len(first)
+            if pending_size >= flush_size:
+                self._merge(np.concatenate(pending))
+                pending, pending_size = [], 0
+        if pending:
+            self._merge(np.concatenate(pending))
+
+    def _merge(self, new_keys):
+        keys, counts = np.unique(new_keys, return_counts=True)
+        if len(self.keys):
+            keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts])).astype(np.int64)
+        self.keys, self.counts = keys, counts
+        if len(self.keys) > self.max_pairs:
+            self._prune()
+
+    def _prune(self):
+        """Keep only the strongest pairs once the memory budget is exceeded (approximate from here on)"""
+        keep = np.argpartition(-self.counts, self.max_pairs // 2)[:self.max_pairs // 2]
+        keep.sort()
+        self.keys, self.counts = self.keys[keep], self.counts[keep]
+        if not self.pruned:
+            logger.warning(f"Co-borrow pairs exceeded {self.max_pairs}; keeping only the strongest pairs")
+        self.pruned = True
+
+    def top_k(self, k):
+        """Return ``(book_idx, recommended_idx, count, rank)`` arrays with the k strongest pairs per book"""
+        mask = self.counts >= self.min_support
+        keys, counts = self.keys[mask], self.counts[mask]
+        first, second = np.divmod(keys, self.n_books)
+        # Highest count first, ties broken by book index for stable output
+        order = np.lexsort((second, -counts, first))
+        first, second, counts = first[order], second[order], counts[order]
+        starts = np.flatnonzero(np.r_[True, first[1:] != first[:-1]]) if len(first) else np.empty(0, dtype=np.int64)
+        sizes = np.diff(np.r_[starts, len(first)])
+        rank = np.arange(len(first)) - np.repeat(starts, sizes)
+        keep = rank < k
+        return first[keep], second[keep], counts[keep], rank[keep] + 1
+
+
+def compute_school_recommendations(rows, book_ids, top_k=DEFAULT_TOP_K, popular_limit=DEFAULT_POPULAR_LIMIT,
+                                   min_support=DEFAULT_MIN_SUPPORT, chunk_rows=DEFAULT_CHUNK_ROWS,
+                                   memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Reduce a user-ordered ``(user_id, book_id)`` stream to popular books and top-K co-borrows.
+
+    ``book_ids`` must be a sorted int64 array of every book the rows may refer to.
+    Returns a dict of NumPy arrays keyed by book id plus the number of rows read.
+    """
+    n_books = len(book_ids)
+    max_pairs = max(memory_budget_mb * 1024 * 1024 // BYTES_PER_PAIR, 1000)
+    counter = CoBorrowCounter(n_books, max_pairs, min_support)
+    loan_counts = np.zeros(n_books, dtype=np.int64)
+    rows_read = 0
+
+    for chunk in iter_loan_chunks(rows, chunk_rows):
+        rows_read += len(chunk)
+        books = np.searchsorted(book_ids, chunk[:, 1])
+        loan_counts += np.bincount(books, minlength=n_books)
+        counter.add_chunk(chunk[:, 0], books)
+
+    popular = np.argsort(-loan_counts, kind='stable')[:popular_limit]
+    popular = popular[loan_counts[popular] > 0]
+    first, second, counts, ranks = counter.top_k(top_k)
+
+    return {
+        'rows_read': rows_read,
+        'approximate': counter.pruned,
+        'popular_book_ids': book_ids[popular],
+        'popular_counts': loan_counts[popular],
+        'book_ids': book_ids[first],
+        'recommended_book_ids': book_ids[second],
+        'co_borrow_counts': counts,
+        'ranks': ranks,
+    }
+
+
+def build_school_recommendations(school, **options):
+    """Stream a school's borrow history, compute the lists and replace the school's stored rows"""
+    book_ids = np.fromiter(
+        LibraryBook.objects.filter(school=school).order_by('id').values_list('id', flat=True),
+        dtype=np.int64
+    )
+    rows = UserBook.objects.filter(type='BORROWED', book__school=school).order_by(
+        'user_id', 'book_id'
+    ).values_list('user_id', 'book_id').iterator(chunk_size=10000)
+
+    result = compute_school_recommendations(rows, book_ids, **options)
+    computed_at = timezone.now()
+
+    popular = [
+        PopularBook(school=school, book_id=int(book_id), borrow_count=int(count), rank=rank, computed_at=computed_at)
+        for rank, (book_id, count) in enumerate(zip(result['popular_book_ids'], result['popular_counts']), start=1)
+    ]
+
+    with transaction.atomic():
+        PopularBook.objects.filter(school=school).delete()
+        PopularBook.objects.bulk_create(popular, batch_size=WRITE_BATCH_SIZE)
+
+        BookRecommendation.objects.filter(school=school).delete()
+        recommendations = zip(
+            result['book_ids'], result['recommended_book_ids'], result['co_borrow_counts'], result['ranks']
+        )
+        batch = []
+        for book_id, recommended_id, count, rank in recommendations:
+            batch.append(BookRecommendation(
+                school=school,
+                book_id=int(book_id),
+                recommended_book_id=int(recommended_id),
+                co_borrow_count=int(count),
+                rank=int(rank),
+                computed_at=computed_at,
+            ))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                BookRecommendation.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            BookRecommendation.objects.bulk_create(batch)
+
+    return {
+        'rows_read': result['rows_read'],
+        'approximate': result['approximate'],
+        'popular': len(popular),
+        'recommendations': len(result['ranks']),
+    }
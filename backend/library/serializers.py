@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from .models import LibraryBook, UserBook, Search, LibraryTransaction, BookRequest
+from .models import LibraryBook, UserBook, Search, LibraryTransaction, BookRequest, LibraryBalance, BookHold
 from users.serializers import UserSerializer
 import base64
 
@@ -124,6 +124,26 @@ class LibraryTransactionSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['created_at']
 
+class LibraryBalanceSerializer(serializers.ModelSerializer):
+    """Serializer for the per-user outstanding fines rollup"""
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    user_email = serializers.CharField(source='user.email', read_only=True)
+    
+    class Meta:
+        model = LibraryBalance
+        fields = ['id', 'user', 'user_name', 'user_email', 'school', 'outstanding_amount', 'overdue_loans', 'last_accrued_at']
+        read_only_fields = fields
+
+class BookHoldSerializer(serializers.ModelSerializer):
+    """Serializer for BookHold model"""
+    book_title = serializers.CharField(source='book.title', read_only=True)
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    
+    class Meta:
+        model = BookHold
+        fields = '__all__'
+        read_only_fields = ['user', 'book', 'status', 'created_at', 'ready_at', 'expires_at', 'closed_at']
+
 # Action serializers for specific operations
 class BorrowBookSerializer(serializers.Serializer):
     """Serializer for borrowing a book"""
@@ -9,6 +9,7 @@ router.register(r'user-books', views.UserBookViewSet, basename='user-book')
 router.register(r'transactions', views.LibraryTransactionViewSet, basename='library-transaction')
 router.register(r'searches', views.SearchViewSet, basename='library-search')
 router.register(r'book-requests', views.BookRequestViewSet, basename='book-request')
+router.register(r'holds', views.BookHoldViewSet, basename='book-hold')
 
 # Backward compatibility endpoints
 router.register(r'legacy-books', views.BookViewSet, basename='book')
@@ -20,10 +21,12 @@ urlpatterns = [
     # Additional convenience endpoints
     path('search/', views.LibraryBookViewSet.as_view({'get': 'search', 'post': 'search'}), name='book-search'),
     path('suggestions/', views.LibraryBookViewSet.as_view({'get': 'suggestions'}), name='book-suggestions'),
+    path('popular/', views.LibraryBookViewSet.as_view({'get': 'popular'}), name='popular-books'),
     path('borrowed/', views.UserBookViewSet.as_view({'get': 'borrowed'}), name='borrowed-books'),
     path('purchased/', views.UserBookViewSet.as_view({'get': 'purchased'}), name='purchased-books'),
     path('overdue/', views.UserBookViewSet.as_view({'get': 'overdue'}), name='overdue-books'),
     path('dashboard-stats/', views.UserBookViewSet.as_view({'get': 'dashboard_stats'}), name='library-dashboard-stats'),
+    path('outstanding-fines/', views.UserBookViewSet.as_view({'get': 'outstanding_fines'}), name='library-outstanding-fines'),
     path('borrow/', views.UserBookViewSet.as_view({'post': 'borrow'}), name='borrow-book'),
     path('return/', views.UserBookViewSet.as_view({'post': 'return_book'}), name='return-book'),
     path('purchase/', views.UserBookViewSet.as_view({'post': 'purchase'}), name='purchase-book'),
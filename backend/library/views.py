@@ -3,6 +3,7 @@ from rest_framework import viewsets, status, filters, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
 from django.db.models import Q, Count, Sum
 from django.utils import timezone
 from django.conf import settings
@@ -13,13 +14,21 @@ import base64
 from datetime import timedelta
 from decimal import Decimal
 
-from .models import LibraryBook, UserBook, Search, LibraryTransaction, BookRequest, CHECKOUT_LIMIT, DUE_DAYS, FINE_PER_DAY
+from .models import (
+    LibraryBook, UserBook, Search, LibraryTransaction, BookRequest, LibraryBalance, BookHold,
+    PopularBook, BookRecommendation, CHECKOUT_LIMIT, DUE_DAYS, FINE_PER_DAY
+)
+from .fines import refresh_user_balance
+from .inventory import take_copy, release_copy, retire_copy, claim_hold, fulfil_waiting_hold, place_hold, cancel_hold
+from utils.exports import ExportMixin
+from utils.pagination import KeysetPagination
 from .serializers import (
     LibraryBookSerializer, UserBookSerializer, UserBookDetailSerializer,
     SearchSerializer, LibraryTransactionSerializer,
     BorrowBookSerializer, ReturnBookSerializer, PurchaseBookSerializer,
     GoogleBooksSearchSerializer, BookSerializer, BookBorrowRecordSerializer,
-    BookRequestSerializer, BookRequestCreateSerializer
+    BookRequestSerializer, BookRequestCreateSerializer, LibraryBalanceSerializer,
+    BookHoldSerializer
 )
 
 User = get_user_model()
@@ -267,6 +276,78 @@ class LibraryBookViewSet(viewsets.ModelViewSet):
                 pass
         return None
 
+    @action(detail=True, methods=['post'])
+    def hold(self, request, pk=None):
+        """Place a hold on a book; a copy is reserved now if one is on the shelf, otherwise on return"""
+        book = self.get_object()
+        if book.total_copies <= 0:
+            return Response({'error': 'This book has no physical copies to hold'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if UserBook.objects.filter(user=request.user, book=book, type='BORROWED', status='active').exists():
+            return Response({'error': 'You have already borrowed this book'}, status=status.HTTP_400_BAD_REQUEST)
+
+        hold, created = place_hold(request.user, book.id)
+        queue_position = 0
+        if hold.status == 'waiting':
+            queue_position = BookHold.objects.filter(
+                book=book, status='waiting', created_at__lte=hold.created_at
+            ).count()
+
+        return Response({
+            'success': True,
+            'message': 'Copy reserved for pickup' if hold.status == 'ready' else 'Added to the waiting list',
+            'queue_position': queue_position,
+            'hold': BookHoldSerializer(hold).data
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """Most borrowed books in the user's school, from the precomputed circulation analytics"""
+        user_school = None
+        if hasattr(request.user, 'school'):
+            user_school = request.user.school
+        elif hasattr(request.user, 'student_profile') and request.user.student_profile.school:
+            user_school = request.user.student_profile.school
+        elif hasattr(request.user, 'staff_profile') and request.user.staff_profile.school:
+            user_school = request.user.staff_profile.school
+
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            limit = 10
+
+        entries = list(PopularBook.objects.filter(school=user_school).select_related('book').order_by('rank')[:limit])
+        return Response({
+            'success': True,
+            'computed_at': entries[0].computed_at if entries else None,
+            'books': [
+                {
+                    'rank': entry.rank,
+                    'borrow_count': entry.borrow_count,
+                    'book': LibraryBookSerializer(entry.book, context={'request': request}).data
+                }
+                for entry in entries
+            ]
+        })
+
+    @action(detail=True, methods=['get'])
+    def also_borrowed(self, request, pk=None):
+        """Students who borrowed this book also borrowed..., from the precomputed circulation analytics"""
+        book = self.get_object()
+        entries = BookRecommendation.objects.filter(book=book).select_related('recommended_book').order_by('rank')
+        return Response({
+            'success': True,
+            'book_id': book.id,
+            'recommendations': [
+                {
+                    'rank': entry.rank,
+                    'co_borrow_count': entry.co_borrow_count,
+                    'book': LibraryBookSerializer(entry.recommended_book, context={'request': request}).data
+                }
+                for entry in entries
+            ]
+        })
+
     @action(detail=False, methods=['get'])
     def suggestions(self, request):
         """Get recent search suggestions"""
@@ -289,7 +370,7 @@ class LibraryBookViewSet(viewsets.ModelViewSet):
             'suggestions': serializer.data
         })
 
-class UserBookViewSet(viewsets.ModelViewSet):
+class UserBookViewSet(ExportMixin, viewsets.ModelViewSet):
     """ViewSet for user book relationships (borrowed/purchased)"""
     queryset = UserBook.objects.all()
     serializer_class = UserBookSerializer
@@ -298,6 +379,22 @@ class UserBookViewSet(viewsets.ModelViewSet):
     search_fields = ['book__title', 'book__author', 'book__isbn']
     ordering_fields = ['created_at', 'borrowed_date', 'due_date']
     ordering = ['-created_at']
+    export_filename = 'library_loans'
+    export_fields = [
+        ('book__title', 'Title'),
+        ('book__author', 'Author'),
+        ('book__isbn', 'ISBN'),
+        ('user__email', 'Email'),
+        ('user__first_name', 'First Name'),
+        ('user__last_name', 'Last Name'),
+        ('type', 'Type'),
+        ('status', 'Status'),
+        ('borrowed_date', 'Borrowed'),
+        ('due_date', 'Due'),
+        ('returned_date', 'Returned'),
+        ('fine_amount', 'Fine'),
+        ('fine_paid', 'Fine Paid'),
+    ]
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -367,10 +464,6 @@ class UserBookViewSet(viewsets.ModelViewSet):
         if hasattr(request.user, 'balance') and request.user.balance < 0:
             return Response({'error': 'Cannot borrow books due to negative balance'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Check if book is available
-        if book.available_copies <= 0:
-            return Response({'error': 'Book is not available for borrowing'}, status=status.HTTP_400_BAD_REQUEST)
-
         # Check checkout limit
         current_borrowed = UserBook.objects.filter(
             user=request.user,
@@ -387,19 +480,26 @@ class UserBookViewSet(viewsets.ModelViewSet):
         if UserBook.objects.filter(user=request.user, book=book, type='BORROWED', status='active').exists():
             return Response({'error': 'You have already borrowed this book'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create borrow record
-        borrowed_date = timezone.now()
-        user_book = UserBook.objects.create(
-            user=request.user,
-            book=book,
-            type='BORROWED',
-            borrowed_date=borrowed_date,
-            issued_by=request.user  # In self-service, user is the issuer
-        )
-
-        # Update book availability
-        book.available_copies -= 1
-        book.save()
+        with transaction.atomic():
+            # A copy reserved by the user's hold is already off the shelf; otherwise take one
+            # atomically so concurrent checkouts can never lend more copies than exist
+            if not claim_hold(request.user, book.id):
+                if not take_copy(book.id):
+                    return Response({
+                        'error': 'Book is not available for borrowing',
+                        'can_place_hold': book.total_copies > 0
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                fulfil_waiting_hold(request.user, book.id)
+
+            # Create borrow record
+            borrowed_date = timezone.now()
+            user_book = UserBook.objects.create(
+                user=request.user,
+                book=book,
+                type='BORROWED',
+                borrowed_date=borrowed_date,
+                issued_by=request.user  # In self-service, user is the issuer
+            )
 
         # Update user's checked_out count if user has this field
         if hasattr(request.user, 'checked_out'):
@@ -424,39 +524,44 @@ class UserBookViewSet(viewsets.ModelViewSet):
         condition = serializer.validated_data.get('condition', 'good')
         notes = serializer.validated_data.get('notes', '')
 
-        try:
-            user_book = UserBook.objects.get(id=user_book_id, user=request.user, type='BORROWED', status='active')
-        except UserBook.DoesNotExist:
-            return Response({'error': 'Borrowed book record not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Calculate fine
-        fine_amount = user_book.calculate_fine()
-        
-        # Update user book record
-        user_book.returned_date = timezone.now()
-        user_book.fine_amount = fine_amount
-        
-        if condition == 'good':
-            user_book.status = 'returned'
-        elif condition == 'damaged':
-            user_book.status = 'damaged'
-            # Add damage fee (could be configurable)
-            damage_fee = Decimal('50.00')  # Example damage fee
-            fine_amount += damage_fee
-            user_book.fine_amount = fine_amount
-        elif condition == 'lost':
-            user_book.status = 'lost'
-            # Add replacement cost
-            replacement_cost = user_book.book.price or Decimal('100.00')  # Default replacement cost
-            fine_amount += replacement_cost
+        with transaction.atomic():
+            try:
+                # Lock the loan so a double-submitted return cannot release two copies
+                user_book = UserBook.objects.select_for_update(of=('self',)).select_related('book').get(
+                    id=user_book_id, user=request.user, type='BORROWED', status='active'
+                )
+            except UserBook.DoesNotExist:
+                return Response({'error': 'Borrowed book record not found'}, status=status.HTTP_404_NOT_FOUND)
+
+            # Calculate fine
+            fine_amount = user_book.calculate_fine()
+            
+            # Update user book record
+            user_book.returned_date = timezone.now()
             user_book.fine_amount = fine_amount
-        
-        user_book.save()
+            
+            if condition == 'good':
+                user_book.status = 'returned'
+            elif condition == 'damaged':
+                user_book.status = 'damaged'
+                # Add damage fee (could be configurable)
+                damage_fee = Decimal('50.00')  # Example damage fee
+                fine_amount += damage_fee
+                user_book.fine_amount = fine_amount
+            elif condition == 'lost':
+                user_book.status = 'lost'
+                # Add replacement cost
+                replacement_cost = user_book.book.price or Decimal('100.00')  # Default replacement cost
+                fine_amount += replacement_cost
+                user_book.fine_amount = fine_amount
+            
+            user_book.save()
 
-        # Update book availability (only if not lost)
-        if condition != 'lost':
-            user_book.book.available_copies += 1
-            user_book.book.save()
+            # Returned copies go to the next hold or back on the shelf; lost copies leave the inventory
+            if condition != 'lost':
+                release_copy(user_book.book_id)
+            else:
+                retire_copy(user_book.book_id)
 
         # Deduct fine from user balance if applicable
         if fine_amount > 0 and hasattr(request.user, 'balance'):
@@ -480,6 +585,9 @@ class UserBookViewSet(viewsets.ModelViewSet):
             request.user.checked_out = max(0, request.user.checked_out - 1)
             request.user.save()
 
+        # Keep the outstanding-fines rollup current without waiting for the nightly run
+        refresh_user_balance(request.user)
+
         serializer = UserBookDetailSerializer(user_book, context={'request': request})
         return Response({
             'success': True,
@@ -587,6 +695,11 @@ class UserBookViewSet(viewsets.ModelViewSet):
             total=Sum('fine_amount')
         )['total'] or 0
 
+        # Unpaid fines as of the last accrual run
+        outstanding_fines = LibraryBalance.objects.filter(user=request.user).values_list(
+            'outstanding_amount', flat=True
+        ).first() or 0
+
         return Response({
             'success': True,
             'stats': {
@@ -595,11 +708,55 @@ class UserBookViewSet(viewsets.ModelViewSet):
                 'purchased_total': purchased_total,
                 'overdue_count': overdue_count,
                 'total_fines': float(total_fines),
+                'outstanding_fines': float(outstanding_fines),
                 'checkout_limit': CHECKOUT_LIMIT,
                 'can_borrow_more': borrowed_active < CHECKOUT_LIMIT
             }
         })
 
+    @action(detail=False, methods=['get'])
+    def outstanding_fines(self, request):
+        """School-wide outstanding fines report (staff/admin only), read from the accrual rollup"""
+        if request.user.role not in ['faculty', 'admin', 'librarian'] and not request.user.is_superuser:
+            return Response(
+                {'error': 'Only staff can view the outstanding fines report'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        queryset = LibraryBalance.objects.filter(outstanding_amount__gt=0)
+        if not request.user.is_superuser:
+            user_school = None
+            if hasattr(request.user, 'school'):
+                user_school = request.user.school
+            elif hasattr(request.user, 'staff_profile') and request.user.staff_profile.school:
+                user_school = request.user.staff_profile.school
+            queryset = queryset.filter(school=user_school)
+
+        totals = queryset.aggregate(
+            total_outstanding=Sum('outstanding_amount'),
+            total_overdue_loans=Sum('overdue_loans'),
+            users=Count('id')
+        )
+        queryset = queryset.select_related('user').order_by('-outstanding_amount')
+
+        summary = {
+            'users_with_fines': totals['users'],
+            'total_outstanding': float(totals['total_outstanding'] or 0),
+            'total_overdue_loans': totals['total_overdue_loans'] or 0,
+        }
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(LibraryBalanceSerializer(page, many=True).data)
+            response.data['summary'] = summary
+            return response
+
+        return Response({
+            'success': True,
+            'summary': summary,
+            'balances': LibraryBalanceSerializer(queryset, many=True).data
+        })
+
 # Backward compatibility views
 class BookViewSet(LibraryBookViewSet):
     """Backward compatibility for Book model"""
@@ -623,6 +780,7 @@ class LibraryTransactionViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['user__username', 'user__email', 'transaction_type', 'description']
     ordering_fields = ['created_at', 'amount']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -641,7 +799,7 @@ class LibraryTransactionViewSet(viewsets.ReadOnlyModelViewSet):
             if user_school:
                 queryset = queryset.filter(user__student_profile__school=user_school)
         
-        return queryset
+        return queryset.select_related('user', 'processed_by', 'user_book__book')
 
 class SearchViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for search history (read-only)"""
@@ -652,6 +810,7 @@ class SearchViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['query', 'user__username']
     ordering_fields = ['created_at', 'result_count']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -680,6 +839,58 @@ class SearchViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+class BookHoldViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for book holds (waiting list and reserved copies)"""
+    queryset = BookHold.objects.select_related('book', 'user')
+    serializer_class = BookHoldSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['created_at', 'expires_at']
+    ordering = ['created_at']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        
+        # Students can only see their own holds
+        if self.request.user.role == 'student':
+            queryset = queryset.filter(user=self.request.user)
+        # Staff and admin can see all holds for their school
+        elif not self.request.user.is_superuser:
+            user_school = None
+            if hasattr(self.request.user, 'school'):
+                user_school = self.request.user.school
+            elif hasattr(self.request.user, 'staff_profile') and self.request.user.staff_profile.school:
+                user_school = self.request.user.staff_profile.school
+                
+            if user_school:
+                queryset = queryset.filter(book__school=user_school)
+        
+        # Filter by status, "active" meaning waiting or ready
+        hold_status = self.request.query_params.get('status')
+        if hold_status == 'active':
+            queryset = queryset.filter(status__in=BookHold.ACTIVE_STATUSES)
+        elif hold_status:
+            queryset = queryset.filter(status=hold_status)
+        
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a hold; a copy reserved for it passes to the next person in the queue"""
+        hold = self.get_object()
+        if hold.user != request.user and request.user.role not in ['faculty', 'admin', 'librarian']:
+            return Response({'error': 'You can only cancel your own holds'}, status=status.HTTP_403_FORBIDDEN)
+
+        if hold.status not in BookHold.ACTIVE_STATUSES or not cancel_hold(hold):
+            return Response({'error': 'Hold is no longer active'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'message': 'Hold cancelled',
+            'hold': BookHoldSerializer(hold).data
+        })
+
+
 class BookRequestViewSet(viewsets.ModelViewSet):
     """ViewSet for managing book requests from students"""
     queryset = BookRequest.objects.all()
@@ -811,8 +1022,14 @@ class BookRequestViewSet(viewsets.ModelViewSet):
         book_request.admin_notes = request.data.get('admin_notes', '')
         book_request.save()
         
+        # Queue the requester for a copy instead of leaving it to whoever borrows first
+        hold = None
+        if book_request.library_book and book_request.library_book.total_copies > 0:
+            hold, _ = place_hold(book_request.user, book_request.library_book_id)
+        
         return Response({
             'success': True,
             'message': 'Book request marked as available',
-            'request': BookRequestSerializer(book_request).data
+            'request': BookRequestSerializer(book_request).data,
+            'hold': BookHoldSerializer(hold).data if hold else None
         })
\ No newline at end of file
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notice_school_notice_notificatio_school__464963_idx_and_more'),
+        ('schools', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['publish_date', 'id'], name='notificatio_publish_1a1f03_idx'),
+        ),
+    ]
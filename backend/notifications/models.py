@@ -38,6 +38,7 @@ class Notice(models.Model):
             models.Index(fields=['school', 'priority']),
             models.Index(fields=['school', 'publish_date']),
             models.Index(fields=['school', 'is_active']),
+            models.Index(fields=['publish_date', 'id']),  # Keyset ordering of user notifications
         ]
     
     def __str__(self):
@@ -7,6 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from .models import Notice, UserNotification
 from .serializers import NoticeSerializer, UserNotificationSerializer, UserNotificationDetailSerializer
+from utils.pagination import KeysetPagination
 
 
 class NoticeViewSet(viewsets.ModelViewSet):
@@ -31,6 +32,10 @@ class NoticeViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(
                 models.Q(expire_date__isnull=True) | models.Q(expire_date__gte=now)
             )
+        # Notices without target roles are personal (e.g. low attendance alerts):
+        # only the users they were delivered to through UserNotification see them
+        delivered = UserNotification.objects.filter(user=self.request.user).values('notice_id')
+        queryset = queryset.filter(~models.Q(target_roles=[]) | models.Q(id__in=delivered))
         return queryset
     
     @action(detail=False, methods=['get'])
@@ -62,7 +67,8 @@ class UserNotificationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['notice__title', 'notice__content']
-    ordering = ['-notice__publish_date']
+    pagination_class = KeysetPagination
+    ordering = ['-notice__publish_date', '-id']
     
     def get_queryset(self):
         return UserNotification.objects.filter(user=self.request.user)
@@ -1,5 +1,12 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from .locations import invalidate_location_tree
 from .models import School
+from .provisioning import provision_admins
+
+# Larger selections are left to provision_school_admins, password hashing is slow
+INLINE_PROVISION_LIMIT = 10
 
 
 @admin.register(School)
@@ -26,21 +33,33 @@ class SchoolAdmin(admin.ModelAdmin):
     
     def activate_schools(self, request, queryset):
         """Custom action to activate schools"""
-        activated_count = 0
-        for school in queryset.filter(is_active=False):
-            school.is_active = True
-            school.save()  # This will trigger the signal to create admin
-            activated_count += 1
+        school_ids = list(queryset.filter(is_active=False).values_list('id', flat=True))
+        with transaction.atomic():
+            School.objects.filter(id__in=school_ids).update(is_active=True)
+            get_user_model().objects.filter(school_id__in=school_ids, is_active=False).update(is_active=True)
+        invalidate_location_tree()
         
-        self.message_user(
-            request,
-            f"Successfully activated {activated_count} schools and created admin accounts."
-        )
+        if len(school_ids) <= INLINE_PROVISION_LIMIT:
+            provision_admins(workers=0, school_ids=school_ids)
+            self.message_user(
+                request,
+                f"Successfully activated {len(school_ids)} schools and created admin accounts."
+            )
+        else:
+            self.message_user(
+                request,
+                f"Successfully activated {len(school_ids)} schools. Their admin accounts are queued: "
+                f"run 'manage.py provision_school_admins' to create them."
+            )
     activate_schools.short_description = "Activate selected schools"
     
     def deactivate_schools(self, request, queryset):
         """Custom action to deactivate schools"""
-        deactivated_count = queryset.filter(is_active=True).update(is_active=False)
+        school_ids = list(queryset.filter(is_active=True).values_list('id', flat=True))
+        with transaction.atomic():
+            deactivated_count = School.objects.filter(id__in=school_ids).update(is_active=False)
+            get_user_model().objects.filter(school_id__in=school_ids, is_active=True).update(is_active=False)
+        invalidate_location_tree()
         self.message_user(
             request,
             f"Successfully deactivated {deactivated_count} schools."
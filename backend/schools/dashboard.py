@@ -0,0 +1,136 @@
+"""
+School dashboard data.
+
+The dashboard loads in two steps. ``dashboard_summary`` is the first
+paint: the school's details and counts for every section, from two
+aggregate queries. Each section is then listed a page at a time from
+``section_rows``, a ``values()`` projection with the staff profile joined
+in, so a page costs one query plus the count whatever the school size.
+
+Sections do not overlap: ``teachers`` are faculty, ``staff`` the
+non-teaching roles, ``students`` the student profiles, and ``users`` every
+account of the school (optionally filtered by role).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+
+from users.models import StudentProfile
+
+TEACHER_ROLES = ['faculty']
+STAFF_ROLES = ['admin', 'librarian', 'warden', 'management']
+DASHBOARD_SECTIONS = ['students', 'teachers', 'staff', 'users']
+
+STUDENT_FIELDS = [
+    'id', 'admission_number', 'first_name', 'last_name', 'course', 'semester', 'is_active',
+    'user_id', 'user__first_name', 'user__last_name', 'user__email',
+]
+STAFF_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'role', 'is_active',
+    'staff_profile__department', 'staff_profile__designation', 'staff_profile__experience_years',
+]
+USER_FIELDS = ['id', 'first_name', 'last_name', 'email', 'role', 'is_active', 'date_joined']
+
+
+def dashboard_summary(school):
+    """School details and the size of every dashboard section"""
+    counts = get_user_model().objects.filter(school=school, is_active=True).aggregate(
+        teachers=Count('id', filter=Q(role__in=TEACHER_ROLES)),
+        staff=Count('id', filter=Q(role__in=STAFF_ROLES)),
+        wardens=Count('id', filter=Q(role='warden')),
+        parents=Count('id', filter=Q(role='parent')),
+        users=Count('id')
+    )
+    counts.update(StudentProfile.objects.filter(school=school, is_active=True).aggregate(
+        students=Count('id'),
+        classes=Count('course', distinct=True)
+    ))
+    return {
+        'school': {
+            'name': school.school_name,
+            'code': school.school_code,
+            'email': school.contact_email or school.get_admin_email(),
+            'phone': school.contact_phone or 'Not provided',
+            'address': school.address or school.full_location
+        },
+        'counts': counts,
+    }
+
+
+def section_rows(school, section, search=None, role=None):
+    """
+    Active members of a dashboard section as ``values()`` rows, in a stable order.
+
+    ``search`` matches the start of a first name, last name or email (and of
+    the admission number for students). ``role`` narrows the ``users`` section.
+    """
+    if section == 'students':
+        rows = StudentProfile.objects.filter(school=school, is_active=True)
+        if search:
+            rows = rows.filter(
+                Q(admission_number__istartswith=search) | Q(first_name__istartswith=search) |
+                Q(last_name__istartswith=search) | Q(user__first_name__istartswith=search) |
+                Q(user__last_name__istartswith=search) | Q(user__email__istartswith=search)
+            )
+        return rows.order_by('admission_number', 'id').values(*STUDENT_FIELDS)
+
+    rows = get_user_model().objects.filter(school=school, is_active=True)
+    if section == 'teachers':
+        rows = rows.filter(role__in=TEACHER_ROLES)
+    elif section == 'staff':
+        rows = rows.filter(role__in=STAFF_ROLES)
+    elif role:
+        rows = rows.filter(role=role)
+    if search:
+        rows = rows.filter(
+            Q(first_name__istartswith=search) | Q(last_name__istartswith=search) | Q(email__istartswith=search)
+        )
+    fields = USER_FIELDS if section == 'users' else STAFF_FIELDS
+    return rows.order_by('first_name', 'last_name', 'id').values(*fields)
+
+
+def section_entry(section, row, school):
+    """One dashboard list item, shaped as the dashboard has always sent it"""
+    status = 'active' if row['is_active'] else 'inactive'
+    if section == 'students':
+        has_user = row['user_id'] is not None
+        name_known = has_user or (row['first_name'] and row['last_name'])
+        return {
+            'id': row['id'],
+            'admission_number': row['admission_number'],
+            'user': {
+                'first_name': row['user__first_name'] if has_user else row['first_name'],
+                'last_name': row['user__last_name'] if has_user else row['last_name'],
+                'email': row['user__email'] if has_user else (
+                    f"student.{row['admission_number']}@{school.school_code[-5:]}.rj"
+                ),
+            } if name_known else None,
+            'course': row['course'],
+            'batch': row['semester'],
+            'status': status
+        }
+    if section == 'users':
+        return {
+            'id': row['id'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'email': row['email'],
+            'role': row['role'],
+            'is_active': row['is_active'],
+            'created_at': row['date_joined'].isoformat() if row['date_joined'] else None,
+        }
+    has_profile = row['staff_profile__designation'] is not None
+    return {
+        'id': row['id'],
+        'user': {
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'email': row['email'],
+        },
+        'role': row['role'],
+        'department': row['staff_profile__department'] if has_profile else 'Not specified',
+        'designation': row['staff_profile__designation'] if has_profile else (
+            'Faculty' if section == 'teachers' else row['role'].capitalize()
+        ),
+        'experience_years': row['staff_profile__experience_years'] if has_profile else 0,
+        'status': status
+    }
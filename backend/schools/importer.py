@@ -0,0 +1,114 @@
+"""
+Bulk school import.
+
+``import_schools --bulk`` reads the CSV as a stream and handles it in
+chunks. For each chunk the existing schools are fetched with one
+``school_code IN (...)`` query, new schools are written with
+``bulk_create`` and changed ones with ``bulk_update``, all in one
+transaction per chunk. Memory use stays flat however large the file is.
+
+Bulk writes do not send ``post_save``, so activating a school here does not
+create its admin account. Admin accounts are created afterwards, in
+batches, by ``provision_school_admins`` (see ``schools.provisioning``).
+Users of a school that is re-activated by the import are enabled in the
+same transaction, and the cached location tree is dropped, as the signals
+would have done.
+"""
+import csv
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .locations import invalidate_location_tree
+from .models import School
+
+CSV_COLUMNS = ['district', 'block', 'village', 'school_name', 'school_code']
+UPDATE_FIELDS = ['district', 'block', 'village', 'school_name']
+IMPORT_CHUNK_SIZE = 2000
+WRITE_BATCH_SIZE = 500
+
+
+def read_school_rows(file):
+    """
+    Yield ``(row_num, values, error)`` for each data row of a schools CSV.
+
+    ``values`` is a dict of the ``CSV_COLUMNS``, or None when the row is
+    invalid and ``error`` says why. A header line is detected and skipped.
+    """
+    sample = file.read(1024)
+    file.seek(0)
+    has_header = csv.Sniffer().has_header(sample)
+    reader = csv.reader(file)
+    if has_header:
+        next(reader, None)
+
+    for row_num, row in enumerate(reader, start=1):
+        # Expected format: District, Block, Village, School_Name, School_Code
+        if len(row) < 5:
+            yield row_num, None, f'Insufficient columns. Expected 5, got {len(row)}'
+            continue
+        values = dict(zip(CSV_COLUMNS, (value.strip() for value in row[:5])))
+        if not all(values.values()):
+            yield row_num, None, 'Missing required fields'
+            continue
+        too_long = [
+            column for column in CSV_COLUMNS
+            if len(values[column]) > School._meta.get_field(column).max_length
+        ]
+        if too_long:
+            yield row_num, None, f'Value too long for {", ".join(too_long)}'
+            continue
+        yield row_num, values, None
+
+
+def import_chunk(rows, activate=False, update=False):
+    """
+    Create or update the schools of one chunk of ``read_school_rows`` values.
+
+    When a school code appears more than once in the chunk the last row
+    wins. Returns a dict of counts: created, updated, unchanged, skipped
+    (existing schools left alone without ``update``) and activated.
+    """
+    by_code = {values['school_code']: values for values in rows}
+    existing = School.objects.in_bulk(list(by_code), field_name='school_code')
+
+    to_create = []
+    # bulk_update writes a CASE over the whole batch for every field it is given,
+    # so changed schools are grouped by the fields that actually changed
+    to_update = {}
+    activated_ids = []
+    stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'activated': 0}
+    for code, values in by_code.items():
+        school = existing.get(code)
+        if school is None:
+            to_create.append(School(**values, is_active=activate))
+            continue
+        if not update:
+            stats['skipped'] += 1
+            continue
+
+        changed = tuple(field for field in UPDATE_FIELDS if getattr(school, field) != values[field])
+        if changed:
+            for field in changed:
+                setattr(school, field, values[field])
+            to_update.setdefault(changed, []).append(school)
+        if activate and not school.is_active:
+            activated_ids.append(school.id)
+        elif not changed:
+            stats['unchanged'] += 1
+
+    with transaction.atomic():
+        School.objects.bulk_create(to_create, batch_size=WRITE_BATCH_SIZE)
+        for fields, schools in to_update.items():
+            School.objects.bulk_update(schools, fields, batch_size=WRITE_BATCH_SIZE)
+        if activated_ids:
+            School.objects.filter(id__in=activated_ids).update(is_active=True)
+            get_user_model().objects.filter(school_id__in=activated_ids, is_active=False).update(is_active=True)
+    if to_create or to_update or activated_ids:
+        invalidate_location_tree()
+
+    stats['created'] = len(to_create)
+    updated_ids = {school.id for schools in to_update.values() for school in schools}
+    stats['updated'] = len(updated_ids | set(activated_ids))
+    stats['activated'] = len(activated_ids) + (len(to_create) if activate else 0)
+    return stats
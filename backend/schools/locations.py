@@ -0,0 +1,96 @@
+"""
+District / block / village directory of active schools for the admission form.
+
+``location_tree`` is the whole hierarchy with school counts per node,
+computed with one grouped ``values().annotate()`` query over the indexed
+location columns. It is serialized once into a compact JSON blob, gzipped
+once, given an ETag and kept in the cache, so serving it costs one cache
+read and a browser that already has it gets a 304. Villages are
+``[name, schools]`` pairs to keep the blob small::
+
+    {"success": true, "data": {"total_schools": 2,
+     "districts": [{"name": "AJMER", "schools": 2,
+                    "blocks": [{"name": "AJMER(U)", "schools": 2,
+                                "villages": [["WARD NO. 1", 2]]}]}]}}
+
+Any change to schools invalidates it (``invalidate_location_tree``); bulk
+writes, which send no signals, call that themselves. Each process may keep
+a copy for up to ``LOCATION_TREE_TTL`` seconds when the cache is not shared.
+
+The schools themselves are listed a page at a time with ``schools_at``,
+optionally restricted to a node and to a name or code prefix.
+"""
+import gzip
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.http import quote_etag
+
+from .models import School
+
+LOCATION_TREE_CACHE_KEY = 'schools:location_tree'
+LOCATION_TREE_TTL = 3600
+PUBLIC_SCHOOL_FIELDS = ['id', 'school_name', 'school_code', 'district', 'block', 'village']
+
+
+def build_location_tree():
+    """The active schools' location hierarchy with school counts per node"""
+    rows = School.objects.filter(is_active=True).order_by().values('district', 'block', 'village').annotate(
+        schools=Count('id')
+    ).order_by('district', 'block', 'village')
+
+    districts = []
+    total = 0
+    for row in rows:
+        if not districts or districts[-1]['name'] != row['district']:
+            districts.append({'name': row['district'], 'schools': 0, 'blocks': []})
+        district = districts[-1]
+        if not district['blocks'] or district['blocks'][-1]['name'] != row['block']:
+            district['blocks'].append({'name': row['block'], 'schools': 0, 'villages': []})
+        block = district['blocks'][-1]
+        block['villages'].append([row['village'], row['schools']])
+        block['schools'] += row['schools']
+        district['schools'] += row['schools']
+        total += row['schools']
+    return {'total_schools': total, 'districts': districts}
+
+
+def location_tree():
+    """
+    ``(etag, blob, gzipped_blob)``: the location tree as a ready-to-send JSON
+    response body, plain and gzipped. The ETag is weak because it stands for
+    both encodings.
+    """
+    cached = cache.get(LOCATION_TREE_CACHE_KEY)
+    if cached is None:
+        blob = json.dumps(
+            {'success': True, 'data': build_location_tree()}, ensure_ascii=False, separators=(',', ':')
+        ).encode()
+        etag = 'W/' + quote_etag(hashlib.sha256(blob).hexdigest()[:32])
+        cached = (etag, blob, gzip.compress(blob, mtime=0))
+        cache.set(LOCATION_TREE_CACHE_KEY, cached, LOCATION_TREE_TTL)
+    return cached
+
+
+def invalidate_location_tree():
+    """Drop the cached tree once the current transaction commits, so it is not rebuilt from old data"""
+    transaction.on_commit(lambda: cache.delete(LOCATION_TREE_CACHE_KEY))
+
+
+def schools_at(district=None, block=None, village=None, search=None):
+    """
+    Active schools under a location node, as ``PUBLIC_SCHOOL_FIELDS`` dicts.
+
+    ``search`` matches the start of the school name (case-insensitive) or
+    of the school code.
+    """
+    schools = School.objects.filter(is_active=True)
+    for field, value in [('district', district), ('block', block), ('village', village)]:
+        if value:
+            schools = schools.filter(**{field: value})
+    if search:
+        schools = schools.filter(Q(school_name__istartswith=search) | Q(school_code__startswith=search))
+    return schools.order_by('district', 'block', 'school_name', 'id').values(*PUBLIC_SCHOOL_FIELDS)
@@ -1,6 +1,9 @@
-import csv
 import os
+import time
+from itertools import islice
+
 from django.core.management.base import BaseCommand, CommandError
+from schools.importer import IMPORT_CHUNK_SIZE, import_chunk, read_school_rows
 from schools.models import School
 
 
@@ -23,12 +26,25 @@ class Command(BaseCommand):
             action='store_true',
             help='Update existing schools if they already exist'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Import in chunks with bulk writes; admin accounts are left to provision_school_admins'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help='Rows per chunk with --bulk'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         
         if not os.path.exists(csv_file):
             raise CommandError(f'CSV file "{csv_file}" does not exist.')
+        if options['bulk']:
+            return self._bulk_import(csv_file, options)
         
         created_count = 0
         updated_count = 0
@@ -36,44 +52,18 @@ class Command(BaseCommand):
         
         try:
             with open(csv_file, 'r', encoding='utf-8') as file:
-                # Detect if file has headers
-                sample = file.read(1024)
-                file.seek(0)
-                has_header = csv.Sniffer().has_header(sample)
-                
-                reader = csv.reader(file)
-                
-                # Skip header if present
-                if has_header:
-                    next(reader)
-                
-                for row_num, row in enumerate(reader, start=1):
+                for row_num, values, error in read_school_rows(file):
                     try:
-                        # Expected format: District, Block, Village, School_Name, School_Code
-                        if len(row) < 5:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'Row {row_num}: Insufficient columns. Expected 5, got {len(row)}'
-                                )
-                            )
+                        if error:
+                            self.stdout.write(self.style.WARNING(f'Row {row_num}: {error}'))
                             error_count += 1
                             continue
                         
-                        district = row[0].strip()
-                        block = row[1].strip()
-                        village = row[2].strip()
-                        school_name = row[3].strip()
-                        school_code = row[4].strip()
-                        
-                        # Validate required fields
-                        if not all([district, block, village, school_name, school_code]):
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'Row {row_num}: Missing required fields'
-                                )
-                            )
-                            error_count += 1
-                            continue
+                        district = values['district']
+                        block = values['block']
+                        village = values['village']
+                        school_name = values['school_name']
+                        school_code = values['school_code']
                         
                         # Check if school already exists
                         school, created = School.objects.get_or_create(
@@ -144,4 +134,54 @@ class Command(BaseCommand):
                     f'\nAdmin accounts created for {created_count} new schools.'
                     f'\nCheck the admin panel for login credentials.'
                 )
-            )
\ No newline at end of file
+            )
+
+    def _bulk_import(self, csv_file, options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'activated': 0}
+        rows_read = 0
+        error_count = 0
+        started = time.perf_counter()
+        try:
+            with open(csv_file, 'r', encoding='utf-8') as file:
+                rows = read_school_rows(file)
+                while chunk := list(islice(rows, options['chunk_size'])):
+                    rows_read += len(chunk)
+                    valid = []
+                    for row_num, values, error in chunk:
+                        if error:
+                            self.stdout.write(self.style.WARNING(f'Row {row_num}: {error}'))
+                            error_count += 1
+                        else:
+                            valid.append(values)
+                    for key, count in import_chunk(valid, options['activate'], options['update']).items():
+                        totals[key] += count
+
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'  {rows_read} rows ({rows_read / elapsed:.0f} rows/s): '
+                        f'{totals["created"]} created, {totals["updated"]} updated, {error_count} errors'
+                    )
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f'Error reading CSV file: {str(e)}')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nImport completed in {elapsed:.1f}s ({rows_read / elapsed if elapsed else 0:.0f} rows/s):'
+                f'\n- Created: {totals["created"]} schools'
+                f'\n- Updated: {totals["updated"]} schools'
+                f'\n- Unchanged: {totals["unchanged"]} schools'
+                f'\n- Already existing, not updated: {totals["skipped"]} schools'
+                f'\n- Errors: {error_count} rows'
+            )
+        )
+        if totals['activated']:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'\n{totals["activated"]} schools were activated without admin accounts.'
+                    f'\nRun "manage.py provision_school_admins" to create them.'
+                )
+            )
@@ -0,0 +1,74 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from schools.provisioning import PROVISION_BATCH_SIZE, provision_admins, schools_missing_admin
+
+
+class Command(BaseCommand):
+    help = 'Create admin accounts for active schools that do not have one yet (resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PROVISION_BATCH_SIZE,
+                            help='Schools provisioned per transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Processes hashing passwords (0 or 1: hash in this process)')
+        parser.add_argument('--shard', type=str, help='INDEX/COUNT: only handle this share of the schools, '
+                                                      'to run COUNT workers side by side')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for newly activated schools')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 0:
+            raise CommandError('--batch-size must be positive and --workers not negative')
+        shard = None
+        if options['shard']:
+            try:
+                shard = tuple(int(part) for part in options['shard'].split('/'))
+            except ValueError:
+                shard = ()
+            if len(shard) != 2 or not 0 <= shard[0] < shard[1]:
+                raise CommandError('--shard must be INDEX/COUNT with 0 <= INDEX < COUNT, e.g. 0/4')
+
+        # Schools that hit a conflict are not retried within this run: with
+        # --loop they would otherwise have their passwords hashed on every poll
+        conflicted = set()
+        while True:
+            pending = schools_missing_admin(shard).exclude(id__in=conflicted).count()
+            if pending or not options['loop']:
+                conflicted |= self._provision(pending, shard, conflicted, options)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def _provision(self, pending, shard, conflicted, options):
+        """Provision the pending schools except ``conflicted``; returns the ids of new conflicts"""
+        self.stdout.write(f'{pending} active schools need an admin account')
+        started = time.perf_counter()
+
+        def report(totals):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'  {totals["schools"]}/{pending} schools ({totals["schools"] / elapsed:.1f}/s): '
+                f'{totals["created"]} created, {totals["relinked"]} taken over, {totals["conflicts"]} conflicts'
+            )
+
+        totals = provision_admins(
+            batch_size=options['batch_size'], shard=shard, workers=options['workers'], skip_ids=conflicted,
+            on_batch=report
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nAdmin provisioning completed in {elapsed:.1f}s:'
+                f'\n- Created: {totals["created"]} admin accounts'
+                f'\n- Taken over: {totals["relinked"]} existing users'
+                f'\n- Conflicts: {totals["conflicts"]} schools (admin username or email used by another school)'
+            )
+        )
+        if totals['conflicts']:
+            self.stdout.write(self.style.WARNING(
+                'Schools with conflicts stay queued and are skipped until the next run; '
+                'see the log for the users involved.'
+            ))
+        return totals['conflicted_schools']
@@ -1,7 +1,5 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 
 
 class School(models.Model):
@@ -63,68 +61,6 @@ class School(models.Model):
         return f"{self.village}, {self.block}, {self.district}"
 
 
-@receiver(post_save, sender=School)
-def handle_school_activation_deactivation(sender, instance, created, **kwargs):
-    """
-    Signal handler to manage school activation/deactivation
-    - Creates admin user when school is activated
-    - Disables all users when school is deactivated
-    """
-    if instance.is_active:
-        # School is active - create admin and enable users
-        create_admin_for_school(instance)
-        enable_school_users(instance)
-    else:
-        # School is inactive - disable all users
-        disable_school_users(instance)
-
-
-def create_admin_for_school(school):
-    """Create admin user for a school (idempotent - safe to call multiple times)"""
-    from django.utils import timezone
-    User = get_user_model()
-    
-    username = school.get_admin_username()
-    password = school.get_admin_password()
-    admin_email = school.get_admin_email()
-    
-    # Check if admin already exists
-    existing_admin = User.objects.filter(username=username).first()
-    if existing_admin:
-        # Ensure existing admin is properly linked to school and active
-        if existing_admin.school != school:
-            existing_admin.school = school
-        if not existing_admin.is_active:
-            existing_admin.is_active = True
-        # Update email to new format
-        if existing_admin.email != admin_email:
-            existing_admin.email = admin_email
-        # Update password to new format
-        existing_admin.set_password(password)
-        existing_admin.save()  # Save all changes including password
-        print(f"Admin user updated for {school.school_name}: {username}/{password} - {admin_email}")
-        return existing_admin
-    
-    # Create new admin user with new email format
-    admin_user = User.objects.create_user(
-        username=username,
-        password=password,
-        email=admin_email,
-        first_name="School",
-        last_name="Administrator", 
-        role="admin",
-        school=school
-    )
-    
-    # Update school activation timestamp if not set
-    if not school.activated_at:
-        school.activated_at = timezone.now()
-        school.save(update_fields=['activated_at'])
-    
-    print(f"Created admin user for {school.school_name}: {username}/{password} - {admin_email}")
-    return admin_user
-
-
 def enable_school_users(school):
     """Enable all users belonging to a school"""
     User = get_user_model()
@@ -0,0 +1,192 @@
+"""
+Admin account provisioning for active schools.
+
+Every active school gets an admin account (username, password and email
+derived from its school code, see ``School.get_admin_username`` and
+friends). Password hashing is deliberately slow, so accounts are not
+created inside ``School.save()``.
+
+The queue is implicit: an active school without an admin user is waiting
+for its account. Activating a single school provisions it right after the
+transaction commits (see ``schools.signals``); bulk activations (the admin
+action, ``import_schools``) leave the schools queued for
+``provision_school_admins``. Because the queue is the database state
+itself, an interrupted run simply resumes with the schools still missing
+an admin.
+
+Schools are provisioned in batches of ascending id. The passwords of a
+batch are hashed in a process pool, then the batch's existing users are
+read in one query and the new admins are inserted with ``bulk_create``, in
+one transaction. ``shard=(index, count)`` splits the schools by id modulo
+``count``, so several workers can run side by side.
+
+A school whose admin username or email belongs to another school's user
+cannot be provisioned and stays queued. ``provision_admins`` reports such
+conflicts so a long-running caller can skip them instead of hashing their
+passwords again on every poll.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from .models import School
+
+logger = logging.getLogger(__name__)
+
+PROVISION_BATCH_SIZE = 200
+
+
+def schools_missing_admin(shard=None):
+    """Active schools that have no admin user yet"""
+    has_admin = Exists(get_user_model().objects.filter(school=OuterRef('pk'), role='admin'))
+    schools = School.objects.filter(is_active=True).exclude(has_admin)
+    if shard is not None:
+        index, count = shard
+        schools = schools.alias(shard=Mod('id', count)).filter(shard=index)
+    return schools
+
+
+def create_admin_accounts(schools, password_hashes):
+    """
+    Create the admin users of ``schools``, given their already hashed passwords.
+
+    An existing user with a school's admin username is taken over (linked
+    to the school, reactivated, given the derived email and password) unless
+    it is the admin of another active school: school codes ending in the
+    same five digits share an admin username, and the first school keeps it.
+    Such schools are logged and counted as conflicts. Returns a dict of
+    counts, with the ids of the conflicting schools under
+    ``conflicted_schools``.
+    """
+    User = get_user_model()
+    stats = {'created': 0, 'relinked': 0}
+    conflicted = []
+    accounts = {}
+    for school, password_hash in zip(schools, password_hashes):
+        username = school.get_admin_username()
+        if username in accounts:
+            conflicted.append(school.id)
+            logger.warning('School %s shares admin username %s with another school', school.school_code, username)
+            continue
+        accounts[username] = (school, password_hash)
+
+    with transaction.atomic():
+        existing = list(User.objects.select_for_update().select_related('school').filter(
+            Q(username__in=list(accounts)) | Q(email__in=[school.get_admin_email() for school, _ in accounts.values()])
+        ))
+        by_username = {user.username: user for user in existing}
+        taken_emails = {user.email: user.username for user in existing}
+
+        to_create = []
+        to_relink = []
+        for username, (school, password_hash) in accounts.items():
+            user = by_username.get(username)
+            email = school.get_admin_email()
+            if taken_emails.get(email, username) != username:
+                pass  # The email belongs to a user with another username
+            elif user is None:
+                to_create.append(User(
+                    username=username,
+                    password=password_hash,
+                    email=email,
+                    first_name='School',
+                    last_name='Administrator',
+                    role='admin',
+                    school=school
+                ))
+                continue
+            elif user.school is None or user.school_id == school.id or not user.school.is_active:
+                user.school = school
+                user.role = 'admin'
+                user.is_active = True
+                user.email = email
+                user.password = password_hash
+                to_relink.append(user)
+                continue
+            conflicted.append(school.id)
+            logger.warning('Admin username %s or email %s of school %s belongs to another user',
+                           username, email, school.school_code)
+
+        User.objects.bulk_create(to_create)
+        User.objects.bulk_update(to_relink, ['school', 'role', 'is_active', 'email', 'password'])
+        provisioned_ids = [user.school_id for user in to_create + to_relink]
+        School.objects.filter(id__in=provisioned_ids, activated_at__isnull=True).update(activated_at=timezone.now())
+
+    stats['created'] = len(to_create)
+    stats['relinked'] = len(to_relink)
+    stats['conflicts'] = len(conflicted)
+    stats['conflicted_schools'] = conflicted
+    return stats
+
+
+def provision_admins(batch_size=PROVISION_BATCH_SIZE, shard=None, workers=None, school_ids=None, skip_ids=None,
+                     on_batch=None):
+    """
+    Create the admin accounts of active schools that lack one.
+
+    ``workers`` is the size of the hashing process pool (default: one per
+    CPU; 0 or 1 hashes in this process). ``school_ids`` restricts the run
+    to those schools and ``skip_ids`` leaves those out (known conflicts).
+    ``on_batch(stats)`` is called after each committed batch with the
+    running totals. Returns the totals: created, relinked, conflicts and
+    schools (handled), and the set of ``conflicted_schools`` ids.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    pending = schools_missing_admin(shard).order_by('id').only('id', 'school_code', 'activated_at')
+    if school_ids is not None:
+        pending = pending.filter(id__in=school_ids)
+    if skip_ids:
+        pending = pending.exclude(id__in=skip_ids)
+
+    totals = {'created': 0, 'relinked': 0, 'conflicts': 0, 'schools': 0}
+    conflicted = set()
+    last_id = 0
+    pool = None
+    if workers > 1:
+        # spawn, not fork: workers must not inherit the parent's database connections
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+        )
+    with pool or nullcontext():
+        while True:
+            batch = list(pending.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            passwords = [school.get_admin_password() for school in batch]
+            if pool is not None:
+                hashes = list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // workers)))
+            else:
+                hashes = [make_password(password) for password in passwords]
+
+            stats = create_admin_accounts(batch, hashes)
+            conflicted.update(stats.pop('conflicted_schools'))
+            for key, count in stats.items():
+                totals[key] += count
+            totals['schools'] += len(batch)
+            last_id = batch[-1].id
+            if on_batch is not None:
+                on_batch(totals)
+    totals['conflicted_schools'] = conflicted
+    return totals
+
+
+def provision_school_admin_on_commit(school):
+    """Provision one newly activated school once the current transaction commits"""
+    def provision():
+        try:
+            provision_admins(workers=0, school_ids=[school.id])
+        except Exception:
+            # The school stays queued for provision_school_admins
+            logger.exception('Provisioning the admin of school %s failed', school.school_code)
+
+    transaction.on_commit(provision)
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .locations import invalidate_location_tree
+from .models import School, disable_school_users, enable_school_users
+from .provisioning import provision_school_admin_on_commit
+
+
+@receiver(pre_save, sender=School)
+def remember_activation_state(sender, instance, update_fields=None, **kwargs):
+    """Remember whether the school was active before this save, so only real transitions are acted on"""
+    if update_fields is not None and 'is_active' not in update_fields:
+        instance._was_active = instance.is_active
+    elif instance.pk:
+        instance._was_active = School.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+    else:
+        instance._was_active = None
+
+
+@receiver(post_save, sender=School)
+def handle_school_activation_deactivation(sender, instance, created, **kwargs):
+    """
+    Signal handler to manage school activation/deactivation
+    - Enables the school's users and provisions its admin when the school becomes active
+    - Disables all users when the school is deactivated
+    Saves that do not change ``is_active`` do nothing.
+    """
+    was_active = getattr(instance, '_was_active', None)
+    if instance.is_active and not was_active:
+        enable_school_users(instance)
+        provision_school_admin_on_commit(instance)
+    elif was_active and not instance.is_active:
+        disable_school_users(instance)
+
+
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+def drop_location_tree(sender, **kwargs):
+    """Any change to a school may change the cached location tree"""
+    invalidate_location_tree()
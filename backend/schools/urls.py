@@ -7,7 +7,9 @@ router.register(r'list', views.SchoolViewSet)
 
 urlpatterns = [
     path('public/', views.PublicSchoolListAPIView.as_view(), name='public-schools'),
+    path('locations/', views.LocationTreeAPIView.as_view(), name='school-locations'),
     path('stats/', views.SchoolStatsAPIView.as_view(), name='school-stats'),
     path('dashboard/', views.SchoolDashboardAPIView.as_view(), name='school-dashboard'),
+    path('dashboard/<str:section>/', views.SchoolDashboardAPIView.as_view(), name='school-dashboard-section'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
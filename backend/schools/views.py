@@ -1,13 +1,21 @@
 from django.shortcuts import render
 from django.db.models import Count, Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
+from .dashboard import DASHBOARD_SECTIONS, dashboard_summary, section_entry, section_rows
+from .locations import location_tree, schools_at
 from .models import School
 from users.models import User, StudentProfile, StaffProfile
+from utils.api_responses import StandardPagination
+from utils.query_metrics import query_budget
 
 User = get_user_model()
 
@@ -22,22 +30,68 @@ class SchoolViewSet(viewsets.ReadOnlyModelViewSet):
         return SchoolSerializer
 
 
+@query_budget(4)
 class PublicSchoolListAPIView(APIView):
     """Public API view to get list of active schools for admission forms"""
     permission_classes = [AllowAny]
     
     def get(self, request):
-        """Get list of active schools for public admission forms"""
-        schools = School.objects.filter(is_active=True).values(
-            'id', 'school_name', 'school_code', 'district', 'block', 'village'
-        ).order_by('district', 'block', 'school_name')
+        """
+        Get active schools for public admission forms.
+        
+        ``district``, ``block`` and ``village`` restrict the list to a node of
+        the location tree (see ``LocationTreeAPIView``); ``search`` matches the
+        start of the school name or code. The list is served a page at a time
+        (``?page=``, ``?page_size=``): the admission form picks a district and
+        block from the tree and then pages or searches within them.
+        """
+        schools = schools_at(
+            district=request.query_params.get('district'),
+            block=request.query_params.get('block'),
+            village=request.query_params.get('village'),
+            search=request.query_params.get('search', '').strip()
+        )
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(schools, request, view=self)
         
         return Response({
             'success': True,
-            'data': list(schools)
+            'data': page,
+            'pagination': {
+                'count': paginator.page.paginator.count,
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
+                'page_size': paginator.get_page_size(request),
+                'total_pages': paginator.page.paginator.num_pages,
+                'current_page': paginator.page.number
+            }
         })
 
 
+@query_budget(2)
+class LocationTreeAPIView(APIView):
+    """Public district/block/village tree of active schools with school counts"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """
+        Serve the precomputed tree. Clients revalidate with ``If-None-Match``
+        and get a 304 while the tree is unchanged.
+        """
+        etag, blob, gzipped = location_tree()
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(gzipped, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(blob, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
 class SchoolStatsAPIView(APIView):
     """API view to get school statistics for the logged-in admin"""
     permission_classes = [IsAuthenticated]
@@ -104,11 +158,19 @@ class SchoolStatsAPIView(APIView):
         return Response(stats)
 
 
+@query_budget(5)
 class SchoolDashboardAPIView(APIView):
-    """API view to get comprehensive school dashboard data"""
+    """API view to get school dashboard data, as a summary or one section at a time"""
     permission_classes = [IsAuthenticated]
     
-    def get(self, request):
+    def get(self, request, section=None):
+        """
+        Without a section: the school's details and counts for every section,
+        for the first paint. With a section (``students``, ``teachers``,
+        ``staff`` or ``users``): one page of that section (``?page=``,
+        ``?page_size=``), optionally narrowed with ``?search=`` (name, email
+        or admission number prefix) and, for users, ``?role=``.
+        """
         user = request.user
         
         # Get the school for this admin user
@@ -125,85 +187,37 @@ class SchoolDashboardAPIView(APIView):
                 'error': 'User has no school assigned.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get all students for this school
-        students = StudentProfile.objects.filter(school=school, is_active=True).select_related('user')
-        students_data = []
-        for student in students:
-            students_data.append({
-                'id': student.id,
-                'admission_number': student.admission_number,
-                'user': {
-                    'first_name': student.user.first_name if student.user else student.first_name,
-                    'last_name': student.user.last_name if student.user else student.last_name,
-                    'email': student.user.email if student.user else f"student.{student.admission_number}@{student.school.school_code[-5:]}.rj",
-                } if student.user or (student.first_name and student.last_name) else None,
-                'course': student.course,
-                'batch': getattr(student, 'batch', student.semester),
-                'status': 'active' if student.is_active else 'inactive'
-            })
+        if section is None:
+            summary = dashboard_summary(school)
+            summary['sections'] = {
+                name: reverse('school-dashboard-section', kwargs={'section': name}, request=request)
+                for name in DASHBOARD_SECTIONS
+            }
+            return Response({'success': True, 'data': summary})
         
-        # Get all teachers (faculty) for this school
-        teachers = User.objects.filter(school=school, role='faculty', is_active=True)
-        teachers_data = []
-        for teacher in teachers:
-            # Try to get staff profile if it exists
-            staff_profile = getattr(teacher, 'staff_profile', None)
-            teachers_data.append({
-                'id': teacher.id,
-                'user': {
-                    'first_name': teacher.first_name,
-                    'last_name': teacher.last_name,
-                    'email': teacher.email,
-                },
-                'role': teacher.role,
-                'department': staff_profile.department if staff_profile else 'Not specified',
-                'designation': staff_profile.designation if staff_profile else 'Faculty',
-                'experience_years': getattr(staff_profile, 'experience_years', 0) if staff_profile else 0,
-                'status': 'active' if teacher.is_active else 'inactive'
-            })
-
-        # Get all staff (admin, faculty, librarian) for this school
-        staff_users = User.objects.filter(school=school, role__in=['admin', 'faculty', 'librarian'], is_active=True)
-        staff_data = []
-        for staff_user in staff_users:
-            # Try to get staff profile if it exists
-            staff_profile = getattr(staff_user, 'staff_profile', None)
-            staff_data.append({
-                'id': staff_user.id,
-                'user': {
-                    'first_name': staff_user.first_name,
-                    'last_name': staff_user.last_name,
-                    'email': staff_user.email,
-                },
-                'role': staff_user.role,
-                'department': staff_profile.department if staff_profile else 'Not specified',
-                'designation': staff_profile.designation if staff_profile else staff_user.role.capitalize(),
-                'experience_years': getattr(staff_profile, 'experience_years', 0) if staff_profile else 0,
-                'status': 'active' if staff_user.is_active else 'inactive'
-            })
-
-        # Get all users for this school
-        users = User.objects.filter(school=school, is_active=True)
-        users_data = []
-        for user_obj in users:
-            users_data.append({
-                'id': user_obj.id,
-                'first_name': user_obj.first_name,
-                'last_name': user_obj.last_name,
-                'email': user_obj.email,
-                'role': user_obj.role,
-                'is_active': user_obj.is_active,
-                'created_at': user_obj.date_joined.isoformat() if user_obj.date_joined else None,
-            })
+        if section not in DASHBOARD_SECTIONS:
+            return Response({
+                'error': f"Unknown dashboard section '{section}'. Choose from: {', '.join(DASHBOARD_SECTIONS)}"
+            }, status=status.HTTP_404_NOT_FOUND)
         
-        dashboard_data = {
-            'students': students_data,
-            'teachers': teachers_data,
-            'staff': staff_data,
-            'users': users_data,
-            'fees': [],  # Will be populated when fees app is connected
-            'attendance': [],  # Will be populated when attendance is connected
-            'exams': [],  # Will be populated when exams are connected
-        }
+        rows = section_rows(
+            school, section,
+            search=request.query_params.get('search', '').strip(),
+            role=request.query_params.get('role')
+        )
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
         
-        return Response(dashboard_data)
+        return Response({
+            'success': True,
+            'section': section,
+            'data': [section_entry(section, row, school) for row in page],
+            'pagination': {
+                'count': paginator.page.paginator.count,
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
+                'page_size': paginator.get_page_size(request),
+                'total_pages': paginator.page.paginator.num_pages,
+                'current_page': paginator.page.number
+            }
+        })
@@ -788,8 +788,8 @@ def parent_student_attendance(request):
     
     try:
         from datetime import date, timedelta
-        from attendance.models import AttendanceRecord, ClassSession
-        from django.db.models import Count, Q
+        from attendance.models import AttendanceRecord
+        from attendance.summaries import student_attendance_summary
         
         student = parent.student
         
@@ -797,59 +797,39 @@ def parent_student_attendance(request):
         days = int(request.GET.get('days', 30))
         start_date = date.today() - timedelta(days=days)
         
+        # Statistics come from the daily rollup instead of counting records
+        summary = student_attendance_summary(student, date_from=start_date)
+        
         # Get attendance records
         attendance_records = AttendanceRecord.objects.filter(
             student=student,
             session__date__gte=start_date
-        ).select_related('session').order_by('-session__date')
-        
-        # Calculate statistics
-        total_classes = attendance_records.count()
-        present_count = attendance_records.filter(status='present').count()
-        absent_count = attendance_records.filter(status='absent').count()
-        late_count = attendance_records.filter(status='late').count()
-        
-        attendance_percentage = (present_count / total_classes * 100) if total_classes > 0 else 0
-        
-        # Group by subject for subject-wise attendance
-        subject_attendance = {}
-        for record in attendance_records:
-            subject = record.class_session.subject if record.class_session else 'Unknown'
-            if subject not in subject_attendance:
-                subject_attendance[subject] = {'total': 0, 'present': 0}
-            subject_attendance[subject]['total'] += 1
-            if record.status == 'present':
-                subject_attendance[subject]['present'] += 1
-        
-        # Calculate subject-wise percentages
-        for subject in subject_attendance:
-            data = subject_attendance[subject]
-            data['percentage'] = (data['present'] / data['total'] * 100) if data['total'] > 0 else 0
+        ).select_related('session').order_by('-session__date', '-session__start_time')
         
         return Response({
             'summary': {
-                'total_classes': total_classes,
-                'present': present_count,
-                'absent': absent_count,
-                'late': late_count,
-                'attendance_percentage': round(attendance_percentage, 2),
+                'total_classes': summary['total'],
+                'present': summary['present'],
+                'absent': summary['absent'],
+                'late': summary['late'],
+                'attendance_percentage': summary['percentage'],
                 'period_days': days
             },
             'subject_wise': [
                 {
-                    'subject': subject,
-                    'total_classes': data['total'],
-                    'present_classes': data['present'],
-                    'percentage': round(data['percentage'], 2)
-                } for subject, data in subject_attendance.items()
+                    'subject': row['subject'],
+                    'total_classes': row['total'],
+                    'present_classes': row['present'],
+                    'percentage': row['percentage']
+                } for row in summary['subjects']
             ],
             'records': [
                 {
-                    'date': record.date,
-                    'subject': record.class_session.subject if record.class_session else 'Unknown',
+                    'date': record.session.date,
+                    'subject': record.session.subject,
                     'status': record.status,
-                    'time_in': record.time_in,
-                    'time_out': record.time_out,
+                    'time_in': record.session.start_time,
+                    'time_out': record.session.end_time,
                     'remarks': record.remarks
                 } for record in attendance_records
             ]
@@ -881,9 +861,10 @@ def parent_student_results(request):
         student = parent.student
         
         # Get exam results
+        # Class rank and percentile come precomputed from the rank table in the same join
         exam_results = ExamResult.objects.filter(
             student=student
-        ).select_related('exam').order_by('-exam__date')
+        ).select_related('exam', 'rank').order_by('-exam__date')
         
         # Group by exam
         exams_data = {}
@@ -900,15 +881,19 @@ def parent_student_results(request):
                     'overall_grade': 'N/A'
                 }
             
+            rank = getattr(result, 'rank', None)
             exams_data[exam_name]['subjects'].append({
-                'subject': result.subject,
+                'subject': result.exam.subject,
                 'marks_obtained': result.marks_obtained,
-                'total_marks': result.total_marks,
-                'percentage': result.percentage,
-                'grade': result.grade
+                'total_marks': result.exam.max_marks,
+                'percentage': round(result.marks_obtained / result.exam.max_marks * 100, 2) if result.exam.max_marks else 0,
+                'grade': result.grade,
+                'class_rank': rank.rank if rank else None,
+                'class_percentile': rank.percentile if rank else None,
+                'cohort_size': rank.cohort_size if rank else None
             })
             
-            exams_data[exam_name]['total_marks'] += result.total_marks
+            exams_data[exam_name]['total_marks'] += result.exam.max_marks
             exams_data[exam_name]['obtained_marks'] += result.marks_obtained
         
         # Calculate overall percentages
@@ -938,7 +923,9 @@ def parent_student_results(request):
         # Calculate semester/overall performance
         all_results = list(exam_results)
         if all_results:
-            avg_percentage = sum(result.percentage for result in all_results) / len(all_results)
+            avg_percentage = sum(
+                result.marks_obtained / result.exam.max_marks * 100 for result in all_results if result.exam.max_marks
+            ) / len(all_results)
         else:
             avg_percentage = 0
         
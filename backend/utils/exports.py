@@ -0,0 +1,269 @@
+"""
+Streaming CSV/XLSX exports for list endpoints.
+
+Add ``ExportMixin`` to a ViewSet and declare the columns to export::
+
+    class FeeInvoiceViewSet(ExportMixin, viewsets.ModelViewSet):
+        export_filename = 'fee_invoices'
+        export_fields = [
+            ('invoice_number', 'Invoice Number'),
+            ('student__admission_number', 'Admission Number'),
+        ]
+
+This adds ``GET <list-url>/export/?file_format=csv|xlsx``. The export uses the
+same queryset (and therefore the same permission scoping and filters) as the
+list endpoint, but rows are read with ``values_list(...).iterator()`` and
+written to the response as they arrive, so memory stays flat no matter how
+many rows are exported and no model instances or serializers are created.
+
+``file_format`` is used instead of ``format`` because DRF reserves the
+``format`` query parameter for content negotiation.
+
+``stream_zip`` streams files from disk as a ZIP download in the same way.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+EXPORT_CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Characters that are not allowed in XML 1.0 documents
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def format_value(value):
+    """Convert a database value to the text written to an export cell"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    return str(value)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, so csv.writer output can be yielded"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """Yield CSV text for ``header`` and ``rows``, a few hundred rows per chunk"""
+    writer = csv.writer(_Echo())
+    # UTF-8 BOM so spreadsheet applications detect the encoding
+    yield '\ufeff' + writer.writerow(header)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([format_value(value) for value in row]))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+class _ZipSink:
+    """Unseekable output for ``zipfile`` that collects written bytes until they are drained"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref, value):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', format_value(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number, columns, values):
+    cells = ''.join(_xlsx_cell(f'{column}{number}', value) for column, value in zip(columns, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def stream_xlsx(header, rows, sheet_name='Export'):
+    """
+    Yield the bytes of a single-sheet XLSX workbook for ``header`` and ``rows``.
+
+    The workbook is written straight into a ZIP stream with inline strings, so
+    no shared-string table or temporary file is needed and nothing but the
+    current batch of rows is held in memory.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+        workbook.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        yield sink.drain()
+
+        columns = [_column_letter(index) for index in range(len(header))]
+        with workbook.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(1, columns, header)
+            ).encode('utf-8'))
+
+            buffer = []
+            for number, row in enumerate(rows, start=2):
+                buffer.append(_xlsx_row(number, columns, row))
+                if len(buffer) >= ROWS_PER_WRITE:
+                    sheet.write(''.join(buffer).encode('utf-8'))
+                    buffer = []
+                    yield sink.drain()
+            if buffer:
+                sheet.write(''.join(buffer).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+        yield sink.drain()
+    yield sink.drain()
+
+
+def stream_zip(files, compression=zipfile.ZIP_DEFLATED, read_size=64 * 1024):
+    """
+    Yield the bytes of a ZIP archive of ``files``, ``(archive name, path on disk)`` pairs.
+
+    Each file is copied into the archive in ``read_size`` pieces, so memory
+    stays flat however many files the archive holds.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode='w', compression=compression) as archive:
+        for name, path in files:
+            with open(path, 'rb') as source, archive.open(name, mode='w', force_zip64=True) as target:
+                while True:
+                    data = source.read(read_size)
+                    if not data:
+                        break
+                    target.write(data)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, CSV_CONTENT_TYPE),
+    'xlsx': (stream_xlsx, XLSX_CONTENT_TYPE),
+}
+
+
+def streaming_export_response(header, rows, filename, file_format='csv'):
+    """Build a ``StreamingHttpResponse`` that downloads ``rows`` as ``filename.<file_format>``"""
+    generator, content_type = EXPORT_FORMATS[file_format]
+    response = StreamingHttpResponse(generator(header, rows), content_type=content_type)
+    stamp = timezone.localtime().strftime('%Y%m%d')
+    response['Content-Disposition'] = f'attachment; filename="{filename}_{stamp}.{file_format}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+class ExportMixin:
+    """
+    Adds an ``export`` list action that streams the ViewSet's queryset as CSV or XLSX.
+
+    ViewSets declare ``export_fields`` as ``(lookup, header)`` pairs, where
+    ``lookup`` is any path accepted by ``values_list``. Override
+    ``get_export_queryset`` to apply action-specific filters.
+    """
+    export_fields = []
+    export_filename = 'export'
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    def get_export_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the filtered list as a CSV or XLSX download"""
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"Unsupported file_format '{file_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not self.export_fields:
+            return Response({'error': 'Export is not configured for this resource'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        lookups = [lookup for lookup, _ in self.export_fields]
+        header = [label for _, label in self.export_fields]
+        # Only the exported columns are selected, so joins and prefetches set up for serializers are dropped
+        rows = self.get_export_queryset().select_related(None).prefetch_related(None).values_list(
+            *lookups
+        ).iterator(chunk_size=self.export_chunk_size)
+        return streaming_export_response(header, rows, self.export_filename, file_format)
@@ -0,0 +1,265 @@
+"""
+Keyset (cursor) pagination for high-volume list endpoints.
+
+Page-number pagination answers ``?page=5000`` with ``OFFSET 99980`` and a
+``COUNT(*)`` over the whole result set on every request, so deep pages get
+slower the further a client scrolls. ``KeysetPagination`` instead remembers
+the ordering values of the last row it returned and asks for the rows that
+sort after them::
+
+    WHERE (created_at < %s) OR (created_at = %s AND id < %s)
+    ORDER BY created_at DESC, id DESC
+    LIMIT 21
+
+With a composite index on the ordering columns every page is the same index
+range scan, whatever its depth.
+
+The ordering comes from the view: the ``OrderingFilter`` choice if the view
+uses one, otherwise ``view.ordering``, otherwise the queryset's own
+``order_by``. The primary key is appended as a tie-breaker so the order is
+total. Ordering fields must not be nullable.
+
+Responses keep the page-number shape (``count``, ``next``, ``previous``,
+``results``) so existing clients keep working:
+
+- ``?count=false`` skips the ``COUNT(*)`` query and returns ``count: null``.
+- ``?page=N`` without a cursor still works and falls back to page-number
+  pagination for clients that jump to arbitrary pages.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def _encode_value(value):
+    # Full precision on purpose: DjangoJSONEncoder truncates microseconds, which breaks equality on the boundary row
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on the view's ordering with a primary-key tie-breaker"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    include_count = True
+    fallback_class = PageNumberPagination
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(request, queryset, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.fallback = None
+        if self.cursor_query_param not in request.query_params and 'page' in request.query_params:
+            self.fallback = self.fallback_class()
+            self.fallback.page_size = self.get_page_size(request)
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count() if self.wants_count(request) else None
+        values, reverse = self.decode_cursor(request)
+
+        fields = [name.lstrip('-') for name in self.ordering]
+        descending = [name.startswith('-') for name in self.ordering]
+        self.keys = [f'_keyset_{index}' for index in range(len(fields))]
+        queryset = queryset.annotate(**{key: F(field) for key, field in zip(self.keys, fields)})
+
+        if values is not None:
+            values = self.cursor_values(queryset, values)
+            queryset = queryset.filter(self.seek_filter(fields, descending, values, reverse))
+        if reverse:
+            queryset = queryset.reverse()
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = rows
+        return rows
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = ordering or getattr(view, 'ordering', None) or queryset.query.order_by
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        ordering = list(ordering)
+        if not ordering or not all(isinstance(name, str) for name in ordering):
+            raise ImproperlyConfigured(
+                f'{self.__class__.__name__} needs the view or queryset to be ordered by field names.'
+            )
+        if not any(name.lstrip('-') in ('pk', 'id') for name in ordering):
+            ordering.append('-pk' if ordering[-1].startswith('-') else 'pk')
+        return ordering
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def wants_count(self, request):
+        value = request.query_params.get(self.count_query_param)
+        if value is None:
+            return self.include_count
+        return value.lower() not in FALSE_VALUES
+
+    @staticmethod
+    def seek_filter(fields, descending, values, reverse=False):
+        """
+        Rows strictly after ``values`` in the given ordering (before them when ``reverse``).
+
+        Expands the row comparison ``(a, b, c) < (x, y, z)`` into
+        ``a < x OR (a = x AND b < y) OR (a = x AND b = y AND c < z)`` so it works
+        with mixed sort directions on every database backend. The redundant
+        ``a <= x`` in front gives the planner a range on the leading index column;
+        without it SQLite and MySQL scan the whole index and filter the OR.
+        """
+        condition = Q()
+        for index, (field, desc) in enumerate(zip(fields, descending)):
+            lookup = 'lt' if desc != reverse else 'gt'
+            term = Q(**{f'{field}__{lookup}': values[index]})
+            for previous_field, previous_value in zip(fields[:index], values[:index]):
+                term &= Q(**{previous_field: previous_value})
+            condition |= term
+        if len(fields) > 1:
+            lookup = 'lte' if descending[0] != reverse else 'gte'
+            condition = Q(**{f'{fields[0]}__{lookup}': values[0]}) & condition
+        return condition
+
+    @staticmethod
+    def make_cursor(ordering, values, reverse=False):
+        """Opaque cursor pointing just after (before, if ``reverse``) the row with these ordering values"""
+        payload = {'o': list(ordering), 'v': list(values)}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, default=_encode_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def encode_cursor(self, row, reverse):
+        cursor = self.make_cursor(self.ordering, [getattr(row, key) for key in self.keys], reverse)
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            payload = json.loads(raw.decode('utf-8'))
+            values = payload['v']
+            reverse = bool(payload.get('r'))
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor is only valid for the ordering it was issued for
+        if payload.get('o') != self.ordering or not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def cursor_values(self, queryset, values):
+        """
+        Convert decoded cursor values to the types of their ordering fields.
+
+        A tampered or stale cursor would otherwise fail inside the seek filter
+        with a server error; it gets the same 404 as any other invalid cursor.
+        """
+        try:
+            return [
+                queryset.query.annotations[key].output_field.to_python(value)
+                for key, value in zip(self.keys, values)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True, 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to false to skip the total count.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -0,0 +1,272 @@
+"""
+Per-request database query metrics and query budgets.
+
+``QueryMetricsMiddleware`` is a no-op unless ``settings.QUERY_METRICS_ENABLED``
+is true. When enabled it wraps every database call of the request with
+``connection.execute_wrapper`` and records:
+
+- the number of queries and the total time spent in the database,
+- duplicates: queries run again with exactly the same SQL and parameters,
+- repeated fingerprints: the same SQL with different parameters, the
+  signature of an N+1 loop (``IN (...)`` lists of any length count as one),
+- the wall time of the view.
+
+Each response carries them in a ``Server-Timing`` header, which browser
+dev tools show next to the request::
+
+    Server-Timing: db;dur=12.4;desc="31 queries, 2 duplicates", view;dur=48.0
+
+and every request is added to an in-memory window of the last
+``QUERY_METRICS_WINDOW`` requests per route. ``QueryStatsAPIView`` serves
+p50/p95 figures per route from it (superusers only). The window is per
+process.
+
+Streamed responses (the CSV/XLSX exports) run most of their queries while
+the body is sent, after the view has returned. Their recording continues
+until the body is exhausted and they are then added to the window and
+checked against their budget; their ``Server-Timing`` header, sent before
+the body, carries no counts.
+
+Views declare how many queries they may run with ``query_budget``::
+
+    @query_budget(6)
+    class SchoolDashboardAPIView(APIView): ...
+
+    @query_budget(4)
+    @action(detail=False, methods=['get'])
+    def all_payments(self, request): ...
+
+A request over its budget is logged, or raises ``QueryBudgetExceeded``
+when ``QUERY_BUDGET_ACTION`` is ``'raise'``, which makes the test that
+sent it fail.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+TOP_FINGERPRINTS = 5
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries than its declared budget"""
+
+
+def query_budget(max_queries):
+    """Declare the most queries a view class, view function or view method may run per request"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def budget_for(view_func, method):
+    """The budget declared for the handler of ``method`` on a view, or None"""
+    budget = getattr(view_func, 'query_budget', None)
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if budget is None and view_class is not None:
+        actions = getattr(view_func, 'actions', None)
+        handler_name = actions.get(method.lower()) if actions else method.lower()
+        handler = getattr(view_class, handler_name or '', None)
+        budget = getattr(handler, 'query_budget', None)
+        if budget is None:
+            budget = getattr(view_class, 'query_budget', None)
+    return budget
+
+
+def fingerprint(sql):
+    return IN_LIST.sub('(%s...)', sql)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that times and remembers every query of a request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.calls = Counter()
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.calls[(sql, repr(params))] += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.calls.values())
+
+    def repeated(self):
+        """Fingerprints run more than once, most frequent first"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common(TOP_FINGERPRINTS) if count > 1]
+
+
+class RouteStats:
+    """Rolling window of request metrics per route, shared by the threads of a process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = defaultdict(lambda: deque(maxlen=settings.QUERY_METRICS_WINDOW))
+            self.requests = Counter()
+            self.over_budget = Counter()
+            self.budgets = {}
+            self.repeated = defaultdict(Counter)
+
+    def record(self, route, wall, recorder, budget):
+        with self.lock:
+            self.samples[route].append((wall * 1000, recorder.duration * 1000, recorder.count, recorder.duplicates))
+            self.requests[route] += 1
+            self.budgets[route] = budget
+            if budget is not None and recorder.count > budget:
+                self.over_budget[route] += 1
+            for sql, count in recorder.repeated():
+                # Keep the worst repetition seen per fingerprint
+                self.repeated[route][sql] = max(self.repeated[route][sql], count)
+
+    def summary(self):
+        with self.lock:
+            routes = {route: np.array(samples) for route, samples in self.samples.items() if samples}
+            requests = dict(self.requests)
+            over_budget = dict(self.over_budget)
+            budgets = dict(self.budgets)
+            repeated = {route: counter.most_common(TOP_FINGERPRINTS) for route, counter in self.repeated.items()}
+
+        summary = []
+        for route, samples in routes.items():
+            p50, p95 = np.percentile(samples, [50, 95], axis=0)
+            summary.append({
+                'route': route,
+                'requests': requests[route],
+                'samples': len(samples),
+                'wall_ms': {'p50': round(p50[0], 1), 'p95': round(p95[0], 1), 'max': round(samples[:, 0].max(), 1)},
+                'db_ms': {'p50': round(p50[1], 1), 'p95': round(p95[1], 1), 'max': round(samples[:, 1].max(), 1)},
+                'queries': {'p50': round(p50[2], 1), 'p95': round(p95[2], 1), 'max': int(samples[:, 2].max())},
+                'duplicates': {'p50': round(p50[3], 1), 'p95': round(p95[3], 1), 'max': int(samples[:, 3].max())},
+                'query_budget': budgets.get(route),
+                'over_budget': over_budget.get(route, 0),
+                'repeated_queries': [{'sql': sql, 'max_repeats': count} for sql, count in repeated.get(route, [])],
+            })
+        return sorted(summary, key=lambda row: row['wall_ms']['p95'], reverse=True)
+
+
+route_stats = RouteStats()
+
+
+class QueryMetricsMiddleware:
+    """Record query count, DB time, duplicates and wall time per request (see module docstring)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with self.recording(recorder):
+            response = self.get_response(request)
+
+        if response.streaming and not getattr(response, 'is_async', False):
+            # The body of a streamed export runs its queries after this returns, so keep
+            # recording while it is read and check the budget once it is exhausted
+            response['Server-Timing'] = 'db;desc="streamed, counted when sent"'
+            response.streaming_content = self.record_stream(response.streaming_content, request, recorder, started)
+            return response
+        if response.streaming:
+            response['Server-Timing'] = 'db;desc="streamed, not measured"'
+            return response
+
+        wall = time.perf_counter() - started
+        response['Server-Timing'] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries, '
+            f'{recorder.duplicates} duplicates", view;dur={wall * 1000:.1f}'
+        )
+        self.finish(request, recorder, wall)
+        return response
+
+    @staticmethod
+    def recording(recorder):
+        """Context manager sending the queries of every database connection to ``recorder``"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def record_stream(self, content, request, recorder, started):
+        """Yield ``content``, recording the queries run to produce each chunk"""
+        chunks = iter(content)
+        while True:
+            # Wrappers are entered per chunk, never across a yield, so they unwind in order
+            with self.recording(recorder):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        self.finish(request, recorder, time.perf_counter() - started)
+
+    def finish(self, request, recorder, wall):
+        """Add the request to the route statistics and enforce its query budget"""
+        match = request.resolver_match
+        if match is None:
+            return
+        route = f'{request.method} {match.route}'
+        budget = getattr(request, '_query_budget', None)
+        route_stats.record(route, wall, recorder, budget)
+
+        if budget is not None and recorder.count > budget:
+            message = f'{route} ran {recorder.count} queries, over its budget of {budget}'
+            repeated = recorder.repeated()
+            if repeated:
+                message += '; most repeated: ' + '; '.join(f'{count}x {sql[:200]}' for sql, count in repeated)
+            if settings.QUERY_BUDGET_ACTION == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning('Query budget exceeded: %s', message)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.QUERY_METRICS_ENABLED:
+            request._query_budget = budget_for(view_func, request.method)
+
+
+class QueryStatsAPIView(APIView):
+    """Rolling per-route query and timing statistics of this process (superusers only)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return Response({'error': 'Only superusers can view query statistics'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            'success': True,
+            'enabled': settings.QUERY_METRICS_ENABLED,
+            'window': settings.QUERY_METRICS_WINDOW,
+            'data': route_stats.summary()
+        })
+
+    def delete(self, request):
+        """Clear the collected statistics"""
+        if not request.user.is_superuser:
+            return Response({'error': 'Only superusers can reset query statistics'}, status=status.HTTP_403_FORBIDDEN)
+        route_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
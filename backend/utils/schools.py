@@ -0,0 +1,14 @@
+"""
+School scoping shared by the views of every app.
+"""
+
+
+def get_user_school(user):
+    """School of a staff, student or admin user"""
+    if getattr(user, 'school', None):
+        return user.school
+    if hasattr(user, 'staff_profile') and user.staff_profile.school:
+        return user.staff_profile.school
+    if hasattr(user, 'student_profile') and user.student_profile.school:
+        return user.student_profile.school
+    return None
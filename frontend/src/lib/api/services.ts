@@ -7,7 +7,9 @@ import {
   EmailVerification,
   EmailVerificationResult,
   School,
+  SchoolQuery,
   SchoolsResponse,
+  SchoolLocationsResponse,
   FeeInvoice,
   Payment,
   AttendanceRecord,
@@ -26,9 +28,13 @@ import {
 import { api, apiClient } from './client';
 
 export const schoolService = {
-  // Get list of active schools for admission forms (public)
-  getActiveSchools: (): Promise<SchoolsResponse> =>
-    api.get('schools/public/'),
+  // Get the district/block/village tree of active schools with school counts (public, revalidated by ETag)
+  getSchoolLocations: (): Promise<SchoolLocationsResponse> =>
+    api.get('schools/locations/'),
+
+  // Get one page of active schools for admission forms, narrowed by location and name or code (public)
+  getActiveSchools: (params?: SchoolQuery): Promise<SchoolsResponse> =>
+    api.get('schools/public/', params),
 };
 
 export const admissionService = {
@@ -144,9 +150,19 @@ export const feeService = {
   getInvoices: (params?: any): Promise<ApiResponse<FeeInvoice[]>> =>
     api.get('fees/invoices/', params),
 
-  // Get all payments including admission fees
-  getAllPayments: (): Promise<ApiResponse<any[]>> =>
-    api.get('fees/invoices/all_payments/'),
+  // Get all payments including admission fees. The ledger is served a page at a
+  // time; read every page so the dashboard sees the complete list
+  getAllPayments: async (): Promise<ApiResponse<any[]>> => {
+    const params = { page: 1, page_size: 100 };
+    const first: any = await api.get('fees/invoices/all_payments/', params);
+    const payments = [...(first.data || [])];
+    const totalPages = first.pagination?.total_pages || 1;
+    for (params.page = 2; params.page <= totalPages; params.page += 1) {
+      const next: any = await api.get('fees/invoices/all_payments/', params);
+      payments.push(...(next.data || []));
+    }
+    return { ...first, data: payments };
+  },
 
   // Get invoice by ID
   getInvoice: (id: number): Promise<FeeInvoice> =>
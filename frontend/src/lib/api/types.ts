@@ -21,9 +21,46 @@ export interface School {
   village: string;
 }
 
+export interface SchoolQuery {
+  district?: string;
+  block?: string;
+  village?: string;
+  search?: string;
+  page?: number;
+  page_size?: number;
+}
+
 export interface SchoolsResponse {
   success: boolean;
   data: School[];
+  pagination?: {
+    count: number;
+    next?: string;
+    previous?: string;
+    page_size: number;
+    total_pages: number;
+    current_page: number;
+  };
+}
+
+export interface SchoolLocationBlock {
+  name: string;
+  schools: number;
+  villages: [string, number][];
+}
+
+export interface SchoolLocationDistrict {
+  name: string;
+  schools: number;
+  blocks: SchoolLocationBlock[];
+}
+
+export interface SchoolLocationsResponse {
+  success: boolean;
+  data: {
+    total_schools: number;
+    districts: SchoolLocationDistrict[];
+  };
 }
 
 export interface StudentProfile {
@@ -15,7 +15,12 @@ import { cn } from "@/lib/utils";
 import { useToast } from "@/hooks/use-toast";
 import { admissionService, schoolService } from "@/lib/api/services";
 import { extractApiData, extractErrorMessage } from "@/lib/utils/apiHelpers";
-import { School, AdmissionTrackingResponse, SchoolAdmissionDecision } from "@/lib/api/types";
+import { School, SchoolLocationDistrict, AdmissionTrackingResponse, SchoolAdmissionDecision } from "@/lib/api/types";
+
+// Schools offered per search: the picker narrows by district, block and name instead of listing the state
+const SCHOOL_PAGE_SIZE = 100;
+
+type SchoolPreferenceField = 'first_preference_school' | 'second_preference_school' | 'third_preference_school';
 
 interface AdmissionFormData {
   applicant_name: string;
@@ -87,7 +92,14 @@ const Admission = () => {
   const [subStep, setSubStep] = useState(1); // For parent information sub-steps
   const [date, setDate] = useState<Date | null>(null);
   const [schools, setSchools] = useState<School[]>([]);
+  const [schoolCount, setSchoolCount] = useState(0);
   const [isLoadingSchools, setIsLoadingSchools] = useState(false);
+  const [locations, setLocations] = useState<SchoolLocationDistrict[]>([]);
+  const [schoolDistrict, setSchoolDistrict] = useState("");
+  const [schoolBlock, setSchoolBlock] = useState("all");
+  const [schoolSearch, setSchoolSearch] = useState("");
+  // Chosen schools by id, so a choice stays listed after the search moves on
+  const [pickedSchools, setPickedSchools] = useState<Record<number, School>>({});
   const [trackingId, setTrackingId] = useState("");
   const [trackingResult, setTrackingResult] = useState<AdmissionTrackingResponse | null>(null);
   const [isTracking, setIsTracking] = useState(false);
@@ -188,30 +200,82 @@ const Admission = () => {
   const { toast } = useToast();
   const [searchParams] = useSearchParams();
 
-  // Fetch schools on component mount
+  // Fetch the district/block tree of schools on component mount
   useEffect(() => {
-    const fetchSchools = async () => {
-      setIsLoadingSchools(true);
+    const fetchLocations = async () => {
       try {
-        const response = await schoolService.getActiveSchools();
-        setSchools(response.data);
+        const response = await schoolService.getSchoolLocations();
+        setLocations(response.data.districts);
       } catch (error) {
         toast({
           title: "Error",
           description: "Failed to load schools. Please refresh the page.",
           variant: "destructive",
         });
-      } finally {
-        setIsLoadingSchools(false);
       }
     };
     
-    fetchSchools();
+    fetchLocations();
     
     // Initialize previous email tracking
     setPreviousEmail(formData.email);
   }, [toast]);
 
+  // List the schools of the chosen district and block, once typing pauses
+  useEffect(() => {
+    if (!schoolDistrict) {
+      setSchools([]);
+      setSchoolCount(0);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      setIsLoadingSchools(true);
+      try {
+        const response = await schoolService.getActiveSchools({
+          district: schoolDistrict,
+          block: schoolBlock !== "all" ? schoolBlock : undefined,
+          search: schoolSearch.trim() || undefined,
+          page_size: SCHOOL_PAGE_SIZE
+        });
+        setSchools(response.data);
+        setSchoolCount(response.pagination?.count ?? response.data.length);
+      } catch (error) {
+        toast({
+          title: "Error",
+          description: "Failed to load schools. Please refresh the page.",
+          variant: "destructive",
+        });
+      } finally {
+        setIsLoadingSchools(false);
+      }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [schoolDistrict, schoolBlock, schoolSearch, toast]);
+
+  const districtBlocks = useMemo(
+    () => locations.find((district) => district.name === schoolDistrict)?.blocks || [],
+    [locations, schoolDistrict]
+  );
+
+  // The current matches minus the other preferences, keeping this preference's choice listed
+  const schoolOptions = (field: SchoolPreferenceField, exclude: (number | "")[]) => {
+    const options = schools.filter((school) => !exclude.includes(school.id));
+    const chosen = formData[field];
+    if (chosen !== "" && pickedSchools[chosen] && !options.some((school) => school.id === chosen)) {
+      options.unshift(pickedSchools[chosen]);
+    }
+    return options;
+  };
+
+  const handleSchoolChoice = (field: SchoolPreferenceField, value: string) => {
+    const id = parseInt(value);
+    const school = schools.find((s) => s.id === id);
+    if (school) {
+      setPickedSchools((prev) => ({ ...prev, [id]: school }));
+    }
+    handleInputChange(field, id);
+  };
+
   const handleTrackApplication = async () => {
     if (!trackingId.trim()) {
       toast({
@@ -1320,11 +1384,66 @@ const Admission = () => {
                   </div>
                   <div className="space-y-4">
                     <h4 className="font-medium text-gray-800">School Preferences</h4>
+                    <div className="grid grid-cols-1 lg:grid-cols-3 gap-4">
+                      <div className="space-y-2">
+                        <Label htmlFor="school_district" className="text-gray-700">District</Label>
+                        <Select
+                          value={schoolDistrict}
+                          onValueChange={(value) => {
+                            setSchoolDistrict(value);
+                            setSchoolBlock("all");
+                          }}
+                        >
+                          <SelectTrigger id="school_district" className="border-gray-300 focus:border-primary focus:ring-primary">
+                            <SelectValue placeholder={locations.length ? "Select district" : "Loading..."} />
+                          </SelectTrigger>
+                          <SelectContent>
+                            {locations.map((district) => (
+                              <SelectItem key={district.name} value={district.name}>
+                                {district.name} ({district.schools})
+                              </SelectItem>
+                            ))}
+                          </SelectContent>
+                        </Select>
+                      </div>
+                      <div className="space-y-2">
+                        <Label htmlFor="school_block" className="text-gray-700">Block</Label>
+                        <Select value={schoolBlock} onValueChange={setSchoolBlock} disabled={!schoolDistrict}>
+                          <SelectTrigger id="school_block" className="border-gray-300 focus:border-primary focus:ring-primary">
+                            <SelectValue placeholder="All blocks" />
+                          </SelectTrigger>
+                          <SelectContent>
+                            <SelectItem value="all">All blocks</SelectItem>
+                            {districtBlocks.map((block) => (
+                              <SelectItem key={block.name} value={block.name}>
+                                {block.name} ({block.schools})
+                              </SelectItem>
+                            ))}
+                          </SelectContent>
+                        </Select>
+                      </div>
+                      <div className="space-y-2">
+                        <Label htmlFor="school_search" className="text-gray-700">School name or code</Label>
+                        <Input
+                          id="school_search"
+                          placeholder="Start typing to narrow the list"
+                          value={schoolSearch}
+                          onChange={(e) => setSchoolSearch(e.target.value)}
+                          disabled={!schoolDistrict}
+                          className="border-gray-300 focus:border-primary focus:ring-primary"
+                        />
+                      </div>
+                    </div>
+                    {schoolCount > schools.length && (
+                      <p className="text-sm text-gray-500">
+                        Showing {schools.length} of {schoolCount} schools. Choose a block or type a name to narrow the list.
+                      </p>
+                    )}
                     <div className="grid grid-cols-1 lg:grid-cols-3 gap-4">
                       <div className="space-y-2">
                         <Label htmlFor="first_preference" className="text-gray-700">1st Preference *</Label>
-                        <Select onValueChange={(value) => handleInputChange('first_preference_school', parseInt(value))} required>
-                          <SelectTrigger className="border-gray-300 focus:border-primary focus:ring-primary">
+                        <Select onValueChange={(value) => handleSchoolChoice('first_preference_school', value)} required>
+                          <SelectTrigger id="first_preference" className="border-gray-300 focus:border-primary focus:ring-primary">
                             <SelectValue placeholder={isLoadingSchools ? "Loading..." : "Select 1st choice"} />
                           </SelectTrigger>
                           <SelectContent>
@@ -1335,15 +1454,15 @@ const Admission = () => {
                                   Loading schools...
                                 </div>
                               </SelectItem>
-                            ) : schools.length > 0 ? (
-                              schools.map((school) => (
+                            ) : schoolOptions('first_preference_school', []).length > 0 ? (
+                              schoolOptions('first_preference_school', []).map((school) => (
                                 <SelectItem key={school.id} value={school.id.toString()}>
-                                  {school.school_name} - {school.district}
+                                  {school.school_name} - {school.block}, {school.district}
                                 </SelectItem>
                               ))
                             ) : (
                               <SelectItem value="no-schools" disabled>
-                                No schools available
+                                {schoolDistrict ? "No schools found" : "Choose a district first"}
                               </SelectItem>
                             )}
                           </SelectContent>
@@ -1352,8 +1471,8 @@ const Admission = () => {
                       
                       <div className="space-y-2">
                         <Label htmlFor="second_preference" className="text-gray-700">2nd Preference</Label>
-                        <Select onValueChange={(value) => handleInputChange('second_preference_school', parseInt(value))}>
-                          <SelectTrigger className="border-gray-300 focus:border-primary focus:ring-primary">
+                        <Select onValueChange={(value) => handleSchoolChoice('second_preference_school', value)}>
+                          <SelectTrigger id="second_preference" className="border-gray-300 focus:border-primary focus:ring-primary">
                             <SelectValue placeholder={isLoadingSchools ? "Loading..." : "Select 2nd choice"} />
                           </SelectTrigger>
                           <SelectContent>
@@ -1364,15 +1483,15 @@ const Admission = () => {
                                   Loading schools...
                                 </div>
                               </SelectItem>
-                            ) : schools.length > 0 ? (
-                              schools.filter(s => s.id !== formData.first_preference_school).map((school) => (
+                            ) : schoolOptions('second_preference_school', [formData.first_preference_school]).length > 0 ? (
+                              schoolOptions('second_preference_school', [formData.first_preference_school]).map((school) => (
                                 <SelectItem key={school.id} value={school.id.toString()}>
-                                  {school.school_name} - {school.district}
+                                  {school.school_name} - {school.block}, {school.district}
                                 </SelectItem>
                               ))
                             ) : (
                               <SelectItem value="no-schools" disabled>
-                                No schools available
+                                {schoolDistrict ? "No schools found" : "Choose a district first"}
                               </SelectItem>
                             )}
                           </SelectContent>
@@ -1381,8 +1500,8 @@ const Admission = () => {
                       
                       <div className="space-y-2">
                         <Label htmlFor="third_preference" className="text-gray-700">3rd Preference</Label>
-                        <Select onValueChange={(value) => handleInputChange('third_preference_school', parseInt(value))}>
-                          <SelectTrigger className="border-gray-300 focus:border-primary focus:ring-primary">
+                        <Select onValueChange={(value) => handleSchoolChoice('third_preference_school', value)}>
+                          <SelectTrigger id="third_preference" className="border-gray-300 focus:border-primary focus:ring-primary">
                             <SelectValue placeholder={isLoadingSchools ? "Loading..." : "Select 3rd choice"} />
                           </SelectTrigger>
                           <SelectContent>
@@ -1393,18 +1512,15 @@ const Admission = () => {
                                   Loading schools...
                                 </div>
                               </SelectItem>
-                            ) : schools.length > 0 ? (
-                              schools.filter(s => 
-                                s.id !== formData.first_preference_school && 
-                                s.id !== formData.second_preference_school
-                              ).map((school) => (
+                            ) : schoolOptions('third_preference_school', [formData.first_preference_school, formData.second_preference_school]).length > 0 ? (
+                              schoolOptions('third_preference_school', [formData.first_preference_school, formData.second_preference_school]).map((school) => (
                                 <SelectItem key={school.id} value={school.id.toString()}>
-                                  {school.school_name} - {school.district}
+                                  {school.school_name} - {school.block}, {school.district}
                                 </SelectItem>
                               ))
                             ) : (
                               <SelectItem value="no-schools" disabled>
-                                No schools available
+                                {schoolDistrict ? "No schools found" : "Choose a district first"}
                               </SelectItem>
                             )}
                           </SelectContent>
@@ -2279,13 +2395,13 @@ const Admission = () => {
                         <span className="font-medium">School Preferences:</span> 
                         <div className="text-muted-foreground ml-1">
                           {formData.first_preference_school && (
-                            <div>1st: {schools.find(s => s.id === formData.first_preference_school)?.school_name}</div>
+                            <div>1st: {pickedSchools[formData.first_preference_school as number]?.school_name}</div>
                           )}
                           {formData.second_preference_school && (
-                            <div>2nd: {schools.find(s => s.id === formData.second_preference_school)?.school_name}</div>
+                            <div>2nd: {pickedSchools[formData.second_preference_school as number]?.school_name}</div>
                           )}
                           {formData.third_preference_school && (
-                            <div>3rd: {schools.find(s => s.id === formData.third_preference_school)?.school_name}</div>
+                            <div>3rd: {pickedSchools[formData.third_preference_school as number]?.school_name}</div>
                           )}
                           {!formData.first_preference_school && <span>Not selected</span>}
                         </div>
@@ -54,11 +54,15 @@ import {
 import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from "@/components/ui/accordion";
 import { ResponsiveContainer, LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, BarChart, Bar, PieChart, Pie, Cell } from "recharts";
 import { useAuth } from "@/contexts/AuthContext";
-import { adminAPI, SchoolStats, Student, Teacher, Staff, UserData, AdmissionApplication } from "@/services/adminAPI";
+import {
+  adminAPI, SchoolStats, Student, Teacher, Staff, UserData, AdmissionApplication, DashboardCounts, SectionPage
+} from "@/services/adminAPI";
 import { HostelAPI, HostelBlock, HostelRoom, HostelBed, HostelAllocation, HostelComplaint, HostelLeaveRequest, StaffMember } from "@/services/hostelAPI";
 import { libraryAPI, LibraryBook, UserBook, LibraryStats, LibraryTransaction, BookRequest } from "@/services/libraryAPI";
 import { toast } from "@/hooks/use-toast";
 
+const EMPTY_PAGE = { rows: [], count: 0, page: 1, totalPages: 1 };
+
 export default function AdminDashboard() {
   const { user, profile } = useAuth();
   const [activeTab, setActiveTab] = useState("overview");
@@ -106,8 +110,7 @@ export default function AdminDashboard() {
         setUnifiedDashboardData(unifiedData);
         
         // Refresh students data to show the newly created student user
-        const students = await adminAPI.getStudents();
-        setStudentsData(students);
+        await loadStudentsPage();
       } else {
         setError(response.message || 'Failed to allocate user ID');
       }
@@ -137,10 +140,19 @@ export default function AdminDashboard() {
     }
   });
   
-  const [studentsData, setStudentsData] = useState<Student[]>([]);
+  // Students and users can run to tens of thousands: the summary counts paint first and
+  // their tables request one page at a time, when shown
+  const [dashboardCounts, setDashboardCounts] = useState<DashboardCounts | null>(null);
+  const [studentsPage, setStudentsPage] = useState<SectionPage<Student>>(EMPTY_PAGE);
+  const [studentsPageNumber, setStudentsPageNumber] = useState(1);
+  const [usersPage, setUsersPage] = useState<SectionPage<UserData>>(EMPTY_PAGE);
+  const [usersPageNumber, setUsersPageNumber] = useState(1);
+  const [studentSearch, setStudentSearch] = useState("");
+  const [studentOptions, setStudentOptions] = useState<Student[]>([]);
+  const studentsData = studentsPage.rows;
+  const allUsers = usersPage.rows;
   const [teachersData, setTeachersData] = useState<Teacher[]>([]);
   const [staffData, setStaffData] = useState<Staff[]>([]);
-  const [allUsers, setAllUsers] = useState<UserData[]>([]);
   const [admissionsData, setAdmissionsData] = useState<AdmissionApplication[]>([]);
   const [feesData, setFeesData] = useState<any[]>([]);
   const [allFeePayments, setAllFeePayments] = useState<any[]>([]);
@@ -836,6 +848,48 @@ export default function AdminDashboard() {
     }
   };
 
+  const loadStudentsPage = async (page = studentsPageNumber) => {
+    setStudentsPage(await adminAPI.getStudents({ page, search: searchTerm.trim() }));
+  };
+
+  const loadUsersPage = async (page = usersPageNumber) => {
+    setUsersPage(await adminAPI.getAllUsers({
+      page,
+      search: searchTerm.trim(),
+      role: activeUserTab === 'wardens' ? 'warden' : undefined
+    }));
+  };
+
+  // A new search or user tab starts from the first page
+  useEffect(() => {
+    setStudentsPageNumber(1);
+    setUsersPageNumber(1);
+  }, [searchTerm, activeUserTab]);
+
+  // Section pages are requested when their table is shown, once typing pauses
+  useEffect(() => {
+    if (activeTab !== 'students') return;
+    const timer = setTimeout(() => loadStudentsPage(studentsPageNumber), 300);
+    return () => clearTimeout(timer);
+  }, [activeTab, searchTerm, studentsPageNumber]);
+
+  useEffect(() => {
+    if (activeTab !== 'users' || !['all', 'wardens'].includes(activeUserTab)) return;
+    const timer = setTimeout(() => loadUsersPage(usersPageNumber), 300);
+    return () => clearTimeout(timer);
+  }, [activeTab, activeUserTab, searchTerm, usersPageNumber]);
+
+  // The hostel forms pick a student among the matches of their own search box
+  const studentPickerOpen = showAllocationModal || showCreateComplaintModal || showCreateLeaveModal;
+  useEffect(() => {
+    if (!studentPickerOpen) return;
+    const timer = setTimeout(async () => {
+      const { rows } = await adminAPI.getStudents({ search: studentSearch.trim() });
+      setStudentOptions(rows);
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [studentPickerOpen, studentSearch]);
+
   // Load data on component mount
   useEffect(() => {
     const loadData = async () => {
@@ -846,10 +900,9 @@ export default function AdminDashboard() {
         // Load all data concurrently
         const [
           stats,
-          students,
+          summary,
           teachers,
           staff,
-          users,
           admissions,
           fees,
           allPayments,
@@ -858,10 +911,9 @@ export default function AdminDashboard() {
           hostelDashboardStats
         ] = await Promise.all([
           adminAPI.getSchoolStats(),
-          adminAPI.getStudents(),
+          adminAPI.getDashboardData(),
           adminAPI.getTeachers(),
           adminAPI.getStaff(),
-          adminAPI.getAllUsers(),
           adminAPI.getSchoolAdmissions(),
           adminAPI.getFeesData(),
           adminAPI.getAllFeePayments(),
@@ -871,10 +923,9 @@ export default function AdminDashboard() {
         ]);
 
         setSchoolStats(stats);
-        setStudentsData(students);
+        setDashboardCounts(summary.counts || null);
         setTeachersData(teachers);
         setStaffData(staff);
-        setAllUsers(users);
         setAdmissionsData(admissions);
         setFeesData(fees);
         setAllFeePayments(allPayments);
@@ -885,10 +936,9 @@ export default function AdminDashboard() {
         // Debug logging to see what data we're getting
         console.log('Dashboard data loaded:', {
           stats,
-          students: students?.length || 0,
+          counts: summary.counts,
           teachers: teachers?.length || 0,
-          staff: staff?.length || 0,
-          users: users?.length || 0
+          staff: staff?.length || 0
         });
         console.log('Teachers data:', teachers);
         console.log('Staff data:', staff);
@@ -930,8 +980,7 @@ export default function AdminDashboard() {
   const reloadStudentsData = async () => {
     console.log('🔄 Reloading students data...');
     try {
-      const students = await adminAPI.getStudents();
-      setStudentsData(students);
+      await loadStudentsPage();
       toast({
         title: "Data Refreshed",
         description: "Students data has been updated.",
@@ -968,16 +1017,15 @@ export default function AdminDashboard() {
   const reloadUsersData = async () => {
     console.log('🔄 Reloading users data...');
     try {
-      const [students, teachers, staff, users] = await Promise.all([
-        adminAPI.getStudents(),
+      const [summary, teachers, staff] = await Promise.all([
+        adminAPI.getDashboardData(),
         adminAPI.getTeachers(),
         adminAPI.getStaff(),
-        adminAPI.getAllUsers()
+        loadUsersPage()
       ]);
-      setStudentsData(students);
+      setDashboardCounts(summary.counts || null);
       setTeachersData(teachers);
       setStaffData(staff);
-      setAllUsers(users);
       toast({
         title: "Data Refreshed",
         description: "User management data has been updated.",
@@ -1414,6 +1462,31 @@ export default function AdminDashboard() {
     return filtered;
   };
 
+  const renderPager = (page: SectionPage<any>, setPageNumber: (page: number) => void) => (
+    page.totalPages > 1 && (
+      <div className="flex items-center justify-between pt-4">
+        <p className="text-sm text-muted-foreground">
+          Page {page.page} of {page.totalPages} ({page.count} total)
+        </p>
+        <div className="flex gap-2">
+          <Button size="sm" variant="outline" disabled={page.page <= 1} onClick={() => setPageNumber(page.page - 1)}>
+            <ChevronLeft className="h-4 w-4 mr-1" />
+            Previous
+          </Button>
+          <Button
+            size="sm"
+            variant="outline"
+            disabled={page.page >= page.totalPages}
+            onClick={() => setPageNumber(page.page + 1)}
+          >
+            Next
+            <ChevronRight className="h-4 w-4 ml-1" />
+          </Button>
+        </div>
+      </div>
+    )
+  );
+
   const renderFilters = (showClassFilter = false) => (
     <div className="flex flex-wrap gap-4 mb-6">
       <div className="flex-1 min-w-[200px]">
@@ -1659,7 +1732,7 @@ export default function AdminDashboard() {
             <div className="flex items-center gap-2">
               <UserPlus className="h-5 w-5 text-indigo-500" />
               <div>
-                <p className="text-2xl font-bold">{allUsers.length}</p>
+                <p className="text-2xl font-bold">{dashboardCounts?.users ?? 0}</p>
                 <p className="text-sm text-muted-foreground">Total Users</p>
               </div>
             </div>
@@ -1695,7 +1768,7 @@ export default function AdminDashboard() {
               <Badge variant="secondary">Connected</Badge>
             </div>
             
-            {studentsData.length === 0 && (
+            {dashboardCounts?.students === 0 && (
               <div className="flex items-start gap-3 p-3 border rounded-lg">
                 <div className="w-2 h-2 rounded-full mt-2 bg-yellow-500" />
                 <div className="flex-1">
@@ -1731,7 +1804,7 @@ export default function AdminDashboard() {
       
       <Card>
         <CardHeader>
-          <CardTitle>All Students ({filterData(studentsData, "students").length})</CardTitle>
+          <CardTitle>All Students ({studentsPage.count})</CardTitle>
         </CardHeader>
         <CardContent>
           {studentsData.length === 0 ? (
@@ -1794,6 +1867,7 @@ export default function AdminDashboard() {
               </TableBody>
             </Table>
           )}
+          {renderPager(studentsPage, setStudentsPageNumber)}
         </CardContent>
       </Card>
     </div>
@@ -2022,11 +2096,11 @@ export default function AdminDashboard() {
 
   const renderUsersTab = () => {
     const userTabs = [
-      { id: "all", label: "All Users", count: allUsers.length },
+      { id: "all", label: "All Users", count: dashboardCounts?.users ?? 0 },
       { id: "staff", label: "Staff", count: staffData.length },
       { id: "teachers", label: "Teachers", count: teachersData.length },
       { id: "librarians", label: "Librarians", count: staffData.filter(staff => staff.user?.role === 'librarian').length },
-      { id: "wardens", label: "Wardens", count: allUsers.filter(user => user.role === 'warden').length },
+      { id: "wardens", label: "Wardens", count: dashboardCounts?.wardens ?? 0 },
     ];
 
     const renderUserTabContent = () => {
@@ -2118,7 +2192,7 @@ export default function AdminDashboard() {
   const renderAllUsersSection = () => (
     <Card>
       <CardHeader>
-        <CardTitle>All Users ({filterData(allUsers, "users").length})</CardTitle>
+        <CardTitle>All Users ({usersPage.count})</CardTitle>
       </CardHeader>
       <CardContent>
         {allUsers.length === 0 ? (
@@ -2173,6 +2247,7 @@ export default function AdminDashboard() {
             </TableBody>
           </Table>
         )}
+        {renderPager(usersPage, setUsersPageNumber)}
       </CardContent>
     </Card>
   );
@@ -2365,12 +2440,13 @@ export default function AdminDashboard() {
   );
 
   const renderWardensSection = () => {
+    // allUsers holds a page of wardens while this section is shown
     const wardens = allUsers.filter(user => user.role === 'warden');
     
     return (
       <Card>
         <CardHeader>
-          <CardTitle>All Wardens ({wardens.length})</CardTitle>
+          <CardTitle>All Wardens ({usersPage.count})</CardTitle>
         </CardHeader>
         <CardContent>
           {wardens.length === 0 ? (
@@ -2419,6 +2495,7 @@ export default function AdminDashboard() {
               </TableBody>
             </Table>
           )}
+          {renderPager(usersPage, setUsersPageNumber)}
         </CardContent>
       </Card>
     );
@@ -5214,6 +5291,13 @@ export default function AdminDashboard() {
           <div className="space-y-4">
             <div>
               <Label htmlFor="allocation_student">Student *</Label>
+              <Input
+                id="allocation_student_search"
+                className="mt-1"
+                placeholder="Search by name or admission number..."
+                value={studentSearch}
+                onChange={(e) => setStudentSearch(e.target.value)}
+              />
               <Select 
                 value={allocationForm.student_id?.toString() || ''} 
                 onValueChange={(value) => setAllocationForm({...allocationForm, student_id: parseInt(value)})}
@@ -5222,7 +5306,7 @@ export default function AdminDashboard() {
                   <SelectValue placeholder="Select a student" />
                 </SelectTrigger>
                 <SelectContent>
-                  {studentsData.filter(student => student.id).map((student) => (
+                  {studentOptions.filter(student => student.id).map((student) => (
                     <SelectItem key={student.id} value={student.id.toString()}>
                       {student.user.first_name} {student.user.last_name} - {student.admission_number}
                     </SelectItem>
@@ -5406,6 +5490,13 @@ export default function AdminDashboard() {
           <div className="space-y-4">
             <div>
               <Label htmlFor="complaint_student">Student *</Label>
+              <Input
+                id="complaint_student_search"
+                className="mt-1"
+                placeholder="Search by name or admission number..."
+                value={studentSearch}
+                onChange={(e) => setStudentSearch(e.target.value)}
+              />
               <Select 
                 value={complaintForm.student?.toString() || ''} 
                 onValueChange={(value) => setComplaintForm({...complaintForm, student: parseInt(value)})}
@@ -5414,7 +5505,7 @@ export default function AdminDashboard() {
                   <SelectValue placeholder="Select the student making complaint" />
                 </SelectTrigger>
                 <SelectContent>
-                  {studentsData.filter(student => student.id).map((student) => (
+                  {studentOptions.filter(student => student.id).map((student) => (
                     <SelectItem key={student.id} value={student.id.toString()}>
                       {student.user.first_name} {student.user.last_name} - {student.admission_number}
                     </SelectItem>
@@ -5640,6 +5731,13 @@ export default function AdminDashboard() {
           <div className="space-y-4">
             <div>
               <Label htmlFor="leave_student">Student *</Label>
+              <Input
+                id="leave_student_search"
+                className="mt-1"
+                placeholder="Search by name or admission number..."
+                value={studentSearch}
+                onChange={(e) => setStudentSearch(e.target.value)}
+              />
               <Select 
                 value={leaveForm.student?.toString() || ''} 
                 onValueChange={(value) => setLeaveForm({...leaveForm, student: parseInt(value)})}
@@ -5648,7 +5746,7 @@ export default function AdminDashboard() {
                   <SelectValue placeholder="Select student requesting leave" />
                 </SelectTrigger>
                 <SelectContent>
-                  {studentsData.filter(student => student.id).map((student) => (
+                  {studentOptions.filter(student => student.id).map((student) => (
                     <SelectItem key={student.id} value={student.id.toString()}>
                       {student.user.first_name} {student.user.last_name} - {student.admission_number}
                     </SelectItem>
@@ -143,6 +143,48 @@ export interface CreateStaffData {
   experience_years?: number;
 }
 
+// Largest page the paginated list endpoints serve
+const DASHBOARD_PAGE_SIZE = 100;
+
+export interface DashboardCounts {
+  students: number;
+  teachers: number;
+  staff: number;
+  wardens: number;
+  parents: number;
+  users: number;
+  classes: number;
+}
+
+export interface SectionQuery {
+  page?: number;
+  page_size?: number;
+  search?: string;
+  role?: string;
+}
+
+export interface SectionPage<T> {
+  rows: T[];
+  count: number;
+  page: number;
+  totalPages: number;
+}
+
+// The school dashboard serves each section (students, teachers, staff, users) a page at a time;
+// tables request the page they show, narrowed with the search box
+const getDashboardSection = async <T = any>(section: string, query: SectionQuery = {}): Promise<SectionPage<T>> => {
+  const params: SectionQuery = { page: 1, ...query };
+  if (!params.search) delete params.search;
+  const response = await apiClient.get(`/schools/dashboard/${section}/`, { params });
+  const pagination = response.data.pagination || {};
+  return {
+    rows: response.data.data || [],
+    count: pagination.count || 0,
+    page: pagination.current_page || 1,
+    totalPages: pagination.total_pages || 1
+  };
+};
+
 export const adminAPI = {
   // Get school-specific statistics for the logged-in admin
   getSchoolStats: async (): Promise<SchoolStats> => {
@@ -171,25 +213,21 @@ export const adminAPI = {
     }
   },
 
-  // Get comprehensive dashboard data for the school
-  getDashboardData: async () => {
+  // Get the school dashboard summary: school details and the size of every section.
+  // The sections themselves are loaded a page at a time with getDashboardSection
+  getDashboardData: async (): Promise<{ school?: any; counts?: DashboardCounts }> => {
     try {
       const response = await apiClient.get('/schools/dashboard/');
-      return response.data;
+      return response.data.data || {};
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
-      return {
-        students: [],
-        teachers: [],
-        staff: [],
-        users: [],
-        fees: [],
-        attendance: [],
-        exams: []
-      };
+      return {};
     }
   },
 
+  // Get one page of a dashboard section
+  getDashboardSection,
+
   // Get unified admin dashboard data (new endpoint)
   getAdminDashboardData: async () => {
     try {
@@ -201,14 +239,13 @@ export const adminAPI = {
     }
   },
 
-  // Get all students
-  getStudents: async (): Promise<Student[]> => {
+  // Get one page of students, optionally narrowed by ``search``
+  getStudents: async (query: SectionQuery = {}): Promise<SectionPage<Student>> => {
     try {
-      const response = await apiClient.get('/schools/dashboard/');
-      return response.data.students || [];
+      return await getDashboardSection<Student>('students', query);
     } catch (error) {
       console.error('Error fetching students:', error);
-      return [];
+      return { rows: [], count: 0, page: 1, totalPages: 1 };
     }
   },
 
@@ -234,15 +271,11 @@ export const adminAPI = {
         console.log('Staff endpoint not available, using fallback');
       }
       
-      // Fallback to dashboard endpoint
-      const response = await apiClient.get('/schools/dashboard/');
-      const dashboardData = response.data;
+      // Fallback to the dashboard's teachers section (one page: a school's faculty is small)
+      const { rows: teachers } = await getDashboardSection('teachers', { page_size: DASHBOARD_PAGE_SIZE });
       
-      console.log('Dashboard response for teachers:', dashboardData);
-      
-      // If we have teachers data from dashboard, use it
-      if (dashboardData.teachers && dashboardData.teachers.length > 0) {
-        return dashboardData.teachers.map((teacher: any) => ({
+      if (teachers.length > 0) {
+        return teachers.map((teacher: any) => ({
           id: teacher.id,
           user: teacher.user || {
             first_name: '',
@@ -257,25 +290,6 @@ export const adminAPI = {
         }));
       }
       
-      // If no teachers data but we have users, filter users by faculty role
-      if (dashboardData.users && dashboardData.users.length > 0) {
-        return dashboardData.users
-          .filter((user: any) => user.role === 'faculty')
-          .map((user: any) => ({
-            id: user.id,
-            user: {
-              first_name: user.first_name,
-              last_name: user.last_name,
-              email: user.email,
-              role: user.role
-            },
-            department: 'Not specified',
-            designation: 'Faculty',
-            experience_years: 0,
-            status: user.is_active ? 'active' : 'inactive'
-          }));
-      }
-      
       return [];
     } catch (error) {
       console.error('Error fetching teachers:', error);
@@ -307,15 +321,15 @@ export const adminAPI = {
         console.log('Staff endpoint not available, using fallback');
       }
       
-      // Fallback to dashboard endpoint - get staff data and users data
-      const response = await apiClient.get('/schools/dashboard/');
-      const dashboardData = response.data;
+      // Fallback to the dashboard sections: faculty are listed under teachers, the other roles under staff
+      const [teachers, staffMembers] = await Promise.all([
+        getDashboardSection('teachers', { page_size: DASHBOARD_PAGE_SIZE }),
+        getDashboardSection('staff', { page_size: DASHBOARD_PAGE_SIZE })
+      ]);
+      const dashboardStaff = [...staffMembers.rows, ...teachers.rows];
       
-      console.log('Dashboard response for staff:', dashboardData);
-      
-      // If we have staff data from dashboard, use it
-      if (dashboardData.staff && dashboardData.staff.length > 0) {
-        return dashboardData.staff.map((staff: any) => ({
+      if (dashboardStaff.length > 0) {
+        return dashboardStaff.map((staff: any) => ({
           id: staff.id,
           user: staff.user || {
             first_name: '',
@@ -334,29 +348,6 @@ export const adminAPI = {
         }));
       }
       
-      // If no staff data but we have users, filter users by role
-      if (dashboardData.users && dashboardData.users.length > 0) {
-        return dashboardData.users
-          .filter((user: any) => ['admin', 'faculty', 'librarian'].includes(user.role))
-          .map((user: any) => ({
-            id: user.id,
-            user: {
-              first_name: user.first_name,
-              last_name: user.last_name,
-              email: user.email,
-              role: user.role
-            },
-            role: user.role,
-            employee_id: '',
-            department: 'Not specified',
-            designation: user.role.charAt(0).toUpperCase() + user.role.slice(1),
-            date_of_joining: '',
-            qualification: '',
-            experience_years: 0,
-            status: user.is_active ? 'active' : 'inactive'
-          }));
-      }
-      
       return [];
     } catch (error) {
       console.error('Error fetching staff:', error);
@@ -364,22 +355,30 @@ export const adminAPI = {
     }
   },
 
-  // Get all users for user management
-  getAllUsers: async (): Promise<UserData[]> => {
+  // Get one page of the school's users for user management, optionally narrowed by ``search`` or ``role``
+  getAllUsers: async (query: SectionQuery = {}): Promise<SectionPage<UserData>> => {
     try {
-      const response = await apiClient.get('/schools/dashboard/');
-      return response.data.users || [];
+      return await getDashboardSection<UserData>('users', query);
     } catch (error) {
       console.error('Error fetching users:', error);
-      return [];
+      return { rows: [], count: 0, page: 1, totalPages: 1 };
     }
   },
 
   // Get fees data
   getFeesData: async () => {
     try {
-      const response = await apiClient.get('/admissions/fees/');
-      return response.data.data || {};
+      // enrollment_fees is served a page at a time; the fee table needs every enrolment
+      const params = { page: 1, page_size: DASHBOARD_PAGE_SIZE };
+      const response = await apiClient.get('/admissions/fees/', { params });
+      const data = response.data.data || {};
+      const enrollmentFees = [...(data.enrollment_fees || [])];
+      const totalPages = data.pagination?.total_pages || 1;
+      for (params.page = 2; params.page <= totalPages; params.page += 1) {
+        const next = await apiClient.get('/admissions/fees/', { params });
+        enrollmentFees.push(...(next.data.data?.enrollment_fees || []));
+      }
+      return { ...data, enrollment_fees: enrollmentFees };
     } catch (error) {
       console.error('Error fetching fees data:', error);
       return {
@@ -400,9 +399,16 @@ export const adminAPI = {
   // Get all fee payments for admin (both admission and regular fees)
   getAllFeePayments: async () => {
     try {
-      const response = await apiClient.get('/fees/invoices/all_payments/');
-      // The API returns {data: [...], success: true, message: "..."}
-      return response.data?.data || [];
+      // The API returns {data: [...], pagination: {...}} a page at a time; read every page
+      const params = { page: 1, page_size: DASHBOARD_PAGE_SIZE };
+      const response = await apiClient.get('/fees/invoices/all_payments/', { params });
+      const payments = [...(response.data?.data || [])];
+      const totalPages = response.data?.pagination?.total_pages || 1;
+      for (params.page = 2; params.page <= totalPages; params.page += 1) {
+        const next = await apiClient.get('/fees/invoices/all_payments/', { params });
+        payments.push(...(next.data?.data || []));
+      }
+      return payments;
     } catch (error) {
       console.error('Error fetching all fee payments:', error);
       return [];
@@ -410,26 +416,12 @@ export const adminAPI = {
   },
 
   // Get attendance data
-  getAttendanceData: async () => {
-    try {
-      const response = await apiClient.get('/schools/dashboard/');
-      return response.data.attendance || [];
-    } catch (error) {
-      console.error('Error fetching attendance data:', error);
-      return [];
-    }
-  },
+  // The school dashboard never carried attendance data
+  getAttendanceData: async () => [],
 
   // Get exams data
-  getExamsData: async () => {
-    try {
-      const response = await apiClient.get('/schools/dashboard/');
-      return response.data.exams || [];
-    } catch (error) {
-      console.error('Error fetching exams data:', error);
-      return [];
-    }
-  },
+  // The school dashboard never carried exams data
+  getExamsData: async () => [],
 
   // Get admissions for school review
   getSchoolAdmissions: async (): Promise<AdmissionApplication[]> => {